@@ -0,0 +1,293 @@
+"""
+End-to-end and per-symbol benchmarks for the three scanners.
+
+Every end-to-end case runs in its own process against the offline fake
+exchange (a fresh working directory, candle store and SQLite file), once
+with an empty store ("cold") and once more with it filled ("warm").
+
+    python bench.py                                   # default sizes, all scanners
+    python bench.py --sizes 50 500 2000 --scanners radar breakout
+    python bench.py --out bench_results/today.json --baseline bench_results/baseline.json
+
+Results are JSON: wall time, CPU time, peak RSS and requests issued per
+case, plus micro-benchmarks of the per-symbol analysis functions.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+SCANNERS = ('radar', 'breakout', 'early')
+DEFAULT_SIZES = (50, 200, 1000)
+
+# A fixed moment, so every run sees the same synthetic market
+BENCH_NOW_MS = 1_760_000_000_000 - 1_760_000_000_000 % 60_000 + 37_000
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except Exception:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, text=True).strip()
+    except Exception:
+        return None
+
+
+# ============================================================
+# CHILD: one scanner, one universe size
+# ============================================================
+
+def _scan_once(scanner):
+    if scanner == 'radar':
+        import local_scanner_v2 as radar
+        asyncio.run(radar.scan_all())
+    elif scanner == 'breakout':
+        from breakout_scanner import scan_all_markets
+        asyncio.run(scan_all_markets())
+    elif scanner == 'early':
+        from early_scanner import scan_early_pumps
+        scan_early_pumps()
+    else:
+        raise ValueError(scanner)
+
+
+def _silence_notifications():
+    """The radar would post to Telegram/Square; count the calls instead."""
+    import local_scanner_v2 as radar
+    sent = {'telegram': 0, 'square': 0}
+
+    def telegram(text):
+        sent['telegram'] += 1
+
+    def square(text):
+        sent['square'] += 1
+
+    radar.send_telegram_message = telegram
+    radar.send_binance_square = square
+    return sent
+
+
+def run_case(scanner, size, passes):
+    from fake_exchange import FakeExchange
+
+    sent = _silence_notifications() if scanner == 'radar' else None
+    out = []
+    for i in range(passes):
+        before = dict(FakeExchange.total_requests)
+        wall, cpu = time.perf_counter(), time.process_time()
+        _scan_once(scanner)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        requests = {
+            k: v - before.get(k, 0)
+            for k, v in FakeExchange.total_requests.items()
+            if v - before.get(k, 0)
+        }
+        out.append({
+            'case': scanner,
+            'size': size,
+            'store': 'cold' if i == 0 else 'warm',
+            'wall_s': round(wall, 4),
+            'cpu_s': round(cpu, 4),
+            'peak_rss_mb': _peak_rss_mb(),
+            'requests': requests,
+            'requests_total': sum(requests.values()),
+            'notifications': dict(sent) if sent else None,
+        })
+    return out
+
+
+# ============================================================
+# MICRO-BENCHMARKS: per-symbol analysis on fixed inputs
+# ============================================================
+
+def _timeit(fn, number):
+    samples = []
+    for _ in range(number):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return {
+        'runs': number,
+        'mean_us': round(statistics.mean(samples) * 1e6, 2),
+        'median_us': round(statistics.median(samples) * 1e6, 2),
+        'min_us': round(min(samples) * 1e6, 2),
+    }
+
+
+def run_micro(number):
+    import local_scanner_v2 as radar
+    from breakout_scanner import grade_2h_candles
+    from early_scanner import _analyze_symbol_1m_early
+    from fake_exchange import FakeExchange
+
+    ex = FakeExchange(symbols=50, now_ms=BENCH_NOW_MS)
+    symbol = 'BTC/USDT:USDT'
+    ohlcv_2h = ex._ohlcv(symbol, '2h', limit=22)
+    ohlcv_15m = ex._ohlcv(symbol, '15m', limit=21)
+    daily = ex._ohlcv(symbol, '1d', limit=2)[-2]
+    price = ex._ticker(symbol)['last']
+    funding = ex._funding(symbol)
+
+    loop = asyncio.new_event_loop()
+    try:
+        # Warm the candle store so this measures analysis, not the fake
+        loop.run_until_complete(_analyze_symbol_1m_early(ex, symbol))
+        results = {
+            'grade_2h_candles': _timeit(
+                lambda: grade_2h_candles(symbol, ohlcv_2h), number),
+            '_analyze_symbol_1m_early': _timeit(
+                lambda: loop.run_until_complete(_analyze_symbol_1m_early(ex, symbol)), number),
+            'analyze_liquidity': _timeit(
+                lambda: radar.analyze_liquidity(
+                    symbol, ohlcv_15m, price, funding, daily[2], daily[3]), number),
+        }
+    finally:
+        loop.run_until_complete(ex.close())
+        loop.close()
+    return results
+
+
+# ============================================================
+# PARENT
+# ============================================================
+
+def _child_env(size, workdir):
+    env = dict(os.environ)
+    env.update({
+        'SCANNER_EXCHANGE': 'fake',
+        'FAKE_SYMBOLS': str(size),
+        'FAKE_NOW_MS': str(BENCH_NOW_MS),
+        'CANDLE_STORE_DIR': os.path.join(workdir, 'candles'),
+        # The warm pass must repeat the cold pass's work, not skip what the
+        # cadence or prefilter learned from it
+        'ADAPTIVE_CADENCE': '0',
+        'RADAR_PREFILTER': '0',
+        'CADENCE_PATH': os.path.join(workdir, 'radar_cadence.json'),
+        'SCAN_LOCK_PATH': os.path.join(workdir, 'radar.lock'),
+        'SQUARE_POSTING': '0',
+        'TELEGRAM_TOKEN': '',
+        'PYTHONPATH': REPO + os.pathsep + env.get('PYTHONPATH', ''),
+    })
+    return env
+
+
+def _spawn(args, env, cwd):
+    proc = subprocess.run(
+        [sys.executable, os.path.join(REPO, 'bench.py')] + args,
+        env=env, cwd=cwd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"bench child failed: {args}\n{proc.stderr[-2000:]}")
+    # The scanners print progress; the JSON payload is the last line
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, max_regression):
+    """Print wall/CPU ratios against a baseline file; returns the regressions."""
+    index = {(r['case'], r['size'], r['store']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'case':<10}{'size':>6}{'store':>7}{'wall':>10}{'x base':>9}{'cpu':>10}{'x base':>9}")
+    for r in results['results']:
+        base = index.get((r['case'], r['size'], r['store']))
+        wall_x = r['wall_s'] / base['wall_s'] if base and base['wall_s'] else None
+        cpu_x = r['cpu_s'] / base['cpu_s'] if base and base['cpu_s'] else None
+        print(f"{r['case']:<10}{r['size']:>6}{r['store']:>7}"
+              f"{r['wall_s']:>10.3f}{(f'{wall_x:.2f}' if wall_x else '-'):>9}"
+              f"{r['cpu_s']:>10.3f}{(f'{cpu_x:.2f}' if cpu_x else '-'):>9}")
+        # Sub-50ms differences are scheduler noise, not regressions
+        if wall_x and wall_x > 1 + max_regression and r['wall_s'] - base['wall_s'] > 0.05:
+            regressions.append((r['case'], r['size'], r['store'], round(wall_x, 2)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--scanners', nargs='+', choices=SCANNERS, default=list(SCANNERS))
+    parser.add_argument('--passes', type=int, default=2,
+                        help="scans per case; the first starts with an empty store")
+    parser.add_argument('--micro-runs', type=int, default=200)
+    parser.add_argument('--no-micro', action='store_true')
+    parser.add_argument('--out', default=os.path.join('bench_results', 'latest.json'))
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="fail if a case is this much slower than the baseline")
+    # internal: run a single case in this process
+    parser.add_argument('--case', choices=SCANNERS + ('micro',), help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case == 'micro':
+        print(json.dumps(run_micro(args.micro_runs)))
+        return
+    if args.case:
+        print(json.dumps(run_case(args.case, args.size, args.passes)))
+        return
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': [],
+        'micro': None,
+    }
+
+    for size in args.sizes:
+        for scanner in args.scanners:
+            with tempfile.TemporaryDirectory() as workdir:
+                rows = _spawn(['--case', scanner, '--size', str(size),
+                               '--passes', str(args.passes)],
+                              _child_env(size, workdir), workdir)
+            for row in rows:
+                print(f"{row['case']:<10}{row['size']:>6} {row['store']:<5}"
+                      f"wall {row['wall_s']:>8.3f}s  cpu {row['cpu_s']:>8.3f}s  "
+                      f"rss {row['peak_rss_mb'] or 0:>7.1f}MB  requests {row['requests_total']}")
+            results['results'].extend(rows)
+
+    if not args.no_micro:
+        with tempfile.TemporaryDirectory() as workdir:
+            results['micro'] = _spawn(
+                ['--case', 'micro', '--micro-runs', str(args.micro_runs)],
+                _child_env(50, workdir), workdir)
+        for name, stats in results['micro'].items():
+            print(f"{name:<28} median {stats['median_us']:>10.1f}us")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\nRegressions over {args.max_regression:.0%}: {regressions}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+2-hour breakout scanner (A-F graded), without the Streamlit UI.
+
+scanner.py renders the results; benchmarks and workers import from here.
+"""
+import asyncio
+from datetime import timezone
+
+import pandas as pd
+
+import sharding
+from candle_store import get_store
+from clock import get_clock, run_on_close
+from exchanges import create_async_exchange
+from universe import get_universe
+
+
+def grade_2h_candles(symbol, ohlcv):
+    """Grade the last 2h candle of `ohlcv` (22 rows, forming or just closed)."""
+    if len(ohlcv) < 22:
+        return None
+    df = pd.DataFrame(
+        ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['range'] = df['high'] - df['low']
+    pre_signal_candle = df.iloc[-2]
+    pre_signal_range = pre_signal_candle['range']
+    avg_range_10 = df['range'].iloc[-12:-2].mean()
+    is_contraction = pre_signal_range < (
+        avg_range_10 * 0.5) if avg_range_10 > 0 else False
+    signal_candle = df.iloc[-1]
+    previous_candle = df.iloc[-2]
+    price_change = (
+        (signal_candle['close'] - previous_candle['close']) / previous_candle['close']) * 100
+    average_volume = df.iloc[-21:-1]['volume'].mean()
+    volume_ratio = signal_candle['volume'] / \
+        average_volume if average_volume > 0 else 0
+    pressure = "📈 Buyer" if signal_candle['close'] > signal_candle['open'] else "📉 Seller"
+    signal_timestamp = pd.to_datetime(
+        signal_candle['timestamp'], unit='ms').tz_localize(timezone.utc)
+    grade = "N/A"
+    analysis = "No significant price move. (Fails < 2% check)"
+    is_pump_signal = price_change > 2 and pressure == "📈 Buyer"
+    is_dump_signal = price_change < -2 and pressure == "📉 Seller"
+    if is_pump_signal or is_dump_signal:
+        if volume_ratio < 1.5:
+            grade = "F (Trap)"
+            analysis = "Price is moving with NO volume. High risk of fakeout."
+        elif volume_ratio < 2.0:
+            if is_contraction:
+                grade = "B (Weak)"
+                analysis = "Weak volume, but breakout came from consolidation. (B-Grade)"
+            else:
+                grade = "C (Weak/Noisy)"
+                analysis = "Weak volume and a noisy breakout. Very high risk. (C-Grade)"
+        elif volume_ratio < 3.5:
+            if is_contraction:
+                grade = "A (Prime)"
+                analysis = "A-Grade setup. Breakout from consolidation with good volume."
+            else:
+                grade = "B+ (Noisy)"
+                analysis = "Good volume, but did not come from a calm state. (B+-Grade)"
+        else:
+            if is_contraction:
+                grade = "A+ (Explosive)"
+                analysis = "A+ Setup. Explosive volume from a perfect consolidation."
+            else:
+                grade = "A (High Volume)"
+                analysis = "A-Grade setup. Explosive volume from a noisy state."
+    return {'Symbol': symbol, 'Price': signal_candle['close'], 'Signal Time': signal_timestamp, 'Grade': grade, 'Analysis': analysis, 'Price Change (2h) %': price_change, 'Volume Ratio (2h)': volume_ratio, 'Dominant Pressure': pressure, 'Volatility Contraction': is_contraction}
+
+
+async def analyze_symbol_2h(exchange, symbol, closed=False):
+    try:
+        ohlcv = await get_store().fetch_ohlcv(
+            exchange, symbol, '2h', limit=22, live=not closed)
+        return grade_2h_candles(symbol, ohlcv)
+    except Exception:
+        return None
+
+
+async def _grade_sharded(exchange, symbols, closed=False):
+    """Fetch all 2h candles concurrently, grade them on the process pool."""
+    store = get_store()
+    fetched = await asyncio.gather(
+        *(store.fetch_ohlcv(exchange, symbol, '2h', limit=22, live=not closed)
+          for symbol in symbols),
+        return_exceptions=True)
+    arrays = [[] if isinstance(ohlcv, Exception) else ohlcv for ohlcv in fetched]
+    results, _ = await sharding.map_candles(grade_2h_candles, symbols, arrays)
+    return results
+
+
+async def scan_all_markets(closed=False):
+    """
+    Grade every symbol's forming 2h candle, or with `closed` the one that
+    just closed.
+    """
+    exchange = create_async_exchange()
+    try:
+        await exchange.load_markets()
+        if get_clock().stale:
+            await get_clock().sync(exchange)
+        universe = await get_universe().refresh(exchange)
+        symbols = universe.ranked
+        if sharding.workers() > 1:
+            results = await _grade_sharded(exchange, symbols, closed)
+        else:
+            tasks = [analyze_symbol_2h(exchange, symbol, closed) for symbol in symbols]
+            results = await asyncio.gather(*tasks)
+        df = pd.DataFrame([res for res in results if res is not None])
+        if df.empty:
+            return df
+        df['24h Volume'] = df['Symbol'].map(universe.quote_volume)
+        df['High 24h Volume'] = df['Symbol'].isin(
+            universe.above_percentile(0.75))
+        return df
+    finally:
+        await exchange.close()
+
+
+def _print_results(df):
+    if df.empty:
+        print("[Breakout] No 2h candles graded.")
+        return
+    print(df[['Symbol', 'Grade', 'Price Change (2h) %', 'Volume Ratio (2h)']]
+          .to_string(index=False))
+
+
+async def scan_on_close(on_results=None):
+    """
+    scan_all_markets(closed=True) right after every 2h close on the
+    exchange's clock, passing each frame to `on_results`. Runs until
+    cancelled.
+    """
+    on_results = on_results or _print_results
+
+    async def job():
+        on_results(await scan_all_markets(closed=True))
+
+    await run_on_close('2h', job)
+
+
+if __name__ == "__main__":
+    asyncio.run(scan_on_close())
@@ -0,0 +1,107 @@
+"""
+Adaptive per-symbol rescan intervals for the Liquidity Radar.
+
+After each scan a symbol gets a status from its own data, and the status
+sets when it is next due:
+
+    sweep / near   a PDH/PDL sweep on the last closed candle, or price
+                   within CADENCE_NEAR_DISTANCE of a level   -> every minute
+    watch          everything in between                     -> every 5 minutes
+    far / dead     over 1.5% from both levels, or a market
+                   too quiet to trade                        -> every 15 minutes
+
+The radar loop ticks every minute and only fetches symbols that are due,
+so near-level symbols get more scans while the request weight per hour
+stays about where it was. State is kept in CADENCE_PATH between runs.
+"""
+import json
+import os
+import time
+
+import config
+
+INTERVALS = {
+    'sweep': 60,
+    'near': 60,
+    'watch': 300,
+    'far': 900,
+    'dead': 900,
+}
+
+# Same threshold as analyze_liquidity's market_dead filter
+DEAD_RANGE = 0.0015
+
+# A symbol due a few seconds after the tick should not wait a whole tick
+SLACK_SECONDS = 15
+
+
+def classify(ohlcv, current_price, prev_day_high, prev_day_low):
+    """Status of one symbol from its 15m candles (last one forming)."""
+    if ohlcv is None or len(ohlcv) < 3 or not current_price:
+        return 'watch'
+
+    prev = ohlcv[-2]
+    if (prev[3] < prev_day_low < prev[4]) or (prev[4] < prev_day_high < prev[2]):
+        return 'sweep'
+
+    distance = min(abs(current_price - prev_day_high) / prev_day_high,
+                   abs(current_price - prev_day_low) / prev_day_low)
+    if distance <= config.CADENCE_NEAR_DISTANCE:
+        return 'near'
+
+    closed = ohlcv[:-1]
+    avg_range = sum(c[2] - c[3] for c in closed) / len(closed)
+    if avg_range < current_price * DEAD_RANGE:
+        return 'dead'
+    if distance > config.MAX_SIGNAL_DISTANCE:
+        return 'far'
+    return 'watch'
+
+
+class ScanCadence:
+
+    def __init__(self, path=None):
+        self.path = path or config.CADENCE_PATH
+        self.state = {}
+        try:
+            with open(self.path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def is_due(self, symbol, now=None, distance=None):
+        """Due by schedule, or because price has since moved near a level."""
+        entry = self.state.get(symbol)
+        if entry is None or (now or time.time()) >= entry['next_due']:
+            return True
+        return distance is not None and distance <= config.CADENCE_NEAR_DISTANCE
+
+    def due(self, symbols, now=None, distances=None):
+        now = now or time.time()
+        distances = distances or {}
+        return [s for s in symbols if self.is_due(s, now, distances.get(s))]
+
+    def update(self, symbol, status, now=None):
+        now = now or time.time()
+        interval = INTERVALS[status]
+        self.state[symbol] = {
+            'status': status,
+            'interval': interval,
+            'next_due': now + interval - SLACK_SECONDS,
+            'scanned_at': now,
+        }
+
+    def requests_per_hour(self, symbols, per_scan=3):
+        """Expected per-symbol request count per hour at current intervals."""
+        total = 0.0
+        for symbol in symbols:
+            entry = self.state.get(symbol)
+            total += 3600 / (entry['interval'] if entry else INTERVALS['watch'])
+        return total * per_scan
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
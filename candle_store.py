@@ -0,0 +1,307 @@
+"""
+Local OHLCV store shared by every scanner and the planner.
+
+One append-only file of little-endian float64 rows
+[timestamp, open, high, low, close, volume] per (symbol, timeframe),
+holding closed candles only. read() returns zero-copy NumPy views of the
+memory-mapped file; fetch_ohlcv() copies them into ccxt-style lists for
+callers written against the exchange API. Syncs only ask the exchange for
+candles after the file's high-water mark.
+"""
+import os
+import re
+
+import numpy as np
+
+import config
+from clock import get_clock, timeframe_ms
+
+COLUMNS = 6
+ROW_BYTES = COLUMNS * 8
+DTYPE = '<f8'
+PAGE_LIMIT = 1000  # candles per fetch_ohlcv page when backfilling
+
+
+def _page_size(since, until, step, extra=0):
+    """
+    Candles from `since` up to `until`, plus `extra`, capped at PAGE_LIMIT.
+    Binance weighs a kline request by its limit (under 100: 1, 1000: 5),
+    so a warm sync that misses a candle or two asks for just those.
+    """
+    return int(max(1, min(PAGE_LIMIT, -(-(until - since) // step) + extra)))
+
+
+def _now_ms(exchange=None):
+    # Exchange time, so a candle counts as closed when the exchange says so
+    return get_clock().now_ms(exchange)
+
+
+class CandleStore:
+
+    def __init__(self, root=None):
+        self.root = root or config.CANDLE_STORE_DIR
+        self._maps = {}  # path -> memmap of the rows seen at map time
+        self._resamplers = {}  # (symbol, base, timeframe) -> resample.Resampler
+
+    # ================= FILES =================
+
+    def path(self, symbol, timeframe):
+        name = re.sub(r'[^A-Za-z0-9]+', '_', symbol).strip('_')
+        return os.path.join(self.root, timeframe, f"{name}.f64")
+
+    def rows(self, symbol, timeframe):
+        try:
+            return os.path.getsize(self.path(symbol, timeframe)) // ROW_BYTES
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _truncate_torn_row(path):
+        # A write cut short (crash, full disk) leaves a partial row at the
+        # end; appending after it would shift every later row
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size % ROW_BYTES:
+            print(f"⚠️ Dropping {size % ROW_BYTES} bytes of a torn row in {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(size - size % ROW_BYTES)
+
+    def _map(self, path, n):
+        mm = self._maps.get(path)
+        if mm is None or len(mm) != n:
+            mm = np.memmap(path, dtype=DTYPE, mode='r', shape=(n, COLUMNS))
+            self._maps[path] = mm
+        return mm
+
+    # ================= READS =================
+
+    def read(self, symbol, timeframe, limit=None, since=None):
+        """
+        Closed candles as an (n, 6) view into the memory-mapped file.
+        The view is read-only; copy it if you need to modify it.
+        """
+        n = self.rows(symbol, timeframe)
+        if n == 0:
+            return np.empty((0, COLUMNS), dtype=DTYPE)
+        view = self._map(self.path(symbol, timeframe), n)
+        if since is not None:
+            view = view[np.searchsorted(view[:, 0], since):]
+        if limit is not None:
+            view = view[-limit:]
+        return view
+
+    def high_water_mark(self, symbol, timeframe):
+        """Open time of the newest stored candle, or None."""
+        last = self.read(symbol, timeframe, limit=1)
+        return int(last[0, 0]) if len(last) else None
+
+    # ================= WRITES =================
+
+    def append(self, symbol, timeframe, candles, now_ms=None):
+        """
+        Append the closed candles in `candles` that are newer than the
+        high-water mark. Returns how many rows were written.
+        """
+        step = timeframe_ms(timeframe)
+        now_ms = now_ms or _now_ms()
+        hwm = self.high_water_mark(symbol, timeframe)
+
+        fresh = {}
+        for c in candles:
+            ts = int(c[0])
+            if (hwm is None or ts > hwm) and ts + step <= now_ms:
+                fresh[ts] = c[:COLUMNS]
+        if not fresh:
+            return 0
+
+        rows = np.asarray([fresh[ts] for ts in sorted(fresh)], dtype=DTYPE)
+        path = self.path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._truncate_torn_row(path)
+        with open(path, 'ab') as f:
+            f.write(rows.tobytes())
+        return len(rows)
+
+    # ================= SYNC =================
+
+    def missing_since(self, symbol, timeframe, limit, now_ms):
+        """
+        Open time of the first candle the exchange still has to send.
+
+        Continues from the high-water mark so the file stays gap-free; if
+        the gap is longer than CANDLE_MAX_BACKFILL candles, starts again
+        just far enough back to cover `limit`.
+        """
+        step = timeframe_ms(timeframe)
+        live_open = now_ms - now_ms % step
+        window_start = live_open - limit * step
+        hwm = self.high_water_mark(symbol, timeframe)
+
+        if hwm is None:
+            return window_start
+        gap = (live_open - hwm) // step - 1
+        if gap > config.CANDLE_MAX_BACKFILL:
+            return window_start
+        return hwm + step
+
+    async def sync(self, exchange, symbol, timeframe, limit, live=True):
+        """
+        Fetch whatever is missing for the last `limit` closed candles.
+
+        Returns the still-forming candle when `live` is set (that costs
+        one small request even when the file is current), else None.
+        """
+        step = timeframe_ms(timeframe)
+        now_ms = _now_ms(exchange)
+        since = self.missing_since(symbol, timeframe, limit, now_ms)
+        live_open = now_ms - now_ms % step
+
+        if since >= live_open and not live:
+            return None
+
+        live_candle = None
+        while True:
+            page = _page_size(since, live_open, step, 1)
+            batch = await exchange.fetch_ohlcv(
+                symbol, timeframe, since=since, limit=page)
+            if not batch:
+                break
+            self.append(symbol, timeframe, batch, now_ms)
+            if batch[-1][0] >= live_open:
+                live_candle = batch[-1]
+                break
+            if len(batch) < page:
+                break
+            since = batch[-1][0] + step
+
+        return live_candle if live else None
+
+    async def read_range(self, exchange, symbol, timeframe, since):
+        """
+        Closed candles from `since` on. The file only grows forward, so an
+        older stretch it does not cover is fetched into memory, not stored.
+        """
+        view = self.read(symbol, timeframe, since=since)
+        stored = self.read(symbol, timeframe, limit=None)
+        if len(stored) == 0 or stored[0, 0] <= since:
+            return view
+
+        step = timeframe_ms(timeframe)
+        first = stored[0, 0]
+        prefix = []
+        while since < first:
+            batch = await exchange.fetch_ohlcv(
+                symbol, timeframe, since=int(since),
+                limit=_page_size(since, first, step))
+            batch = [c[:COLUMNS] for c in batch if c[0] < first]
+            if not batch:
+                break
+            prefix.extend(batch)
+            since = batch[-1][0] + step
+        if not prefix:
+            return view
+        return np.vstack([np.asarray(prefix, dtype=DTYPE), view])
+
+    async def fetch_ohlcv(self, exchange, symbol, timeframe, limit, live=True):
+        """
+        Drop-in for `exchange.fetch_ohlcv(symbol, timeframe, limit=limit)`:
+        the last `limit` candles as lists (copies, not views), ending with
+        the forming candle unless `live=False`.
+
+        With CANDLE_BASE_TIMEFRAME set, higher timeframes are built from
+        the base series instead of being requested separately.
+        """
+        base = config.CANDLE_BASE_TIMEFRAME
+        if base and timeframe != base and self._derivable(base, timeframe):
+            return await self._fetch_derived(
+                exchange, symbol, base, timeframe, limit, live)
+
+        live_candle = await self.sync(exchange, symbol, timeframe, limit, live)
+        rows = self.read(symbol, timeframe, limit=limit).tolist()
+        if live_candle is not None:
+            rows.append(list(live_candle[:COLUMNS]))
+        return rows[-limit:]
+
+
+    # ================= DERIVED TIMEFRAMES =================
+
+    @staticmethod
+    def _derivable(base, timeframe):
+        return (timeframe_ms(timeframe) > timeframe_ms(base)
+                and timeframe_ms(timeframe) % timeframe_ms(base) == 0)
+
+    async def _fetch_derived(self, exchange, symbol, base, timeframe, limit, live):
+        from resample import Resampler, resample_ohlcv
+
+        step = timeframe_ms(timeframe)
+        base_step = timeframe_ms(base)
+        now_ms = _now_ms(exchange)
+        live_open = now_ms - now_ms % step
+
+        live_base = await self.sync(
+            exchange, symbol, base, limit=(limit + 1) * (step // base_step), live=live)
+
+        key = (symbol, base, timeframe)
+        resampler = self._resamplers.get(key)
+        if resampler is None:
+            # First use in this process: catch the derived file up in one
+            # vectorized pass, then aggregate base candles as they arrive
+            hwm = self.high_water_mark(symbol, timeframe)
+            since = hwm + step if hwm is not None else live_open - limit * step
+            history = await self.read_range(exchange, symbol, base, since)
+            derived, complete = resample_ohlcv(history, base, timeframe)
+            await self._append_derived(
+                exchange, symbol, timeframe, derived[complete], limit, now_ms)
+            resampler = self._resamplers[key] = Resampler(base, (timeframe,))
+            resampler.last_ts = live_open - base_step
+
+        for candle in self.read(symbol, base, since=resampler.last_ts + base_step):
+            closed = resampler.update(candle)
+            if closed:
+                await self._append_derived(
+                    exchange, symbol, timeframe, closed[timeframe], limit, now_ms)
+
+        # The newest bucket may have been dropped too, with nothing after
+        # it yet to show the hole
+        hwm = self.high_water_mark(symbol, timeframe)
+        if hwm is not None and hwm < live_open - step:
+            await self.sync(exchange, symbol, timeframe, limit, live=False)
+
+        rows = self.read(symbol, timeframe, limit=limit).tolist()
+        if live:
+            current = resampler.live(timeframe, live_base)
+            if current is not None:
+                rows.append(list(current))
+        return rows[-limit:]
+
+    async def _append_derived(self, exchange, symbol, timeframe, candles, limit, now_ms):
+        """
+        Append derived candles, unless a bucket was dropped (base candles
+        missing) before them: the file only grows forward, so that hole
+        would stay for good. The exchange's own candles fill it instead.
+        """
+        step = timeframe_ms(timeframe)
+        hwm = self.high_water_mark(symbol, timeframe)
+        opens = [int(c[0]) for c in candles if hwm is None or c[0] > hwm]
+        if not opens:
+            return
+        expected = opens[0] if hwm is None else hwm + step
+        if opens != list(range(expected, expected + len(opens) * step, step)):
+            print(f"⚠️ {symbol} {timeframe}: base candles missing, "
+                  f"fetching {timeframe} from the exchange")
+            await self.sync(exchange, symbol, timeframe, limit, live=False)
+            return
+        self.append(symbol, timeframe, candles, now_ms)
+
+
+_shared = None
+
+
+def get_store():
+    """Process-wide store, so memory maps are reused between scans."""
+    global _shared
+    if _shared is None:
+        _shared = CandleStore()
+    return _shared
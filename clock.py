@@ -0,0 +1,106 @@
+"""
+Exchange server time and candle-close triggers.
+
+Candles open and close on the exchange's clock, not ours. ExchangeClock
+keeps the offset between the two, measured with fetch_time() at the
+midpoint of the request's round trip, and schedules work for just after
+a candle closes:
+
+    close_ms, closed = await get_clock().wait_for_close(['1m', '15m'])
+
+The candle store reads the same clock, so "closed" means the same thing
+to the scheduler and to the data it fetches.
+"""
+import asyncio
+import time
+
+import config
+
+_UNIT_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def timeframe_ms(timeframe):
+    """'15m' -> 900000"""
+    return int(timeframe[:-1]) * _UNIT_MS[timeframe[-1]]
+
+
+def _local_ms(exchange=None):
+    if exchange is not None and hasattr(exchange, 'milliseconds'):
+        return exchange.milliseconds()
+    return int(time.time() * 1000)
+
+
+class ExchangeClock:
+
+    def __init__(self, settle_ms=None):
+        self.settle_ms = config.CLOCK_SETTLE_MS if settle_ms is None else settle_ms
+        self.offset_ms = 0       # server time minus local time
+        self.rtt_ms = None
+        self.synced_at = None    # time.monotonic() of the last sync
+
+    @property
+    def stale(self):
+        return (self.synced_at is None
+                or time.monotonic() - self.synced_at >= config.CLOCK_RESYNC_SECONDS)
+
+    async def sync(self, exchange):
+        """Measure the offset with one fetch_time() request; returns it."""
+        before = _local_ms(exchange)
+        server = await exchange.fetch_time()
+        after = _local_ms(exchange)
+        offset = int(round(server - (before + after) / 2))
+
+        if self.synced_at is None and abs(offset) >= config.CLOCK_DRIFT_WARN_MS:
+            print(f"⚠️ Local clock is {-offset:+d} ms off the exchange; "
+                  f"scheduling on exchange time.")
+
+        self.offset_ms = offset
+        self.rtt_ms = after - before
+        self.synced_at = time.monotonic()
+        return offset
+
+    def now_ms(self, exchange=None):
+        """Exchange time in ms."""
+        return _local_ms(exchange) + self.offset_ms
+
+    def next_close(self, timeframe, now_ms=None):
+        """Close time of the `timeframe` candle forming at `now_ms`."""
+        step = timeframe_ms(timeframe)
+        now_ms = self.now_ms() if now_ms is None else now_ms
+        return now_ms - now_ms % step + step
+
+    async def wait_for_close(self, timeframes, exchange=None):
+        """
+        Sleep until settle_ms after the next close of any of `timeframes`.
+        Returns (close time in ms, the timeframes that closed then).
+        """
+        close_ms = min(self.next_close(tf, self.now_ms(exchange)) for tf in timeframes)
+        # Loop in case the sleep wakes a little early
+        while (wait := close_ms + self.settle_ms - self.now_ms(exchange)) > 0:
+            await asyncio.sleep(wait / 1000)
+        return close_ms, [tf for tf in timeframes if close_ms % timeframe_ms(tf) == 0]
+
+
+async def run_on_close(timeframe, job):
+    """
+    await job() right after every close of `timeframe` until cancelled.
+    Closes that pass while a job is still running are skipped.
+    """
+    clock = get_clock()
+    while True:
+        await clock.wait_for_close([timeframe])
+        try:
+            await job()
+        except Exception as e:
+            print(f"⚠️ {timeframe} close job failed: {type(e).__name__}: {e}")
+
+
+_shared = None
+
+
+def get_clock():
+    """Process-wide clock, shared by the scanners and the candle store."""
+    global _shared
+    if _shared is None:
+        _shared = ExchangeClock()
+    return _shared
@@ -0,0 +1,327 @@
+"""
+Partitioned Liquidity Radar across several scanner processes or hosts.
+
+    coordinator  assigns the symbol universe to live workers with a
+                 consistent-hash ring; when a worker's heartbeat goes
+                 stale its symbols move to the others (and only those move)
+    worker       scans its own partition with its own exchange client,
+                 so each one has its own connection and rate-limit budget
+    sink         reads worker results, dedupes, logs to the database and
+                 sends the Telegram / Square notifications (one place)
+
+The broker is a SQLite file (CLUSTER_DB), which is enough for one machine
+or a shared volume:
+
+    python cluster.py local --workers 3        # everything on this machine
+    python cluster.py coordinator
+    python cluster.py worker --id scanner-a
+    python cluster.py sink
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from bisect import bisect
+from datetime import datetime, timedelta
+
+import config
+from exchanges import create_async_exchange
+from universe import get_universe
+
+VIRTUAL_NODES = 64
+
+
+# ============================================================
+# CONSISTENT HASHING
+# ============================================================
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Each worker owns VIRTUAL_NODES points; a symbol goes to the next one."""
+
+    def __init__(self, nodes, vnodes=VIRTUAL_NODES):
+        points = sorted(
+            (_hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self._keys = [p for p, _ in points]
+        self._nodes = [n for _, n in points]
+
+    def owner(self, key):
+        if not self._nodes:
+            return None
+        return self._nodes[bisect(self._keys, _hash(key)) % len(self._nodes)]
+
+    def assign(self, keys):
+        """{node: [keys]} keeping the input order inside each partition."""
+        out = {}
+        for key in keys:
+            out.setdefault(self.owner(key), []).append(key)
+        return out
+
+
+# ============================================================
+# BROKER (SQLite)
+# ============================================================
+
+class Broker:
+
+    def __init__(self, path=None):
+        self.path = path or config.CLUSTER_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                host TEXT,
+                last_seen REAL
+            );
+            CREATE TABLE IF NOT EXISTS assignments (
+                symbol TEXT PRIMARY KEY,
+                worker_id TEXT,
+                rank INTEGER,
+                epoch INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                worker_id TEXT,
+                symbol TEXT,
+                scan_time TEXT,
+                payload TEXT,
+                consumed INTEGER DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_pending ON results(consumed, id);
+            CREATE INDEX IF NOT EXISTS idx_results_time ON results(scan_time);
+        """)
+
+    # ---------- workers ----------
+
+    def heartbeat(self, worker_id):
+        self.conn.execute(
+            "INSERT INTO workers (worker_id, host, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT(worker_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (worker_id, socket.gethostname(), time.time()))
+
+    def live_workers(self, timeout):
+        rows = self.conn.execute(
+            "SELECT worker_id FROM workers WHERE last_seen >= ? ORDER BY worker_id",
+            (time.time() - timeout,))
+        return [r[0] for r in rows]
+
+    def leave(self, worker_id):
+        self.conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    # ---------- assignments ----------
+
+    def epoch(self):
+        return self.conn.execute("SELECT COALESCE(MAX(epoch), 0) FROM assignments").fetchone()[0]
+
+    def current_assignment(self):
+        return dict(self.conn.execute("SELECT symbol, worker_id FROM assignments"))
+
+    def replace_assignment(self, owners, ranks, epoch):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute("DELETE FROM assignments")
+            self.conn.executemany(
+                "INSERT INTO assignments (symbol, worker_id, rank, epoch) VALUES (?, ?, ?, ?)",
+                [(s, w, ranks[s], epoch) for s, w in owners.items()])
+
+    def partition(self, worker_id):
+        rows = self.conn.execute(
+            "SELECT symbol FROM assignments WHERE worker_id = ? ORDER BY rank", (worker_id,))
+        return [r[0] for r in rows]
+
+    # ---------- results ----------
+
+    def publish(self, worker_id, scan_time, results):
+        self.conn.executemany(
+            "INSERT INTO results (worker_id, symbol, scan_time, payload) VALUES (?, ?, ?, ?)",
+            [(worker_id, symbol, scan_time, json.dumps(result, default=float))
+             for symbol, result in results])
+
+    def take_results(self):
+        """Unconsumed results in arrival order, marked consumed atomically."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                "SELECT r.id, r.symbol, r.scan_time, r.payload FROM results r "
+                "LEFT JOIN assignments a ON a.symbol = r.symbol "
+                "WHERE r.consumed = 0 ORDER BY r.scan_time, a.rank, r.id").fetchall()
+            if rows:
+                self.conn.execute(
+                    "UPDATE results SET consumed = 1 WHERE consumed = 0 AND id <= ?",
+                    (max(r[0] for r in rows),))
+        return [(symbol, scan_time, json.loads(payload)) for _, symbol, scan_time, payload in rows]
+
+    def prune_results(self, max_age):
+        """
+        Delete consumed results, and unconsumed ones older than `max_age`
+        seconds (no sink was there to take them). Returns how many.
+        """
+        cutoff = (datetime.utcnow() - timedelta(seconds=max_age)).isoformat()
+        return self.conn.execute(
+            "DELETE FROM results WHERE consumed = 1 OR scan_time < ?", (cutoff,)).rowcount
+
+
+# ============================================================
+# ROLES
+# ============================================================
+
+async def run_coordinator(broker, once=False):
+    """Keep the assignment equal to the ring over the live workers."""
+    exchange = create_async_exchange()
+    epoch = broker.epoch()
+    try:
+        await exchange.load_markets()
+        while True:
+            universe = await get_universe().refresh(exchange)
+            symbols = universe.top(config.CLUSTER_SYMBOL_LIMIT, exclude=config.EXCLUDED_PAIRS)
+            live = broker.live_workers(config.CLUSTER_HEARTBEAT_TIMEOUT)
+            parts = HashRing(live).assign(symbols)
+            owners = {s: worker_id for worker_id, part in parts.items() for s in part}
+            if live and owners != broker.current_assignment():
+                epoch += 1
+                broker.replace_assignment(
+                    owners, {s: i for i, s in enumerate(symbols)}, epoch)
+                sizes = {w: len(p) for w, p in parts.items()}
+                print(f"🧭 Epoch {epoch}: {len(symbols)} symbols over {len(live)} workers {sizes}")
+            if once:
+                return
+            await asyncio.sleep(config.CLUSTER_HEARTBEAT_SECONDS)
+    finally:
+        await exchange.close()
+
+
+async def _scan_partition(exchange, broker, worker_id, symbols):
+    import local_scanner_v2 as radar
+    scan_time = datetime.utcnow().isoformat()
+    daily_levels = await radar.preload_daily_levels(exchange, symbols)
+    results = []
+    for symbol in symbols:
+        if symbol not in daily_levels:
+            continue
+        try:
+            price, funding, ohlcv = await radar.fetch_liquidity_inputs(exchange, symbol)
+            result = radar.analyze_liquidity(
+                symbol, ohlcv, price, funding,
+                daily_levels[symbol]['high'], daily_levels[symbol]['low'])
+        except Exception as e:
+            print(f"⚠️ [{worker_id}] {symbol} skipped: {type(e).__name__}: {e}")
+            continue
+        if result is not None:
+            results.append((symbol, result))
+    broker.publish(worker_id, scan_time, results)
+    print(f"🔎 [{worker_id}] scanned {len(symbols)} symbols, {len(results)} results")
+
+
+async def run_worker(broker, worker_id, scans=None):
+    """Heartbeat continuously; scan the assigned partition every interval."""
+    exchange = create_async_exchange()
+
+    async def beat():
+        while True:
+            try:
+                broker.heartbeat(worker_id)
+            except sqlite3.Error as e:
+                # Missed beats past the timeout hand our symbols to others
+                print(f"⚠️ [{worker_id}] heartbeat failed: {type(e).__name__}: {e}")
+            await asyncio.sleep(config.CLUSTER_HEARTBEAT_SECONDS)
+
+    heart = asyncio.create_task(beat())
+    done = 0
+    try:
+        await exchange.load_markets()
+        while True:
+            if heart.done():
+                # Without a heartbeat we would keep scanning symbols that
+                # the coordinator has already moved: stop instead
+                heart.result()
+                raise RuntimeError(f"[{worker_id}] heartbeat task stopped")
+            started = time.time()
+            symbols = broker.partition(worker_id)
+            if symbols:
+                await _scan_partition(exchange, broker, worker_id, symbols)
+                done += 1
+                if scans is not None and done >= scans:
+                    return
+            # Unassigned (just joined): check again after the next heartbeat
+            wait = config.CLUSTER_SCAN_SECONDS if symbols else config.CLUSTER_HEARTBEAT_SECONDS
+            await asyncio.sleep(max(0.0, wait - (time.time() - started)))
+    finally:
+        heart.cancel()
+        broker.leave(worker_id)
+        await exchange.close()
+
+
+def run_sink(broker, once=False):
+    """Dedupe and notify; one Telegram message per poll with new alerts."""
+    import local_scanner_v2 as radar
+    last_prune = 0.0
+    while True:
+        if time.time() - last_prune >= 60:
+            pruned = broker.prune_results(config.CLUSTER_RESULT_RETENTION_SECONDS)
+            if pruned:
+                print(f"🧹 sink: pruned {pruned} old results")
+            last_prune = time.time()
+        alerts = []
+        for symbol, scan_time, result in broker.take_results():
+            try:
+                radar.apply_liquidity_result(symbol, result, alerts, scan_time)
+            except Exception as e:
+                print(f"⚠️ sink: {symbol} not applied: {type(e).__name__}: {e}")
+        if alerts:
+            radar.send_radar_alerts(alerts)
+        if once:
+            return
+        time.sleep(config.CLUSTER_SINK_POLL_SECONDS)
+
+
+def run_local(workers, db=None):
+    """Coordinator, sink and `workers` workers as child processes."""
+    me = [sys.executable, os.path.abspath(__file__)]
+    extra = ['--db', db] if db else []
+    procs = [subprocess.Popen(me + ['coordinator'] + extra),
+             subprocess.Popen(me + ['sink'] + extra)]
+    procs += [subprocess.Popen(me + ['worker', '--id', f"local-{i}"] + extra)
+              for i in range(workers)]
+    try:
+        for proc in procs:
+            proc.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs:
+            proc.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitioned Liquidity Radar")
+    parser.add_argument('role', choices=('coordinator', 'worker', 'sink', 'local'))
+    parser.add_argument('--id', default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--db', default=None)
+    args = parser.parse_args()
+
+    if args.role == 'local':
+        run_local(args.workers, args.db)
+        return
+    broker = Broker(args.db)
+    if args.role == 'coordinator':
+        asyncio.run(run_coordinator(broker))
+    elif args.role == 'worker':
+        asyncio.run(run_worker(broker, args.id))
+    else:
+        run_sink(broker)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Shared scanner settings.
+
+Everything here can be overridden from the environment (or .env), so the
+GitHub job and local runs can tune the scanners without code changes.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    if not value:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+_scratch = None
+
+
+def _state_path(env_name, name):
+    """
+    Where local scanner state (candle store, cadence) lives unless set
+    explicitly. A recorded or replayed run starts from an empty scratch
+    copy, so the replay asks the exchange exactly what the recording did;
+    the fake backend keeps its own.
+    """
+    global _scratch
+    if os.getenv(env_name):
+        return os.getenv(env_name)
+    if os.getenv("SCANNER_RECORD") or os.getenv("SCANNER_REPLAY"):
+        if _scratch is None:
+            _scratch = tempfile.mkdtemp(prefix="scanner-session-")
+            atexit.register(shutil.rmtree, _scratch, True)
+        return os.path.join(_scratch, name)
+    if os.getenv("SCANNER_EXCHANGE") == "fake":
+        # Synthetic candles use real symbol names; keep them out of the
+        # live store, which would otherwise serve them to live scans
+        return os.path.join("data", "fake", name)
+    return os.path.join("data", name)
+
+
+# ================= UNIVERSE =================
+
+# Pairs the Liquidity Radar never scans (TradFi perps with no PDH/PDL logic)
+EXCLUDED_PAIRS = _env_list(
+    "EXCLUDED_PAIRS", ["XAU/USDT:USDT", "XAG/USDT:USDT", "TSLA/USDT:USDT"])
+
+# How long one fetch_tickers() snapshot is reused by every scanner
+UNIVERSE_REFRESH_SECONDS = int(os.getenv("UNIVERSE_REFRESH_SECONDS", "60"))
+
+RADAR_SYMBOL_LIMIT = int(os.getenv("RADAR_SYMBOL_LIMIT", "50"))
+
+# Wall-time budget of one radar scan; symbols not started by then are
+# reported as skipped. Keep it under the GitHub job's 3-minute timeout.
+SCAN_DEADLINE_SECONDS = float(os.getenv("SCAN_DEADLINE_SECONDS", "150"))
+
+# Held while a scan runs; a second scan started meanwhile steps aside
+SCAN_LOCK_PATH = os.getenv("SCAN_LOCK_PATH", os.path.join("data", "radar.lock"))
+
+# analyze_liquidity ignores strong signals further than this from both
+# PDH and PDL
+MAX_SIGNAL_DISTANCE = float(os.getenv("MAX_SIGNAL_DISTANCE", "0.015"))
+
+# Skip the funding/ticker/15m fetches for symbols whose snapshot price is
+# further than MAX_SIGNAL_DISTANCE + PREFILTER_MARGIN from both levels.
+# The margin covers sweeps and the snapshot's age.
+RADAR_PREFILTER = os.getenv("RADAR_PREFILTER", "1") not in ("0", "false")
+PREFILTER_MARGIN = float(os.getenv("PREFILTER_MARGIN", "0.005"))
+
+# The distance cut in analyze_liquidity spares the one-star compression
+# (⚡ pre-explosion) alert, so far symbols can still raise it. With this on
+# the prefilter leaves them in the closed-candle scan after each 15m close
+# and only drops them from intra-candle scans; off drops them everywhere
+# (fewest requests, no compression alerts for far symbols).
+PREFILTER_KEEP_COMPRESSION = os.getenv("PREFILTER_KEEP_COMPRESSION", "1") not in ("0", "false")
+
+# Rescan each radar symbol every 1/5/15 minutes depending on how close it
+# is to PDH/PDL (cadence.py); off = every symbol every scan
+ADAPTIVE_CADENCE = os.getenv("ADAPTIVE_CADENCE", "1") not in ("0", "false")
+CADENCE_PATH = _state_path("CADENCE_PATH", "radar_cadence.json")
+CADENCE_NEAR_DISTANCE = float(os.getenv("CADENCE_NEAR_DISTANCE", "0.005"))
+
+# Most the radar module may spend importing before its first request
+# (checked by `python local_scanner_v2.py --check-imports`)
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "250"))
+
+# Daemon mode keeps one exchange session between scans. Before each scan
+# it pings fetch_time(); a ping slower than SESSION_PING_TIMEOUT, or
+# SESSION_MAX_FAILURES scans in a row that failed outright, reconnects.
+SESSION_PING_TIMEOUT = float(os.getenv("SESSION_PING_TIMEOUT", "5"))
+SESSION_MAX_FAILURES = int(os.getenv("SESSION_MAX_FAILURES", "3"))
+
+# The daemon scans the radar's closed 15m candle right after it closes;
+# between closes it re-checks the cadence-due symbols on the forming
+# candle every minute (5 without ADAPTIVE_CADENCE). 0 = closes only.
+RADAR_INTRA_CANDLE = os.getenv("RADAR_INTRA_CANDLE", "1") not in ("0", "false")
+
+# A --once run (the */5 GitHub cron) that starts within this many seconds
+# after a 15m close on the exchange's clock scans the closed candle; later
+# runs check the forming one. Keep it equal to the cron interval.
+ONCE_CLOSED_WINDOW_SECONDS = float(os.getenv("ONCE_CLOSED_WINDOW_SECONDS", "300"))
+
+# Also post the high-probability radar alerts to Binance Square (needs
+# BINANCE_SQUARE_KEY). Off unless asked for: the radar never actually
+# posted before, so switching it on is a publishing decision.
+SQUARE_POSTING = os.getenv("SQUARE_POSTING", "0") not in ("0", "false")
+
+# Processes for the per-symbol analysis (sharding.py); 1 = in-process,
+# 0 = one per CPU
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "1"))
+
+# ================= CLOCK =================
+
+# Triggers fire this long after a candle closes on the exchange's clock,
+# giving it time to publish the final kline
+CLOCK_SETTLE_MS = int(os.getenv("CLOCK_SETTLE_MS", "1500"))
+
+# Re-measure the local/exchange clock offset at least this often
+CLOCK_RESYNC_SECONDS = float(os.getenv("CLOCK_RESYNC_SECONDS", "900"))
+
+# Offsets at least this large are reported on the first sync
+CLOCK_DRIFT_WARN_MS = int(os.getenv("CLOCK_DRIFT_WARN_MS", "1000"))
+
+# ================= CANDLE STORE =================
+
+CANDLE_STORE_DIR = _state_path("CANDLE_STORE_DIR", "candles")
+
+# Longest gap (in candles) backfilled from the high-water mark before the
+# store gives up on continuity and refetches just the requested window
+CANDLE_MAX_BACKFILL = int(os.getenv("CANDLE_MAX_BACKFILL", "5000"))
+
+# Build higher timeframes (15m, 2h, 1d) from this one instead of asking the
+# exchange for each, e.g. "1m". Worth it once the store persists between
+# runs; leave empty for one-shot jobs that start with an empty store.
+CANDLE_BASE_TIMEFRAME = os.getenv("CANDLE_BASE_TIMEFRAME", "")
+
+# ================= OUTCOMES =================
+
+# outcomes.py: a radar target counts as reached if price gets there before
+# moving OUTCOME_ADVERSE_PCT against the signal, within OUTCOME_HORIZON_HOURS
+OUTCOME_TIMEFRAME = os.getenv("OUTCOME_TIMEFRAME", "15m")
+OUTCOME_ADVERSE_PCT = float(os.getenv("OUTCOME_ADVERSE_PCT", "1.0"))
+OUTCOME_HORIZON_HOURS = float(os.getenv("OUTCOME_HORIZON_HOURS", "24"))
+
+# ================= RETENTION =================
+
+# retention.py keeps this many days in liquidity_radar.db and moves older
+# rows to one zstd Parquet file per table and day under ARCHIVE_DIR
+RETENTION_DAYS = float(os.getenv("RETENTION_DAYS", "30"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join("data", "archive"))
+# Free pages returned to the filesystem per run (PRAGMA incremental_vacuum)
+VACUUM_PAGES = int(os.getenv("VACUUM_PAGES", "2000"))
+
+# ================= PLANNER =================
+
+# Seconds between background price refreshes on the trade planner page
+PLANNER_PRICE_SECONDS = float(os.getenv("PLANNER_PRICE_SECONDS", "5"))
+
+# ================= EXCHANGE =================
+
+# "binance" (live) or "fake" (fake_exchange.FakeExchange, fully offline)
+EXCHANGE_BACKEND = os.getenv("SCANNER_EXCHANGE", "binance")
+
+FAKE_SYMBOLS = int(os.getenv("FAKE_SYMBOLS", "200"))
+FAKE_SEED = int(os.getenv("FAKE_SEED", "7"))
+FAKE_LATENCY_MS = _env_list("FAKE_LATENCY_MS", ["0", "0"])  # "min,max"
+FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0"))
+FAKE_RATE_LIMIT = int(os.getenv("FAKE_RATE_LIMIT", "0"))    # weight per minute, 0 = off
+FAKE_NOW_MS = int(os.getenv("FAKE_NOW_MS", "0"))            # freeze the fake clock, 0 = real time
+FAKE_CLOCK_OFFSET_MS = int(os.getenv("FAKE_CLOCK_OFFSET_MS", "0"))  # fake server time minus local
+
+# ================= REQUEST RESILIENCE =================
+
+def _env_timeouts(name, default):
+    """"fetch_ohlcv=8,fetch_ticker=5" -> {"fetch_ohlcv": 8.0, ...} over the defaults."""
+    out = dict(default)
+    for item in _env_list(name, []):
+        method, _, seconds = item.partition("=")
+        out[method.strip()] = float(seconds)
+    return out
+
+
+# Wrap the async client in resilience.ResilientExchange (timeouts, hedging, breaker)
+REQUEST_RESILIENCE = os.getenv("REQUEST_RESILIENCE", "1") not in ("0", "false")
+
+# Seconds per call, including ccxt's own rate-limit wait
+REQUEST_TIMEOUTS = _env_timeouts("REQUEST_TIMEOUTS", {
+    "default": 10.0,
+    "load_markets": 30.0,
+    "fetch_tickers": 15.0,
+    "fetch_ohlcv": 8.0,
+    "fetch_ticker": 5.0,
+    "fetch_funding_rate": 5.0,
+})
+
+# Send a duplicate read once the first exceeds the endpoint's p95 latency
+REQUEST_HEDGING = os.getenv("REQUEST_HEDGING", "1") not in ("0", "false")
+
+# Consecutive network errors/timeouts that open an endpoint's breaker,
+# and how long it then fails fast before one trial call
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+
+# ================= RECORD / REPLAY =================
+
+# Append every exchange request/response of a run to this gzip JSONL file
+RECORD_PATH = os.getenv("SCANNER_RECORD", "")
+
+# Serve a recorded session instead of any exchange ("original" or "max" speed)
+REPLAY_PATH = os.getenv("SCANNER_REPLAY", "")
+REPLAY_SPEED = os.getenv("REPLAY_SPEED", "max")
+REPLAY_SESSION = int(os.getenv("REPLAY_SESSION", "-1"))   # -1 = latest in the file
+
+# ================= PROFILING =================
+
+# Same as local_scanner_v2.py --profile: wrap each scan in profiling.profiled()
+PROFILE = os.getenv("SCANNER_PROFILE", "") not in ("", "0", "false")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+PROFILE_SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "5"))
+
+# ================= CLUSTER =================
+
+# SQLite broker shared by coordinator, workers and sink (cluster.py)
+CLUSTER_DB = os.getenv("CLUSTER_DB", os.path.join("data", "cluster.db"))
+CLUSTER_SYMBOL_LIMIT = int(os.getenv("CLUSTER_SYMBOL_LIMIT", "400"))
+CLUSTER_SCAN_SECONDS = float(os.getenv("CLUSTER_SCAN_SECONDS", "300"))
+CLUSTER_HEARTBEAT_SECONDS = float(os.getenv("CLUSTER_HEARTBEAT_SECONDS", "5"))
+# A worker silent for this long loses its symbols to the others
+CLUSTER_HEARTBEAT_TIMEOUT = float(os.getenv("CLUSTER_HEARTBEAT_TIMEOUT", "30"))
+CLUSTER_SINK_POLL_SECONDS = float(os.getenv("CLUSTER_SINK_POLL_SECONDS", "2"))
+# Unconsumed results older than this are dropped when the sink prunes
+CLUSTER_RESULT_RETENTION_SECONDS = float(
+    os.getenv("CLUSTER_RESULT_RETENTION_SECONDS", "3600"))
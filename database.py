@@ -1,35 +1,89 @@
 import sqlite3
+import threading
 from datetime import datetime
 
-conn = sqlite3.connect("liquidity_radar.db")
-cursor = conn.cursor()
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS liquidity_logs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    scan_time TEXT,
-    symbol TEXT,
-    price REAL,
-    signal TEXT,
-    score INTEGER,
-    funding REAL,
-    volume_ratio REAL,
-    volatility_ratio REAL,
-    target REAL,
-    distance REAL,
-    trade_taken INTEGER DEFAULT 0,
-    trade_result TEXT DEFAULT NULL
-)
-""")
+import pandas as pd
+
+DB_PATH = "liquidity_radar.db"
+
+# One connection per thread: Streamlit reruns pages on worker threads, and
+# a connection shared between threads would mix their transactions (one
+# thread's commit would commit another's half-done writes). Separate
+# connections are serialised by SQLite's file lock instead.
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def connect():
+    """
+    This thread's connection, opened on first use so that importing this
+    module costs nothing (the radar only needs it once it has an alert).
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    with _schema_lock:
+        _create_schema(conn)
+    _local.conn = conn
+    return conn
+
+
+def _create_schema(conn):
+    global _schema_ready
+    if _schema_ready:
+        return
+
+    # Lets retention.py hand freed pages back a few at a time; only takes
+    # effect on a new file (retention.py converts older ones once)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS liquidity_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scan_time TEXT,
+        symbol TEXT,
+        price REAL,
+        signal TEXT,
+        score INTEGER,
+        funding REAL,
+        volume_ratio REAL,
+        volatility_ratio REAL,
+        target REAL,
+        distance REAL,
+        trade_taken INTEGER DEFAULT 0,
+        trade_result TEXT DEFAULT NULL
+    )
+    """)
 
-conn.commit()
+    # Open targets are what the outcome evaluator (outcomes.py) reads
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_liquidity_logs_open
+    ON liquidity_logs(trade_result, id)
+    """)
+
+    conn.commit()
+    _schema_ready = True
+
+
+def __getattr__(name):
+    # `db.conn` / `db.cursor` keep working for callers outside this module
+    if name == 'conn':
+        return connect()
+    if name == 'cursor':
+        return connect().cursor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def log_liquidity_context(symbol, price, signal, score, funding,
                           volume_ratio, volatility_ratio,
                           target, distance, scan_time):
 
-    cursor.execute("""
+    conn = connect()
+
+    conn.execute("""
         INSERT INTO liquidity_logs
         (scan_time, symbol, price, signal, score, funding,
          volume_ratio, volatility_ratio, target, distance)
@@ -47,4 +101,269 @@ def log_liquidity_context(symbol, price, signal, score, funding,
         distance
     ))
 
-    conn.commit()
\ No newline at end of file
+    conn.commit()
+
+
+def get_open_liquidity_logs():
+    """Logged radar signals with a target and no trade_result yet."""
+    return pd.read_sql_query(
+        "SELECT id, scan_time, symbol, price, target FROM liquidity_logs "
+        "WHERE trade_result IS NULL AND target IS NOT NULL ORDER BY id", connect())
+
+
+def set_trade_results(results):
+    """Write [(id, trade_result), ...] in a single transaction."""
+    conn = connect()
+    with conn:
+        conn.executemany(
+            "UPDATE liquidity_logs SET trade_result = ? WHERE id = ?",
+            [(result, int(log_id)) for log_id, result in results])
+
+
+# ============================================================
+# BREAKOUT SIGNALS + POSITIONS
+# ============================================================
+
+# Grades the history page shows unless "show all" is ticked
+TRADABLE_GRADES = ('A+ (Explosive)', 'A (Prime)', 'A (High Volume)',
+                   'B+ (Noisy)', 'B (Weak)')
+
+SIGNAL_COLUMNS = (
+    'id', 'scan_time', 'symbol', 'signal_type', 'signal_price', 'grade',
+    'analysis', 'price_change_2h', 'volume_ratio_2h',
+    'volatility_contraction', 'outcome', 'notes',
+)
+
+
+def create_tables():
+
+    conn = connect()
+
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS signals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scan_time TEXT,
+        symbol TEXT,
+        signal_type TEXT,
+        signal_price REAL,
+        grade TEXT,
+        analysis TEXT,
+        price_change_2h REAL,
+        volume_ratio_2h REAL,
+        volatility_contraction INTEGER,
+        outcome TEXT DEFAULT NULL,
+        notes TEXT DEFAULT NULL
+    );
+
+    -- Grade filter + newest-first paging walk this index, not the table
+    CREATE INDEX IF NOT EXISTS idx_signals_grade_id ON signals(grade, id);
+    CREATE INDEX IF NOT EXISTS idx_signals_symbol_id ON signals(symbol, id);
+
+    -- Chart counts, maintained with every signal insert (see log_signals);
+    -- its size depends on symbols x grades, not on history length
+    CREATE TABLE IF NOT EXISTS signal_rollup (
+        hour INTEGER,
+        symbol TEXT,
+        grade TEXT,
+        signal_type TEXT,
+        signals INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (hour, symbol, grade, signal_type)
+    );
+
+    CREATE TABLE IF NOT EXISTS positions_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        snapshot_time TEXT,
+        symbol TEXT,
+        side TEXT,
+        size REAL,
+        entry_price REAL,
+        mark_price REAL,
+        unrealized_pnl REAL,
+        entry_time_ksa TEXT
+    );
+    """)
+
+    conn.commit()
+
+    # Databases from before the rollup existed get it filled once
+    has_rollup = conn.execute("SELECT 1 FROM signal_rollup LIMIT 1").fetchone()
+    has_signals = conn.execute("SELECT 1 FROM signals LIMIT 1").fetchone()
+    if has_signals and not has_rollup:
+        backfill_rollups()
+
+
+def log_signals(df, signal_type):
+    """Store the breakout scanner's rows (scanner.py column names)."""
+    conn = connect()
+    scan_time = datetime.now().isoformat()
+
+    rows = [
+        (scan_time, r['Symbol'], signal_type, float(r['Price']), r['Grade'],
+         r['Analysis'], float(r['Price Change (2h) %']),
+         float(r['Volume Ratio (2h)']), int(bool(r['Volatility Contraction'])))
+        for r in df.to_dict('records')
+    ]
+
+    hour = int(scan_time[11:13])
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO signals
+            (scan_time, symbol, signal_type, signal_price, grade, analysis,
+             price_change_2h, volume_ratio_2h, volatility_contraction)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+        # Same transaction: the rollup never disagrees with the table
+        conn.executemany("""
+            INSERT INTO signal_rollup (hour, symbol, grade, signal_type, signals)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT (hour, symbol, grade, signal_type)
+            DO UPDATE SET signals = signals + 1
+        """, [(hour, r[1], r[4], signal_type) for r in rows])
+
+
+def log_position_snapshot(positions_df):
+
+    if positions_df is None or positions_df.empty:
+        return
+
+    conn = connect()
+
+    snapshot_time = datetime.now().isoformat()
+
+    rows = [
+        (snapshot_time, r['Symbol'], r['Side'], float(r['Size']),
+         float(r['Entry Price'] or 0), float(r['Mark Price'] or 0),
+         float(r['Unrealized PnL'] or 0), r['Entry Time (KSA)'])
+        for r in positions_df.to_dict('records')
+    ]
+
+    conn.executemany("""
+        INSERT INTO positions_log
+        (snapshot_time, symbol, side, size, entry_price, mark_price,
+         unrealized_pnl, entry_time_ksa)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+    conn.commit()
+
+
+def get_positions_log():
+    return pd.read_sql_query(
+        "SELECT * FROM positions_log ORDER BY id DESC", connect())
+
+
+# ============================================================
+# SIGNAL HISTORY QUERIES
+# ============================================================
+
+def _grade_filter(grades):
+    """(" WHERE grade IN (?, ...)", params) or ("", ()) for all grades."""
+    if not grades:
+        return "", ()
+    marks = ", ".join("?" * len(grades))
+    return f" WHERE grade IN ({marks})", tuple(grades)
+
+
+def get_historical_signals():
+    """Whole signals table; prefer the paged queries below in pages."""
+    return pd.read_sql_query("SELECT * FROM signals", connect())
+
+
+def count_signals(grades=None):
+    conn = connect()
+    where, params = _grade_filter(grades)
+    return conn.execute(f"SELECT COUNT(*) FROM signals{where}", params).fetchone()[0]
+
+
+def get_signals_page(grades=None, page_size=50, page=0):
+    """One page of signals, newest first, optionally limited to `grades`."""
+    conn = connect()
+    where, params = _grade_filter(grades)
+    columns = ", ".join(SIGNAL_COLUMNS)
+    return pd.read_sql_query(
+        f"SELECT {columns} FROM signals{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+        conn, params=params + (page_size, page * page_size))
+
+
+def get_signal(signal_id):
+    conn = connect()
+    columns = ", ".join(SIGNAL_COLUMNS)
+    return pd.read_sql_query(
+        f"SELECT {columns} FROM signals WHERE id = ?", conn, params=(signal_id,))
+
+
+def max_signal_id():
+    """Changes whenever a signal is added; used as a cache key."""
+    return connect().execute("SELECT COALESCE(MAX(id), 0) FROM signals").fetchone()[0]
+
+
+def signal_summary(grades=None):
+    """Counts by hour of day, by symbol (top 10) and by grade, from the rollup."""
+    conn = connect()
+    where, params = _grade_filter(grades)
+    by_hour = pd.read_sql_query(
+        f"SELECT hour, SUM(signals) AS signals FROM signal_rollup{where} "
+        f"GROUP BY hour ORDER BY hour", conn, params=params)
+    by_symbol = pd.read_sql_query(
+        f"SELECT symbol, SUM(signals) AS signals FROM signal_rollup{where} "
+        f"GROUP BY symbol ORDER BY signals DESC LIMIT 10", conn, params=params)
+    by_grade = pd.read_sql_query(
+        f"SELECT grade, SUM(signals) AS signals FROM signal_rollup{where} "
+        f"GROUP BY grade ORDER BY signals DESC", conn, params=params)
+    return {
+        'hour': by_hour.set_index('hour')['signals'],
+        'symbol': by_symbol.set_index('symbol')['signals'],
+        'grade': by_grade.set_index('grade')['signals'],
+    }
+
+
+def backfill_rollups():
+    """Rebuild signal_rollup from the signals table in one transaction."""
+    conn = connect()
+    with conn:
+        conn.execute("DELETE FROM signal_rollup")
+        conn.execute("""
+            INSERT INTO signal_rollup (hour, symbol, grade, signal_type, signals)
+            SELECT CAST(strftime('%H', scan_time) AS INTEGER), symbol, grade,
+                   signal_type, COUNT(*)
+            FROM signals
+            GROUP BY 1, 2, 3, 4
+        """)
+    return conn.execute("SELECT COALESCE(SUM(signals), 0) FROM signal_rollup").fetchone()[0]
+
+
+def update_signal_outcome(signal_id, outcome, notes=""):
+
+    conn = connect()
+
+    conn.execute(
+        "UPDATE signals SET outcome = ?, notes = ? WHERE id = ?",
+        (outcome, notes, int(signal_id)))
+
+    conn.commit()
+
+
+def clear_database(table_name="signals"):
+
+    if table_name not in ("signals", "positions_log", "liquidity_logs"):
+        raise ValueError(f"Unknown table: {table_name}")
+
+    conn = connect()
+
+    with conn:
+        conn.execute(f"DELETE FROM {table_name}")
+        if table_name == "signals":
+            conn.execute("DELETE FROM signal_rollup")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["backfill-rollups"]:
+        create_tables()
+        print(f"Rollups rebuilt from {backfill_rollups()} signals.")
+    else:
+        print("usage: python database.py backfill-rollups")
+        sys.exit(2)
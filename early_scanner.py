@@ -1,8 +1,12 @@
 import asyncio
 from datetime import timezone
+import numpy as np
 import pandas as pd
-import ccxt
-import ccxt.pro as ccxt_pro
+import profiling
+from candle_store import get_store
+from clock import get_clock, run_on_close
+from exchanges import create_async_exchange
+from universe import get_universe
 
 
 async def _get_top_usdt_symbols(exchange, limit=60):
@@ -10,36 +14,77 @@ async def _get_top_usdt_symbols(exchange, limit=60):
     Get top-USDT futures symbols by 24h quote volume.
     This keeps the early scanner fast and focused on big movers.
     """
-    all_tickers = await exchange.fetch_tickers()
-    rows = []
-    for symbol, t in all_tickers.items():
-        # Futures symbols end with ':USDT' in your setup
-        if symbol.endswith(':USDT'):
-            quote_volume = t.get('quoteVolume') or 0
-            rows.append((symbol, quote_volume))
-    if not rows:
-        return []
+    universe = await get_universe().refresh(exchange)
+    return universe.top(limit)
 
-    df = pd.DataFrame(rows, columns=['Symbol', 'QuoteVolume'])
-    df = df.sort_values('QuoteVolume', ascending=False)
-    top = df.head(limit)['Symbol'].tolist()
-    return top
+
+def _early_signal(symbol, last, prev_close, old_range_avg, recent_range_avg,
+                  recent_vol_avg, min_price_move_pct, min_volume_ratio,
+                  timeframe='1m'):
+    """
+    Shared EP/EP+ rules for the batch and streaming detectors.
+
+    `last` is the candle being judged, as a raw ccxt row:
+    [timestamp, open, high, low, close, volume]. `timeframe` is the size
+    of that candle ('1m', or '15s' for trade buckets). The column names
+    stay the 1m schema's; 'Timeframe' says which bucket they measure.
+    """
+    last_ts, last_open, _, _, last_close, last_volume = last[:6]
+
+    if old_range_avg <= 0 or recent_vol_avg <= 0 or prev_close <= 0:
+        return None
+
+    # Compression: recent range significantly smaller than old range
+    is_compressed = recent_range_avg < (old_range_avg * 0.7)
+
+    # Compare last close to previous close (previous candle)
+    price_change_pct = ((last_close - prev_close) / prev_close) * 100
+
+    # Volume ratio: last candle vs avg of the 20 before it
+    vol_ratio = last_volume / recent_vol_avg
+
+    # Require both price + volume explosion
+    if abs(price_change_pct) < min_price_move_pct:
+        return None
+    if vol_ratio < min_volume_ratio:
+        return None
+
+    pressure = "📈 Buyer" if last_close > last_open else "📉 Seller"
+    signal_ts = pd.to_datetime(
+        last_ts, unit='ms').tz_localize(timezone.utc)
+
+    # Optional: simple early-grade label
+    early_grade = "EP+" if vol_ratio >= 3.5 else "EP"
+
+    return {
+        'Symbol': symbol,
+        'Timeframe': timeframe,
+        'Price': last_close,
+        'Signal Time': signal_ts,
+        'Price Change (1m) %': price_change_pct,
+        'Volume Ratio (1m)': vol_ratio,
+        'Volatility Compression (20 vs 20)': is_compressed,
+        'Dominant Pressure': pressure,
+        'Early Grade': early_grade,
+    }
 
 
 async def _analyze_symbol_1m_early(exchange, symbol,
                                    min_price_move_pct=0.35,
-                                   min_volume_ratio=2.0):
+                                   min_volume_ratio=2.0,
+                                   closed=False):
     """
     1-minute 'early' detector:
 
     - Uses last ~40 candles of 1m data
     - Compares last 20 candles vs prior 20 for compression
-    - Checks last candle for:
+    - Checks last candle (forming, or just closed with `closed`) for:
         * Price change >= min_price_move_pct
         * Volume ratio >= min_volume_ratio
     """
     try:
-        ohlcv = await exchange.fetch_ohlcv(symbol, '1m', limit=40)
+        ohlcv = await get_store().fetch_ohlcv(
+            exchange, symbol, '1m', limit=40, live=not closed)
         if len(ohlcv) < 25:
             return None
 
@@ -51,7 +96,6 @@ async def _analyze_symbol_1m_early(exchange, symbol,
         # Split into "old range" and "recent compressed range"
         old_window = df.iloc[-40:-20]
         recent_window = df.iloc[-21:-1]  # 20 candles before the last
-        last = df.iloc[-1]
 
         if old_window.empty or recent_window.empty:
             return None
@@ -61,59 +105,49 @@ async def _analyze_symbol_1m_early(exchange, symbol,
             recent_window['high'] - recent_window['low']).mean()
         recent_vol_avg = recent_window['volume'].mean()
 
-        if old_range_avg <= 0 or recent_vol_avg <= 0:
-            return None
-
-        # Compression: recent range significantly smaller than old range
-        is_compressed = recent_range_avg < (old_range_avg * 0.7)
-
-        # Compare last close to previous close (previous 1m candle)
-        prev_close = recent_window['close'].iloc[-1]
-        price_change_pct = ((last['close'] - prev_close) / prev_close) * 100
-
-        # Volume ratio: last 1m vs avg of last 20m
-        vol_ratio = last['volume'] / \
-            recent_vol_avg if recent_vol_avg > 0 else 0
-
-        # Require both price + volume explosion
-        if abs(price_change_pct) < min_price_move_pct:
-            return None
-        if vol_ratio < min_volume_ratio:
-            return None
-
-        pressure = "📈 Buyer" if last['close'] > last['open'] else "📉 Seller"
-        signal_ts = pd.to_datetime(
-            last['timestamp'], unit='ms').tz_localize(timezone.utc)
-
-        # Optional: simple early-grade label
-        early_grade = "EP+" if vol_ratio >= 3.5 else "EP"
-
-        return {
-            'Symbol': symbol,
-            'Price': last['close'],
-            'Signal Time': signal_ts,
-            'Price Change (1m) %': price_change_pct,
-            'Volume Ratio (1m)': vol_ratio,
-            'Volatility Compression (20 vs 20)': is_compressed,
-            'Dominant Pressure': pressure,
-            'Early Grade': early_grade,
-        }
+        return _early_signal(
+            symbol,
+            ohlcv[-1],
+            prev_close=recent_window['close'].iloc[-1],
+            old_range_avg=old_range_avg,
+            recent_range_avg=recent_range_avg,
+            recent_vol_avg=recent_vol_avg,
+            min_price_move_pct=min_price_move_pct,
+            min_volume_ratio=min_volume_ratio,
+        )
     except Exception as e:
         # Be quiet on most symbols; just debug when needed
         print(f"[EarlyScanner] Error analyzing {symbol}: {e}")
         return None
 
 
+def _early_frame(results):
+    """Build the scan_early_pumps DataFrame from per-symbol result dicts."""
+    df = pd.DataFrame([r for r in results if r is not None])
+    if df.empty:
+        return df
+
+    # Sort by strongest early effects
+    df['Abs Price Change'] = df['Price Change (1m) %'].abs()
+    df['Score'] = df['Abs Price Change'] * df['Volume Ratio (1m)']
+    df = df.sort_values('Score', ascending=False)
+
+    return df
+
+
 async def scan_early_pumps_async(limit_symbols=60,
                                  min_price_move_pct=0.35,
-                                 min_volume_ratio=2.0):
+                                 min_volume_ratio=2.0,
+                                 closed=False):
     """
     Core async function: scans top-volume USDT futures for early pumps/dumps
     using 1m data.
     """
-    exchange = ccxt_pro.binance({'options': {'defaultType': 'future'}})
+    exchange = create_async_exchange()
     try:
         await exchange.load_markets()
+        if get_clock().stale:
+            await get_clock().sync(exchange)
         symbols = await _get_top_usdt_symbols(exchange, limit=limit_symbols)
         if not symbols:
             return pd.DataFrame()
@@ -127,21 +161,13 @@ async def scan_early_pumps_async(limit_symbols=60,
                 s,
                 min_price_move_pct=min_price_move_pct,
                 min_volume_ratio=min_volume_ratio,
+                closed=closed,
             )
             for s in symbols
         ]
         results = await asyncio.gather(*tasks)
 
-        df = pd.DataFrame([r for r in results if r is not None])
-        if df.empty:
-            return df
-
-        # Sort by strongest early effects
-        df['Abs Price Change'] = df['Price Change (1m) %'].abs()
-        df['Score'] = df['Abs Price Change'] * df['Volume Ratio (1m)']
-        df = df.sort_values('Score', ascending=False)
-
-        return df
+        return _early_frame(results)
     finally:
         await exchange.close()
 
@@ -153,10 +179,434 @@ def scan_early_pumps(limit_symbols=60,
     Sync wrapper, so you can call from Streamlit or normal scripts:
         df = scan_early_pumps()
     """
-    return asyncio.run(
+    return profiling.run(
         scan_early_pumps_async(
             limit_symbols=limit_symbols,
             min_price_move_pct=min_price_move_pct,
             min_volume_ratio=min_volume_ratio,
+        ),
+        'early',
+    )
+
+
+async def scan_early_on_close(limit_symbols=60,
+                              min_price_move_pct=0.35,
+                              min_volume_ratio=2.0,
+                              on_signal=None):
+    """
+    Batch scan of each 1m candle right after it closes on the exchange's
+    clock; calls `on_signal(result)` per hit. Runs until cancelled.
+    """
+    on_signal = on_signal or _print_early_signal
+
+    async def job():
+        df = await scan_early_pumps_async(
+            limit_symbols, min_price_move_pct, min_volume_ratio, closed=True)
+        for result in df.to_dict('records'):
+            on_signal(result)
+
+    await run_on_close('1m', job)
+
+
+# ============================================================
+# STREAMING MODE (ccxt.pro kline subscriptions)
+# ============================================================
+
+EARLY_WINDOW = 20        # candles per compression / volume window
+EARLY_MIN_CLOSED = 24    # same warm-up as the batch path (25 candles incl. the live one)
+
+
+class _RollingWindow:
+    """
+    Ring buffer of closed candles (or trade buckets) with running sums.
+
+    Holds the same two windows `_analyze_symbol_1m_early` slices out of
+    a fresh DataFrame (recent = last 20 closed candles, old = the 20
+    closed candles ending where recent starts), but updates them in O(1)
+    per closed candle instead of recomputing.
+    """
+
+    RESUM_EVERY = 4096  # re-add from scratch now and then to cancel float drift
+
+    def __init__(self, window=EARLY_WINDOW):
+        self.window = window
+        self.capacity = 2 * window - 1
+        self.ranges = np.zeros(self.capacity)
+        self.volumes = np.zeros(self.capacity)
+        self.closes = np.zeros(self.capacity)
+        self.count = 0
+        self.last_ts = None
+        self.recent_range_sum = 0.0
+        self.recent_vol_sum = 0.0
+        self.old_range_sum = 0.0
+
+    def push(self, candle):
+        """Add one closed [ts, o, h, l, c, v] candle."""
+        ts, _, high, low, close, volume = candle[:6]
+        if self.last_ts is not None and ts <= self.last_ts:
+            return
+
+        k = self.count
+        w = self.window
+        cap = self.capacity
+        rng = high - low
+
+        # Leaving recent: candle k - w. Entering old: k - w + 1.
+        # Leaving old: k - 2w + 1, which lives in the slot about to be overwritten.
+        if k >= w:
+            self.recent_range_sum -= self.ranges[(k - w) % cap]
+            self.recent_vol_sum -= self.volumes[(k - w) % cap]
+        if k >= cap:
+            self.old_range_sum -= self.ranges[k % cap]
+
+        i = k % cap
+        self.ranges[i] = rng
+        self.volumes[i] = volume
+        self.closes[i] = close
+        self.recent_range_sum += rng
+        self.recent_vol_sum += volume
+        if k - w + 1 >= 0:
+            self.old_range_sum += self.ranges[(k - w + 1) % cap]
+
+        self.count = k + 1
+        self.last_ts = ts
+
+        if self.count % self.RESUM_EVERY == 0:
+            self._resum()
+
+    def _resum(self):
+        k = self.count - 1
+        w = self.window
+        cap = self.capacity
+        recent = [(k - j) % cap for j in range(min(self.count, w))]
+        old = [(k - w + 1 - j) % cap for j in range(self._old_count())]
+        self.recent_range_sum = float(self.ranges[recent].sum())
+        self.recent_vol_sum = float(self.volumes[recent].sum())
+        self.old_range_sum = float(self.ranges[old].sum())
+
+    def _old_count(self):
+        return max(0, min(self.count - self.window + 1, self.window))
+
+    @property
+    def ready(self):
+        return self.count >= EARLY_MIN_CLOSED
+
+    def evaluate(self, symbol, live_candle, min_price_move_pct, min_volume_ratio,
+                 timeframe='1m'):
+        """Judge the live (forming) candle against the closed history."""
+        if not self.ready:
+            return None
+        recent_n = min(self.count, self.window)
+        return _early_signal(
+            symbol,
+            live_candle,
+            prev_close=self.closes[(self.count - 1) % self.capacity],
+            old_range_avg=self.old_range_sum / self._old_count(),
+            recent_range_avg=self.recent_range_sum / recent_n,
+            recent_vol_avg=self.recent_vol_sum / recent_n,
+            min_price_move_pct=min_price_move_pct,
+            min_volume_ratio=min_volume_ratio,
+            timeframe=timeframe,
+        )
+
+
+def _all_usdt_symbols(exchange):
+    return [
+        s for s, m in exchange.markets.items()
+        if s.endswith(':USDT') and m.get('active', True)
+    ]
+
+
+def _is_new_signal(emitted, key):
+    """One alert per candle/bucket, plus an upgrade if EP turns into EP+."""
+    return emitted is None or emitted[0] != key[0] or (
+        emitted[1] == "EP" and key[1] == "EP+")
+
+
+def _print_early_signal(result):
+    print(
+        f"[EarlyScanner] {result['Early Grade']} {result['Symbol']} "
+        f"{result['Timeframe']} {result['Price Change (1m) %']:+.2f}% "
+        f"vol {result['Volume Ratio (1m)']:.1f}x {result['Dominant Pressure']}"
+    )
+
+
+async def _stream_symbol_1m(exchange, symbol, on_signal,
+                            min_price_move_pct, min_volume_ratio):
+    """
+    Keep one symbol's rolling window current from the kline stream and
+    emit as soon as the live candle crosses the EP thresholds.
+    """
+    window = _RollingWindow()
+    live = None
+    emitted = None  # (candle ts, grade) of the last emitted signal
+
+    while True:
+        try:
+            if live is None:
+                # Seed once from REST, then the stream takes over
+                seed = await get_store().fetch_ohlcv(
+                    exchange, symbol, '1m', limit=40)
+                if not seed:
+                    await asyncio.sleep(60)
+                    continue
+                for candle in seed[:-1]:
+                    window.push(candle)
+                live = seed[-1]
+
+            candles = await exchange.watch_ohlcv(symbol, '1m')
+            for candle in candles:
+                if live is not None and candle[0] < live[0]:
+                    continue
+                if live is not None and candle[0] > live[0]:
+                    window.push(live)
+                live = candle
+
+            result = window.evaluate(
+                symbol, live, min_price_move_pct, min_volume_ratio)
+            if result is None:
+                continue
+
+            key = (live[0], result['Early Grade'])
+            if _is_new_signal(emitted, key):
+                emitted = key
+                on_signal(result)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[EarlyScanner] Stream error on {symbol}: {e}")
+            await asyncio.sleep(5)
+
+
+async def watch_early_pumps_async(symbols=None,
+                                  min_price_move_pct=0.35,
+                                  min_volume_ratio=2.0,
+                                  on_signal=None):
+    """
+    Continuous version of `scan_early_pumps_async`.
+
+    Subscribes to 1m klines for every USDT future (or the given symbols)
+    and calls `on_signal(result)` with the same dict the batch scanner
+    returns per row. Runs until cancelled.
+    """
+    on_signal = on_signal or _print_early_signal
+    exchange = create_async_exchange()
+    try:
+        await exchange.load_markets()
+        if symbols is None:
+            symbols = _all_usdt_symbols(exchange)
+
+        print(f"[EarlyScanner] Streaming {len(symbols)} futures pairs (1m)...")
+
+        await asyncio.gather(*[
+            _stream_symbol_1m(exchange, s, on_signal,
+                              min_price_move_pct, min_volume_ratio)
+            for s in symbols
+        ])
+    finally:
+        await exchange.close()
+
+
+def watch_early_pumps(symbols=None,
+                      min_price_move_pct=0.35,
+                      min_volume_ratio=2.0,
+                      on_signal=None):
+    """
+    Blocking entry point for the streaming detector:
+        watch_early_pumps()  # Ctrl+C to stop
+    """
+    return asyncio.run(
+        watch_early_pumps_async(
+            symbols=symbols,
+            min_price_move_pct=min_price_move_pct,
+            min_volume_ratio=min_volume_ratio,
+            on_signal=on_signal,
+        )
+    )
+
+
+# ============================================================
+# TRADE-STREAM MODE (aggregated trades, sub-minute buckets)
+# ============================================================
+
+TRADE_BUCKETS_MS = {'1m': 60_000, '15s': 15_000}  # label -> bucket size
+
+_TRADE_STREAM_OPTIONS = {
+    'defaultType': 'future',
+    'watchTrades': {'name': 'aggTrade'},
+    'tradesLimit': 200,  # cap ccxt's per-symbol trade cache
+}
+
+
+class _TradeBucket:
+    """
+    Folds trades into fixed-size OHLCV buckets.
+
+    The partial bucket is a 6-slot list; closed buckets go into a
+    `_RollingWindow`, so memory per symbol stays constant.
+    """
+
+    def __init__(self, timeframe, size_ms):
+        self.timeframe = timeframe
+        self.size_ms = size_ms
+        self.window = _RollingWindow()
+        self.live = None  # [start, open, high, low, close, volume]
+
+    def seed(self, candles):
+        for candle in candles[:-1]:
+            self.window.push(candle)
+        if candles:
+            self.live = list(candles[-1][:6])
+
+    def add_trade(self, ts, price, amount):
+        start = ts - ts % self.size_ms
+        live = self.live
+
+        if live is None or start > live[0]:
+            if live is not None:
+                self.window.push(live)
+                # Quiet stretches become flat zero-volume buckets, like klines
+                gap_start = max(live[0] + self.size_ms,
+                                start - self.window.capacity * self.size_ms)
+                close = live[4]
+                for ts_gap in range(gap_start, start, self.size_ms):
+                    self.window.push([ts_gap, close, close, close, close, 0.0])
+            self.live = [start, price, price, price, price, amount]
+            return
+
+        if start < live[0]:
+            return  # late print for a bucket that is already closed
+
+        if price > live[2]:
+            live[2] = price
+        if price < live[3]:
+            live[3] = price
+        live[4] = price
+        live[5] += amount
+
+
+async def _stream_symbol_trades(exchange, symbol, on_signal,
+                                min_price_move_pct, min_volume_ratio):
+    """
+    Evaluate the EP rules on the partial 1m and 15s buckets after every
+    batch of aggregated trades, instead of waiting for a kline.
+    """
+    buckets = [_TradeBucket(tf, size) for tf, size in TRADE_BUCKETS_MS.items()]
+    emitted = {}
+    seeded = False
+
+    while True:
+        try:
+            if not seeded:
+                # 1m history comes from REST; 15s warms up from the stream
+                buckets[0].seed(await get_store().fetch_ohlcv(
+                    exchange, symbol, '1m', limit=40))
+                seeded = True
+
+            trades = await exchange.watch_trades(symbol)
+            for t in trades:
+                for bucket in buckets:
+                    bucket.add_trade(t['timestamp'], t['price'], t['amount'])
+
+            for bucket in buckets:
+                if bucket.live is None:
+                    continue
+                result = bucket.window.evaluate(
+                    symbol, bucket.live, min_price_move_pct, min_volume_ratio,
+                    timeframe=bucket.timeframe)
+                if result is None:
+                    continue
+                key = (bucket.live[0], result['Early Grade'])
+                if _is_new_signal(emitted.get(bucket.timeframe), key):
+                    emitted[bucket.timeframe] = key
+                    on_signal(result)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[EarlyScanner] Trade stream error on {symbol}: {e}")
+            await asyncio.sleep(5)
+
+
+async def watch_early_trades_async(symbols=None,
+                                   min_price_move_pct=0.35,
+                                   min_volume_ratio=2.0,
+                                   on_signal=None):
+    """
+    Trade-stream version of `watch_early_pumps_async`: reacts inside the
+    minute instead of after the 1m candle exists. Runs until cancelled.
+    """
+    on_signal = on_signal or _print_early_signal
+    exchange = create_async_exchange({'options': dict(_TRADE_STREAM_OPTIONS)})
+    try:
+        await exchange.load_markets()
+        if symbols is None:
+            symbols = _all_usdt_symbols(exchange)
+
+        print(f"[EarlyScanner] Streaming trades for {len(symbols)} futures pairs...")
+
+        await asyncio.gather(*[
+            _stream_symbol_trades(exchange, s, on_signal,
+                                  min_price_move_pct, min_volume_ratio)
+            for s in symbols
+        ])
+    finally:
+        await exchange.close()
+
+
+async def scan_early_pumps_trades_async(duration=60,
+                                        limit_symbols=60,
+                                        min_price_move_pct=0.35,
+                                        min_volume_ratio=2.0):
+    """
+    Listen to the trade stream of the top-volume futures for `duration`
+    seconds and return the latest signal per (symbol, timeframe), in the
+    same DataFrame schema as `scan_early_pumps`.
+    """
+    latest = {}
+
+    def collect(result):
+        latest[(result['Symbol'], result['Timeframe'])] = result
+
+    exchange = create_async_exchange({'options': dict(_TRADE_STREAM_OPTIONS)})
+    try:
+        await exchange.load_markets()
+        symbols = await _get_top_usdt_symbols(exchange, limit=limit_symbols)
+        if not symbols:
+            return pd.DataFrame()
+
+        print(
+            f"[EarlyScanner] Listening to trades on {len(symbols)} pairs for {duration}s...")
+
+        tasks = [
+            asyncio.create_task(_stream_symbol_trades(
+                exchange, s, collect, min_price_move_pct, min_volume_ratio))
+            for s in symbols
+        ]
+        await asyncio.wait(tasks, timeout=duration)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return _early_frame(list(latest.values()))
+    finally:
+        await exchange.close()
+
+
+def scan_early_pumps_trades(duration=60,
+                            limit_symbols=60,
+                            min_price_move_pct=0.35,
+                            min_volume_ratio=2.0):
+    """
+    Sync wrapper for the trade-stream scan:
+        df = scan_early_pumps_trades(duration=30)
+    """
+    return asyncio.run(
+        scan_early_pumps_trades_async(
+            duration=duration,
+            limit_symbols=limit_symbols,
+            min_price_move_pct=min_price_move_pct,
+            min_volume_ratio=min_volume_ratio,
         )
     )
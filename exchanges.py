@@ -0,0 +1,71 @@
+"""
+Exchange construction for every scanner and page.
+
+SCANNER_EXCHANGE=fake swaps the live Binance client for the seeded
+offline fake without touching scanner code. SCANNER_RECORD / SCANNER_REPLAY
+record a run's exchange traffic or serve it back (see recorder.py).
+"""
+import config
+
+FUTURES = {'options': {'defaultType': 'future'}}
+
+
+def _fake_params():
+    lo, hi = (float(x) / 1000 for x in config.FAKE_LATENCY_MS[:2])
+    return dict(
+        symbols=config.FAKE_SYMBOLS,
+        seed=config.FAKE_SEED,
+        latency=(lo, hi),
+        error_rate=config.FAKE_ERROR_RATE,
+        rate_limit=config.FAKE_RATE_LIMIT,
+        now_ms=config.FAKE_NOW_MS or None,
+        clock_offset_ms=config.FAKE_CLOCK_OFFSET_MS,
+    )
+
+
+def _replay_params():
+    return dict(path=config.REPLAY_PATH, speed=config.REPLAY_SPEED,
+                session=config.REPLAY_SESSION)
+
+
+def create_async_exchange(params=None):
+    """ccxt.pro client (or fake, or replay) for the async scanners."""
+    params = params or FUTURES
+    if config.REPLAY_PATH:
+        from recorder import ReplayExchange
+        return ReplayExchange(params, **_replay_params())
+
+    if config.EXCHANGE_BACKEND == 'fake':
+        from fake_exchange import FakeExchange
+        exchange = FakeExchange(params, **_fake_params())
+    else:
+        import ccxt.pro as ccxt_pro
+        exchange = ccxt_pro.binance(params)
+
+    if config.RECORD_PATH:
+        from recorder import RecordingExchange
+        exchange = RecordingExchange(exchange, config.RECORD_PATH)
+    if config.REQUEST_RESILIENCE:
+        from resilience import ResilientExchange
+        exchange = ResilientExchange(exchange)
+    return exchange
+
+
+def create_sync_exchange(params=None):
+    """Blocking ccxt client (or fake, or replay) for the Streamlit pages."""
+    params = params or FUTURES
+    if config.REPLAY_PATH:
+        from recorder import ReplayExchangeSync
+        return ReplayExchangeSync(params, **_replay_params())
+
+    if config.EXCHANGE_BACKEND == 'fake':
+        from fake_exchange import FakeExchangeSync
+        exchange = FakeExchangeSync(params, **_fake_params())
+    else:
+        import ccxt
+        exchange = ccxt.binance(params)
+
+    if config.RECORD_PATH:
+        from recorder import RecordingExchangeSync
+        return RecordingExchangeSync(exchange, config.RECORD_PATH)
+    return exchange
@@ -0,0 +1,394 @@
+"""
+Deterministic local stand-in for the Binance futures client.
+
+Implements the subset of ccxt / ccxt.pro the scanners use (REST and
+watch-style), over seeded synthetic markets. The same seed, symbol and
+timestamp always give the same candle, so scans can be benchmarked and
+debugged offline. Latency, errors and rate limits can be injected.
+
+Select it with SCANNER_EXCHANGE=fake (see exchanges.py).
+"""
+import asyncio
+import random
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+MINUTE_MS = 60_000
+DAY_MS = 86_400_000
+
+_MAJORS = ["BTC", "ETH", "SOL", "BNB", "XRP", "DOGE", "ADA", "AVAX",
+           "LINK", "DOT", "TRX", "LTC", "BCH", "NEAR", "APT", "ARB",
+           "OP", "SUI", "PEPE", "WIF"]
+
+# Rough Binance futures request weights
+_WEIGHTS = {
+    'load_markets': 1,
+    'fetch_tickers': 40,
+    'fetch_ticker': 1,
+    'fetch_funding_rate': 1,
+    'fetch_balance': 5,
+    'fetch_positions': 5,
+    'fetch_time': 1,
+}
+
+_EVENT_WINDOW = 30        # minutes an event keeps shaping price/volume
+_EVENT_PROBABILITY = 0.01
+
+
+def _errors():
+    try:
+        import ccxt
+        return ccxt.NetworkError, ccxt.RequestTimeout, ccxt.RateLimitExceeded, ccxt.BadSymbol
+    except ImportError:
+        class NetworkError(Exception):
+            pass
+
+        class RequestTimeout(NetworkError):
+            pass
+
+        class RateLimitExceeded(NetworkError):
+            pass
+
+        class BadSymbol(Exception):
+            pass
+        return NetworkError, RequestTimeout, RateLimitExceeded, BadSymbol
+
+
+def _uniform(key, idx):
+    """Counter-based RNG (splitmix64): same (key, idx) -> same float in [0, 1)."""
+    with np.errstate(over='ignore'):
+        x = (np.asarray(idx, dtype=np.int64).astype(np.uint64)
+             + np.uint64(key)) * np.uint64(0x9E3779B97F4A7C15)
+        x ^= x >> np.uint64(30)
+        x *= np.uint64(0xBF58476D1CE4E5B9)
+        x ^= x >> np.uint64(27)
+        x *= np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class _Market:
+    """Per-symbol parameters of the synthetic price process."""
+
+    def __init__(self, rng, symbol, rank):
+        self.symbol = symbol
+        self.key = rng.getrandbits(63)
+        self.price = 10 ** rng.uniform(-2, 4.7)
+        self.vol = rng.uniform(0.0005, 0.002)          # per-minute log move
+        self.volume = 2e5 / (rank + 1) ** 0.8 / self.price  # base units per minute
+        self.periods = [rng.uniform(60, 240), rng.uniform(600, 1800), rng.uniform(3000, 9000)]
+        self.phases = [rng.uniform(0, 6.283) for _ in self.periods]
+        self.funding = rng.choice([1, 1, 1, 1, 1, 1, 1, 1, 10, -10]) * rng.uniform(0.00005, 0.0012)
+
+    def _events(self, x):
+        """
+        Pump/dump impulses at (possibly fractional) minutes `x`.
+
+        Returns (log-price shape, volume multiplier). An event ramps the
+        price in over its own minute, then decays.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        lags = np.arange(_EVENT_WINDOW)
+        src = np.floor(x).astype(np.int64)[:, None] - lags
+        hit = _uniform(self.key ^ 0xE7E7, src) < _EVENT_PROBABILITY
+        if not hit.any():
+            zeros = np.zeros(len(x))
+            return zeros, zeros
+        age = x[:, None] - src
+        size = (_uniform(self.key ^ 0x5123, src) - 0.5) * 0.08
+        shape = np.minimum(age, 1.0) * np.exp(-np.maximum(age - 1.0, 0.0) / 12.0)
+        price = (hit * size * shape).sum(axis=1)
+        volume = (hit * 6.0 * np.exp(-np.floor(age) / 3.0)).sum(axis=1)
+        return price, volume
+
+    def mid(self, m):
+        """Price path at (possibly fractional) minute indexes."""
+        m = np.atleast_1d(np.asarray(m, dtype=np.float64))
+        wave = sum(np.sin(2 * np.pi * m / p + ph) * (p ** 0.5)
+                   for p, ph in zip(self.periods, self.phases))
+        jumps, _ = self._events(m)
+        return self.price * np.exp(self.vol * 0.4 * wave + jumps)
+
+    def minutes(self, first, count, now_ms):
+        """(count, 6) 1m candles starting at minute index `first`."""
+        m = np.arange(first, first + count, dtype=np.int64)
+        live_frac = np.clip((now_ms - m * MINUTE_MS) / MINUTE_MS, 0.0, 1.0)
+        opens = self.mid(m)
+        closes = self.mid(m + live_frac)
+        wick = self.vol * (0.3 + _uniform(self.key ^ 0x1111, m))
+        highs = np.maximum(opens, closes) * (1 + wick * _uniform(self.key ^ 0x2222, m))
+        lows = np.minimum(opens, closes) * (1 - wick * _uniform(self.key ^ 0x3333, m))
+        _, bursts = self._events(m)
+        volumes = self.volume * (0.5 + _uniform(self.key ^ 0x4444, m)) * (1 + bursts) * live_frac
+
+        out = np.empty((count, 6))
+        out[:, 0] = m * MINUTE_MS
+        out[:, 1] = opens
+        out[:, 2] = highs
+        out[:, 3] = lows
+        out[:, 4] = closes
+        out[:, 5] = volumes
+        return out
+
+
+class _FakeCore:
+    """Market generation and bookkeeping shared by the async and sync clients."""
+
+    id = 'fake'
+    total_requests = Counter()  # across all instances, for benchmarks
+
+    def __init__(self, config=None, symbols=200, seed=7, latency=(0.0, 0.0),
+                 error_rate=0.0, rate_limit=0, now_ms=None, clock_offset_ms=0):
+        self.seed = seed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit          # request weight per minute, 0 = unlimited
+        self.frozen_now = now_ms
+        self.clock_offset_ms = clock_offset_ms  # server time minus local time
+        self.options = dict((config or {}).get('options', {}))
+        self.request_counts = Counter()
+        self.request_weight = 0
+        self._weights = deque()
+        self._rng = random.Random(seed ^ 0xFACE)
+
+        rng = random.Random(seed)
+        names = _MAJORS + [f"SYN{i:04d}" for i in range(max(0, symbols - len(_MAJORS)))]
+        self._sim = {}
+        self.markets = {}
+        for rank, base in enumerate(names[:symbols]):
+            symbol = f"{base}/USDT:USDT"
+            self._sim[symbol] = _Market(rng, symbol, rank)
+            self.markets[symbol] = {
+                'id': f"{base}USDT", 'symbol': symbol, 'base': base,
+                'quote': 'USDT', 'settle': 'USDT', 'type': 'swap',
+                'spot': False, 'swap': True, 'future': False,
+                'linear': True, 'contract': True, 'active': True,
+            }
+        self.symbols = list(self.markets)
+
+    # ================= PLUMBING =================
+
+    def milliseconds(self):
+        if self.frozen_now is not None:
+            return self.frozen_now
+        return int(time.time() * 1000)
+
+    def _market(self, symbol):
+        if symbol not in self._sim and f"{symbol}:USDT" in self._sim:
+            symbol = f"{symbol}:USDT"
+        if symbol not in self._sim:
+            raise _errors()[3](f"fake does not have market symbol {symbol}")
+        return self._sim[symbol]
+
+    def _admit(self, method, weight=None):
+        """Count the request and decide whether it fails; returns the delay to apply."""
+        network_error, timeout, rate_limited, _ = _errors()
+        weight = weight or _WEIGHTS.get(method, 1)
+        self.request_counts[method] += 1
+        self.total_requests[method] += 1
+        self.request_weight += weight
+
+        if self.rate_limit:
+            now = time.monotonic()
+            while self._weights and now - self._weights[0][0] > 60:
+                self._weights.popleft()
+            used = sum(w for _, w in self._weights)
+            if used + weight > self.rate_limit:
+                raise rate_limited(f"fake: {method} over {self.rate_limit} weight/min")
+            self._weights.append((now, weight))
+
+        delay = self._rng.uniform(*self.latency) if self.latency[1] else 0.0
+        if self.error_rate and self._rng.random() < self.error_rate:
+            error = timeout if self._rng.random() < 0.5 else network_error
+            return delay, error(f"fake: injected failure in {method}")
+        return delay, None
+
+    # ================= DATA =================
+
+    def _ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        from candle_store import timeframe_ms
+        from resample import resample_ohlcv
+
+        sim = self._market(symbol)
+        now = self.milliseconds()
+        step = timeframe_ms(timeframe)
+        limit = limit or 500
+        live_open = now - now % step
+        start = since - since % step if since is not None else live_open - (limit - 1) * step
+        start = max(start, 0)
+        end = min(start + limit * step, live_open + step)
+        if end <= start:
+            return []
+
+        first = start // MINUTE_MS
+        count = (end - start) // MINUTE_MS
+        minutes = sim.minutes(first, count, now)
+        minutes = minutes[minutes[:, 0] <= now]
+        if timeframe == '1m':
+            return minutes.tolist()
+        candles, _ = resample_ohlcv(minutes, '1m', timeframe)
+        return candles.tolist()
+
+    def _ticker(self, symbol):
+        sim = self._market(symbol)
+        now = self.milliseconds()
+        m = now // MINUTE_MS
+        last, day_ago = sim.mid([now / MINUTE_MS, (now - DAY_MS) / MINUTE_MS]).tolist()
+        day = now // DAY_MS
+        quote_volume = sim.volume * 1440 * last * (0.7 + 0.6 * float(_uniform(sim.key, day)))
+        return {
+            'symbol': sim.symbol, 'timestamp': now, 'last': last, 'close': last,
+            'bid': last * 0.9999, 'ask': last * 1.0001, 'open': day_ago,
+            'percentage': (last - day_ago) / day_ago * 100,
+            'baseVolume': quote_volume / last, 'quoteVolume': quote_volume,
+            'info': {'minute': int(m)},
+        }
+
+    def _tickers(self, symbols=None):
+        return {s: self._ticker(s) for s in (symbols or self.symbols)}
+
+    def _funding(self, symbol):
+        sim = self._market(symbol)
+        period = self.milliseconds() // (8 * 3_600_000)
+        drift = 0.0003 * (_uniform(sim.key ^ 0xF00D, np.array([period, period - 1])) - 0.5)
+        return {
+            'symbol': sim.symbol,
+            'fundingRate': float(sim.funding + drift[0]),
+            'previousFundingRate': float(sim.funding + drift[1]),
+            'timestamp': self.milliseconds(),
+        }
+
+    def _balance(self):
+        return {
+            'USDT': {'free': 9500.0, 'used': 500.0, 'total': 10000.0},
+            'info': {'marginRatio': '0.0421', 'totalMaintMargin': '42.10'},
+        }
+
+    def _positions(self):
+        out = []
+        for i, symbol in enumerate(self.symbols[:2]):
+            t = self._ticker(symbol)
+            side = 'long' if i == 0 else 'short'
+            entry = t['last'] * (0.99 if side == 'long' else 1.01)
+            size = 1000 / t['last']
+            pnl = (t['last'] - entry) * size * (1 if side == 'long' else -1)
+            out.append({
+                'symbol': symbol, 'side': side, 'contracts': size,
+                'entryPrice': entry, 'markPrice': t['last'],
+                'unrealizedPnl': pnl, 'timestamp': self.milliseconds() - 3_600_000,
+            })
+        return out
+
+    def _trades(self, symbol, since, until):
+        """Synthetic prints between two timestamps, ~4 per second."""
+        sim = self._market(symbol)
+        ticks = np.arange(since // 250 + 1, until // 250 + 1, dtype=np.int64)
+        if len(ticks) == 0:
+            return []
+        ts = ticks * 250
+        prices = sim.mid(ts / MINUTE_MS)
+        _, bursts = sim._events(ts / MINUTE_MS)
+        amounts = sim.volume / 240 * (0.2 + 1.6 * _uniform(sim.key ^ 0x7777, ticks)) * (1 + bursts)
+        return [
+            {'symbol': sim.symbol, 'timestamp': int(t), 'price': float(p),
+             'amount': float(a), 'side': 'buy' if u > 0.5 else 'sell'}
+            for t, p, a, u in zip(ts, prices, amounts, _uniform(sim.key ^ 0x8888, ticks))
+        ]
+
+
+class FakeExchange(_FakeCore):
+    """Async (ccxt.pro-style) fake."""
+
+    def __init__(self, *args, stream_interval=1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream_interval = stream_interval
+        self._trade_cursor = {}
+
+    async def _call(self, method, fn, *args, weight=None):
+        delay, error = self._admit(method, weight)
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return fn(*args)
+
+    async def load_markets(self, reload=False):
+        return await self._call('load_markets', lambda: self.markets)
+
+    async def fetch_time(self, params={}):
+        return await self._call(
+            'fetch_time', lambda: self.milliseconds() + self.clock_offset_ms)
+
+    async def fetch_tickers(self, symbols=None, params={}):
+        return await self._call('fetch_tickers', self._tickers, symbols)
+
+    async def fetch_ticker(self, symbol, params={}):
+        return await self._call('fetch_ticker', self._ticker, symbol)
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        weight = 1 if (limit or 500) <= 100 else 2 if (limit or 500) <= 500 else 5
+        return await self._call('fetch_ohlcv', self._ohlcv, symbol, timeframe,
+                                since, limit, weight=weight)
+
+    async def fetch_funding_rate(self, symbol, params={}):
+        return await self._call('fetch_funding_rate', self._funding, symbol)
+
+    async def fetch_balance(self, params={}):
+        return await self._call('fetch_balance', self._balance)
+
+    async def fetch_positions(self, symbols=None, params={}):
+        return await self._call('fetch_positions', self._positions)
+
+    async def watch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        await asyncio.sleep(self.stream_interval)
+        self.request_counts['watch_ohlcv'] += 1
+        return self._ohlcv(symbol, timeframe, limit=2)
+
+    async def watch_trades(self, symbol, since=None, limit=None, params={}):
+        await asyncio.sleep(self.stream_interval)
+        self.request_counts['watch_trades'] += 1
+        now = self.milliseconds()
+        start = self._trade_cursor.get(symbol, now - int(self.stream_interval * 1000))
+        self._trade_cursor[symbol] = now
+        return self._trades(symbol, start, now)
+
+    async def close(self):
+        pass
+
+
+class FakeExchangeSync(_FakeCore):
+    """Blocking (ccxt-style) fake for the Streamlit pages."""
+
+    def _call(self, method, fn, *args, weight=None):
+        delay, error = self._admit(method, weight)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return fn(*args)
+
+    def load_markets(self, reload=False):
+        return self._call('load_markets', lambda: self.markets)
+
+    def fetch_time(self, params={}):
+        return self._call('fetch_time', lambda: self.milliseconds() + self.clock_offset_ms)
+
+    def fetch_tickers(self, symbols=None, params={}):
+        return self._call('fetch_tickers', self._tickers, symbols)
+
+    def fetch_ticker(self, symbol, params={}):
+        return self._call('fetch_ticker', self._ticker, symbol)
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        return self._call('fetch_ohlcv', self._ohlcv, symbol, timeframe, since, limit)
+
+    def fetch_funding_rate(self, symbol, params={}):
+        return self._call('fetch_funding_rate', self._funding, symbol)
+
+    def fetch_balance(self, params={}):
+        return self._call('fetch_balance', self._balance)
+
+    def fetch_positions(self, symbols=None, params={}):
+        return self._call('fetch_positions', self._positions)
@@ -1,18 +1,33 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import asyncio
 import sys
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-import pandas as pd
-import ccxt.pro as ccxt_pro
-import time
-from datetime import datetime, timedelta
-import pytz
-import requests
+# pandas, requests, ccxt and the database are imported where first used, so
+# a cron start reaches its first exchange request quickly (see --check-imports)
+import argparse
+from datetime import datetime, timedelta, timezone
 import os
-from database import log_liquidity_context
-from dotenv import load_dotenv
-load_dotenv()
+from config import (
+    ADAPTIVE_CADENCE, ARCHIVE_DIR, EXCLUDED_PAIRS, IMPORT_BUDGET_MS,
+    MAX_SIGNAL_DISTANCE, ONCE_CLOSED_WINDOW_SECONDS, PREFILTER_KEEP_COMPRESSION,
+    PREFILTER_MARGIN, RADAR_INTRA_CANDLE, RADAR_PREFILTER, RADAR_SYMBOL_LIMIT,
+    SCAN_DEADLINE_SECONDS, SESSION_MAX_FAILURES, SESSION_PING_TIMEOUT,
+    SQUARE_POSTING,
+)
+from cadence import ScanCadence, classify as classify_cadence
+import profiling
+import scheduling
+import sharding
+from candle_store import get_store
+from clock import get_clock, timeframe_ms
+from exchanges import create_async_exchange
+from universe import get_universe
+
+IMPORT_MS = (time.perf_counter() - IMPORT_STARTED) * 1000
 
 
 BINANCE_SQUARE_KEY = os.getenv("BINANCE_SQUARE_KEY")  # use env variable
@@ -33,6 +48,8 @@ def send_binance_square(text: str):
         "bodyTextOnly": text
     }
 
+    import requests
+
     try:
         response = requests.post(url, json=payload, headers=headers, timeout=10)
         result = response.json()
@@ -48,6 +65,7 @@ def send_binance_square(text: str):
 
 # ================= TELEGRAM =================
 scanner_memory = {}
+ALERT_COOLDOWN_SECONDS = 1800  # same signal for a symbol is not re-sent before this
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
@@ -58,6 +76,8 @@ def send_telegram_message(text: str):
         "text": text,
         "parse_mode": "HTML"
     }
+    import requests
+
     try:
         requests.post(url, data=payload, timeout=5)
     except:
@@ -65,15 +85,17 @@ def send_telegram_message(text: str):
 
 # ================= CONFIG =================
 
-KSA_TIMEZONE = pytz.timezone('Asia/Riyadh')
+KSA_TIMEZONE = timezone(timedelta(hours=3))  # Asia/Riyadh, no DST
 DISTANCE_THRESHOLD = 0.002  # 0.2%
+RADAR_TIMEFRAME = '15m'
+SEPARATOR = "\n━━━━━━━━━━━━━━━━━━━━\n"
 
 # ============================================================
 # DAILY COUNTDOWN
 # ============================================================
 
 def get_daily_countdown():
-    now = datetime.now(pytz.utc)
+    now = datetime.now(timezone.utc)
     tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
     remaining = tomorrow - now
 
@@ -86,25 +108,30 @@ def get_daily_countdown():
 # PRELOAD PREVIOUS DAY LEVELS
 # ============================================================
 
-async def preload_daily_levels(exchange, symbols):
+async def preload_daily_levels(exchange, symbols, deadline=None):
 
     daily_levels = {}
+    store = get_store()
 
     for symbol in symbols:
+        if deadline is not None and deadline.expired():
+            break
         try:
-            daily = await exchange.fetch_ohlcv(symbol, timeframe='1d', limit=2)
-            if len(daily) < 2:
+            # Closed candles only: the last one is the previous day
+            daily = await store.fetch_ohlcv(exchange, symbol, '1d', limit=1, live=False)
+            if len(daily) < 1:
                 continue
 
-            prev_high = daily[-2][2]
-            prev_low = daily[-2][3]
+            prev_high = daily[-1][2]
+            prev_low = daily[-1][3]
 
             daily_levels[symbol] = {
                 "high": prev_high,
                 "low": prev_low
             }
 
-        except:
+        except Exception as e:
+            print(f"⚠️ {symbol} daily levels unavailable: {type(e).__name__}: {e}")
             continue
 
     return daily_levels
@@ -113,820 +140,1195 @@ async def preload_daily_levels(exchange, symbols):
 
 ################################################
 
-def wait_until_next_5min():
+# Scans end this long before the next trigger so they never overlap
+SLOT_MARGIN_SECONDS = 10
 
-    now = datetime.utcnow()
 
-    next_minute = (now.minute // 5 + 1) * 5
-    next_time = now.replace(second=0, microsecond=0)
 
-    if next_minute == 60:
-        next_time = next_time.replace(minute=0) + timedelta(hours=1)
-    else:
-        next_time = next_time.replace(minute=next_minute)
+# ============================================================
+# PER-SYMBOL ANALYSIS
+# ============================================================
 
-    wait_seconds = (next_time - now).total_seconds()
+def _funding_fields(funding):
+    """(funding_rate, funding_trend) from a fetch_funding_rate() result."""
+    if funding is None:
+        return None, None
+    try:
+        funding_rate = funding['fundingRate']
 
-    print(f"Next scan aligned in {int(wait_seconds)} seconds.")
+        previous_funding = funding.get("previousFundingRate")
 
-    time.sleep(wait_seconds)
+        funding_delta = 0
+        funding_trend = ""
 
+        if previous_funding is not None:
+            funding_delta = funding_rate - previous_funding
 
+            if funding_delta > 0:
+                funding_trend = f"+{funding_delta*100:.4f}%"
+            elif funding_delta < 0:
+                funding_trend = f"{funding_delta*100:.4f}%"
+            else:
+                funding_trend = "0%"
+        return funding_rate, funding_trend
+    except:
+        return None, None
 
-# ============================================================
-# MAIN SCAN
-# ============================================================
 
-async def scan_all():
+async def fetch_liquidity_inputs(exchange, symbol, closed=False):
+    """
+    Live price, funding and 15m candles for one symbol. With `closed` the
+    candles end with the last closed one instead of the forming one.
+    """
+    ticker = await exchange.fetch_ticker(symbol)
 
-    exchange = ccxt_pro.binance({'options': {'defaultType': 'future'}})
-    
+    try:
+        funding = await exchange.fetch_funding_rate(symbol)
+    except:
+        funding = None
 
+    ohlcv = await get_store().fetch_ohlcv(
+        exchange, symbol, RADAR_TIMEFRAME, limit=21, live=not closed)
 
-    try:
-        await exchange.load_markets()
+    return ticker['last'], funding, ohlcv
 
-        print("🔄 Starting Liquidity Radar Scan.")
-        scan_time = datetime.utcnow().isoformat()
 
-        separator = "\n━━━━━━━━━━━━━━━━━━━━\n"
+def analyze_liquidity(symbol, ohlcv, current_price, funding,
+                      prev_day_high, prev_day_low):
+    """
+    Liquidity Radar rules for one symbol on already-fetched data.
+
+    No I/O and no dedupe memory. Returns None when the symbol is dropped
+    before it gets a signal type, else a dict with its `signal_key` and
+    the `alerts`, `logs` (log_liquidity_context kwargs) and `posts`
+    (Square texts) to emit if it is not a repeat.
+    """
+    funding_rate, funding_trend = _funding_fields(funding)
+
+    funding_text = f"{funding_rate * 100:.4f}%" if funding_rate else "N/A"
+
+    if ohlcv is None or len(ohlcv) < 21:
+        return None
+
+    import pandas as pd
+
+    df = pd.DataFrame(ohlcv, columns=['ts','o','h','l','c','v'])
+
+    last = df.iloc[-1]
+    prev = df.iloc[-2]
+
+    # ===============================
+    # LIQUIDITY STACK ANALYSIS
+    # ===============================
 
-        donation_message = (
-            "\n💙If this tool helps your trading,\n"
-            "you can support development:\n\n"
-            "USDT BSC BEP20\n"
-            "0x7070f252c95df9a42a9c4df536b4166927a5e670\n"
+    lookback = 10
+    candles = df.iloc[-lookback:]
+
+    above_pdh = sum(c['h'] > prev_day_high for _, c in candles.iterrows())
+    below_pdl = sum(c['l'] < prev_day_low for _, c in candles.iterrows())
+
+    if above_pdh > below_pdl and above_pdh >= 3:
+        liquidity_bias = "Liquidity Stacked Above PDH 🔼"
+    elif below_pdl > above_pdh and below_pdl >= 3:
+        liquidity_bias = "Liquidity Stacked Below PDL 🔽"
+    else:
+        liquidity_bias = "Balanced Liquidity ⚖️"
+
+
+
+    # ===============================
+    # VOLUME + VOLATILITY BASELINES
+    # ===============================
+
+    avg_volume = df['v'].iloc[:-1].mean()
+    avg_range = (df['h'] - df['l']).iloc[:-1].mean()
+
+
+    if avg_volume == 0 or avg_range == 0:
+        return None
+    # ===============================
+    # RANGE EXPANSION FILTER
+    # ===============================
+
+
+    volume_ratio = last['v'] / avg_volume
+    volatility_ratio = (last['h'] - last['l']) / avg_range
+
+    market_dead = (avg_range < current_price * 0.0015)
+    if market_dead:
+        return None
+    # ===============================
+    # LIQUIDITY SWEEP DETECTION
+    # ===============================
+
+    pdl_sweep = (
+        prev['l'] < prev_day_low and
+        prev['c'] > prev_day_low
+    )
+
+    pdh_sweep = (
+        prev['h'] > prev_day_high and
+        prev['c'] < prev_day_high
+    )
+    # ===============================
+    # BREAKOUT ACCEPTANCE
+    # ===============================
+
+    body_size_last = abs(last['c'] - last['o'])
+    range_last = last['h'] - last['l']
+
+    body_strength = body_size_last / range_last if range_last > 0 else 0
+
+    strong_acceptance = (
+        body_strength > 0.6
+        and volume_ratio > 1.3
+    )
+
+    bullish_acceptance = (
+        prev['c'] > prev_day_high
+        and last['c'] > prev_day_high
+        and strong_acceptance
+    )
+
+    bearish_acceptance = (
+        prev['c'] < prev_day_low
+        and last['c'] < prev_day_low
+        and strong_acceptance
+    )
+    # ===============================
+    # SWEEP STRENGTH SCORE
+    # ===============================
+
+    wick_size = abs(prev['h'] - prev['l'])
+    body_size = abs(prev['c'] - prev['o'])
+
+    wick_ratio = wick_size / body_size if body_size > 0 else 0
+
+    score = 0
+
+    if wick_ratio > 2:
+        score += 3
+    if volume_ratio > 1.3:
+        score += 3
+    if volatility_ratio > 1.2:
+        score += 2
+    if pdl_sweep or pdh_sweep:
+        score += 2
+
+    sweep_strength = min(score, 10)
+
+    # ===============================
+    # CONTEXT CLASSIFICATION
+    # ===============================
+
+    structure = "Bullish" if df['c'].iloc[-1] > df['c'].iloc[-2] else "Bearish"
+
+    impulse_strength = (
+        "Strong Expansion" if volatility_ratio > 1.5
+        else "Moderate" if volatility_ratio > 1.0
+        else "Weak"
+    )
+
+    behavior = (
+        "Compression" if volatility_ratio < 0.8
+        else "Expansion" if volatility_ratio > 1.2
+        else "Normal"
+    )
+
+    volume_state = (
+        "Increasing" if volume_ratio > 1.2
+        else "Decreasing" if volume_ratio < 0.8
+        else "Stable"
+    )
+
+    volatility_state = (
+        "Expanding" if volatility_ratio > 1.2
+        else "Contracting" if volatility_ratio < 0.8
+        else "Stable"
+    )
+    # ===============================
+    # DISTANCE FROM DAILY LIQUIDITY
+    # ===============================
+
+    distance_from_pdh = abs(current_price - prev_day_high) / prev_day_high
+    distance_from_pdl = abs(current_price - prev_day_low) / prev_day_low
+
+    target = None
+    target_distance = None
+
+    if structure == "Bullish":
+        target = prev_day_high
+        target_distance = (prev_day_high - current_price) / current_price * 100
+
+    elif structure == "Bearish":
+        target = prev_day_low
+        target_distance = (current_price - prev_day_low) / current_price * 100
+
+    # ===============================
+    # BREAKOUT PRESSURE DETECTION
+    # ===============================
+
+    bullish_break_pressure = (
+        structure == "Bullish"
+        and volume_ratio > 1.2
+        and volatility_ratio > 1.2
+        and behavior == "Expansion"
+        and strong_acceptance
+    )
+
+    bearish_break_pressure = (
+        structure == "Bearish"
+        and volume_ratio > 1.2
+        and volatility_ratio > 1.2
+        and behavior == "Expansion"
+        and strong_acceptance
+    )
+    # ===============================
+    # PRE-EXPLOSION DETECTION
+    # ===============================
+
+    range_compression = (last['h'] - last['l']) < avg_range * 0.7
+
+    pre_explosion = (
+        behavior == "Compression"
+        and volume_state == "Increasing"
+        and volatility_state == "Contracting"
+        and range_compression
+    )
+    # ===============================
+    # HIGH PROBABILITY CONTINUATION
+    # ===============================
+
+    high_prob_continuation = (
+        (
+            bullish_break_pressure and bullish_acceptance
+            or
+            bearish_break_pressure and bearish_acceptance
+        )
+        and impulse_strength == "Strong Expansion"
+        and volume_ratio > 1.3
+        and volatility_ratio > 1.2
+    )
+    # ===============================
+    # APPROACHING LIQUIDITY
+    # ===============================
+
+    approaching = ""
+
+    if distance_from_pdh < 0.003:
+        approaching = "Approaching PDH 🔼"
+
+    elif distance_from_pdl < 0.003:
+        approaching = "Approaching PDL 🔽"
+
+    # ===============================
+    # GLOBAL DISTANCE FILTER
+    # ===============================
+
+    max_signal_distance = MAX_SIGNAL_DISTANCE
+
+    far_from_liquidity = (
+        distance_from_pdh > max_signal_distance
+        and distance_from_pdl > max_signal_distance
+    )
+
+    too_far_from_breakout = False
+    if structure == "Bullish" and current_price > prev_day_high:
+        if distance_from_pdh > 0.01:
+            too_far_from_breakout = True
+
+    if structure == "Bearish" and current_price < prev_day_low:
+        if distance_from_pdl > 0.01:
+            too_far_from_breakout = True
+
+
+    # ===============================
+    # TRAP DETECTION (SMART MONEY)
+    # ===============================
+
+    bullish_trap = (
+        pdl_sweep
+        and funding_rate is not None
+        and funding_rate < -0.005
+    )
+
+    bearish_trap = (
+        pdh_sweep
+        and funding_rate is not None
+        and funding_rate > 0.005
+    )
+    # ===============================
+    # HIGH PROBABILITY REVERSAL LOGIC
+    # ===============================
+
+    high_prob_bullish_reversal = (
+        pdl_sweep
+        and last['c'] > prev_day_low
+        and sweep_strength >= 6
+        and volume_ratio > 1.2
+        and volatility_ratio > 1.1
+    )
+
+    high_prob_bearish_reversal = (
+        pdh_sweep
+        and last['c'] < prev_day_high   # rejection
+        and sweep_strength >= 6
+        and volume_ratio > 1.2
+        and volatility_ratio > 1.1
+    )
+
+    # ===============================
+    # MODEL ACTION ENGINE
+    # ===============================
+
+    model_action = "Wait"
+    model_instruction = "Observe market behavior"
+
+    if behavior == "Compression":
+        model_action = "Breakout Pending"
+        model_instruction = "Watch for volatility expansion."
+
+    elif impulse_strength == "Strong Expansion" and structure == "Bullish":
+        model_action = "Bullish Continuation Likely"
+        model_instruction = "Look for pullback long."
+
+    elif impulse_strength == "Strong Expansion" and structure == "Bearish":
+        model_action = "Bearish Continuation Likely"
+        model_instruction = "Look for pullback short."
+
+    elif high_prob_bullish_reversal:
+        model_action = "Bullish Reversal Setup"
+        model_instruction = "Wait for confirmation candle."
+
+    elif high_prob_bearish_reversal:
+        model_action = "Bearish Reversal Setup"
+        model_instruction = "Watch rejection confirmation."
+    # ===============================
+    # ANTI SPAM MEMORY
+    # ===============================
+
+    signal_type = None
+
+    if high_prob_bullish_reversal:
+        signal_type = "bullish_reversal"
+
+    elif high_prob_bearish_reversal:
+        signal_type = "bearish_reversal"
+
+    elif high_prob_continuation:
+        signal_type = "continuation"
+
+    elif bullish_break_pressure:
+        signal_type = "bullish_pressure"
+
+    elif bearish_break_pressure:
+        signal_type = "bearish_pressure"
+
+    elif pre_explosion:
+        signal_type = "compression"
+
+    result = {
+        'signal_key': f"{symbol}_{signal_type}",
+        'alerts': [],
+        'logs': [],
+        'posts': [],
+    }
+    alerts = result['alerts']
+    logs = result['logs']
+    posts = result['posts']
+
+    # The squeeze checks need funding; without it the symbol stops here
+    if funding_rate is None:
+        return result
+
+    # ===============================
+    # LIQUIDATION CASCADE DETECTION
+    # ===============================
+
+    short_squeeze = (
+        funding_rate < -0.01
+        and volume_ratio > 1.8
+        and impulse_strength == "Strong Expansion"
+    )
+
+    long_squeeze = (
+        funding_rate > 0.01
+        and volume_ratio > 1.8
+        and impulse_strength == "Strong Expansion"
+    )
+
+    if short_squeeze:
+
+        alerts.append(
+            f"💥Watch ${symbol}\n"
+            f"Short Squeeze Detected\n\n"
+            f"Strong Bullish Expansion\n"
+            f"Short Positions Under Pressure\n\n"
+            f"Price: {current_price}\n"
+            f"Funding Rate: {funding_text} ({funding_trend})\n"
+            f"Volume Spike: {volume_ratio:.2f}x\n\n"
+            f"PDH: {prev_day_high}\n"
+            f"PDL: {prev_day_low}"
         )
 
-        tickers = await exchange.fetch_tickers()
+        alerts.append(SEPARATOR)
 
-        EXCLUDED_PAIRS = ["XAU/USDT:USDT", "XAG/USDT:USDT","TSLA/USDT:USDT"]
 
-        usdt_futures = {
-            symbol: data for symbol, data in tickers.items()
-            if symbol.endswith(':USDT')
-            and data.get('quoteVolume') is not None
-            and symbol not in EXCLUDED_PAIRS
-        }
+    elif long_squeeze:
 
-        sorted_symbols = sorted(
-            usdt_futures.items(),
-            key=lambda x: x[1]['quoteVolume'],
-            reverse=True
+        alerts.append(
+            f"💥 Watch ${symbol}\n"
+            f"Long Squeeze Detected\n\n"
+            f"Strong Bearish Expansion\n"
+            f"Long Positions Under Pressure\n\n"
+            f"Price: {current_price}\n"
+            f"Funding Rate: {funding_text} ({funding_trend})\n"
+            f"Volume Spike: {volume_ratio:.2f}x\n\n"
+            f"PDH: {prev_day_high}\n"
+            f"PDL: {prev_day_low}"
         )
 
-        symbols = [s[0] for s in sorted_symbols[:50]]
+        alerts.append(SEPARATOR)
 
-        print(f"Selected Top {len(symbols)} ultra-liquid pairs.")
+    # ===============================
+    # SIGNAL PRIORITY + EMOJI STACK
+    # ===============================
 
-        daily_levels = await preload_daily_levels(exchange, symbols)
+    signal_score = 0
 
-        alerts = []
+    if high_prob_continuation and not too_far_from_breakout:
+        signal_score += 3
 
-        for symbol in symbols:
+    if high_prob_bullish_reversal or high_prob_bearish_reversal:
+        signal_score += 3
 
-            if symbol not in daily_levels:
-                continue
+    if bullish_break_pressure or bearish_break_pressure:
+        signal_score += 2
 
-            try:
+    if short_squeeze or long_squeeze:
+        signal_score += 2
 
-                ticker = await exchange.fetch_ticker(symbol)
-                current_price = ticker['last']
+    if pre_explosion:
+        signal_score += 1
 
-                funding_rate = None
-                try:
-                    funding = await exchange.fetch_funding_rate(symbol)
-                    funding_rate = funding['fundingRate']
-
-                    previous_funding = funding.get("previousFundingRate")
-
-                    funding_delta = 0
-                    funding_trend = ""
-
-                    if previous_funding is not None:
-                        funding_delta = funding_rate - previous_funding
-                        
-                        if funding_delta > 0:
-                            funding_trend = f"+{funding_delta*100:.4f}%"
-                        elif funding_delta < 0:
-                            funding_trend = f"{funding_delta*100:.4f}%"
-                        else:
-                            funding_trend = "0%"
-                except:
-                    funding_rate = None
-
-                funding_text = f"{funding_rate * 100:.4f}%" if funding_rate else "N/A"
-
-                prev_day_high = daily_levels[symbol]['high']
-                prev_day_low = daily_levels[symbol]['low']
-                
-                
-                # ===============================
-                # FETCH 15m DATA
-                # ===============================
-
-                ohlcv = await exchange.fetch_ohlcv(symbol, '15m', limit=21)
-
-                if not ohlcv or len(ohlcv) < 21:
-                    continue
 
-                df = pd.DataFrame(ohlcv, columns=['ts','o','h','l','c','v'])
+    if signal_score >= 4:
+        stars = "⭐⭐⭐"
+    elif signal_score >= 2:
+        stars = "⭐⭐"
+    else:
+        stars = "⭐"
 
-                last = df.iloc[-1]
-                prev = df.iloc[-2]
+    # Ignore strong signals if too far from liquidity
+    if stars in ["⭐⭐", "⭐⭐⭐"] and far_from_liquidity:
+        return result
 
-                # ===============================
-                # LIQUIDITY STACK ANALYSIS
-                # ===============================
+    if signal_score >=2:
 
-                lookback = 10
-                candles = df.iloc[-lookback:]
+        logs.append(dict(
+            symbol=symbol,
+            price=current_price,
+            signal=signal_type,
+            score=signal_score,
+            funding=funding_rate,
+            volume_ratio=volume_ratio,
+            volatility_ratio=volatility_ratio,
+            target=target,
+            distance=target_distance
+        ))
 
-                above_pdh = sum(c['h'] > prev_day_high for _, c in candles.iterrows())
-                below_pdl = sum(c['l'] < prev_day_low for _, c in candles.iterrows())
 
-                if above_pdh > below_pdl and above_pdh >= 3:
-                    liquidity_bias = "Liquidity Stacked Above PDH 🔼"
-                elif below_pdl > above_pdh and below_pdl >= 3:
-                    liquidity_bias = "Liquidity Stacked Below PDL 🔽"
-                else:
-                    liquidity_bias = "Balanced Liquidity ⚖️"
 
-                
+    # ===============================
+    # SIGNAL PRIORITY SYSTEM
+    # ===============================
+    emoji_stack = ""
+    # 1️⃣ REVERSALS (highest priority)
+    if high_prob_bullish_reversal:
+        emoji_stack = "🔄⬆️"
 
-                # ===============================
-                # VOLUME + VOLATILITY BASELINES
-                # ===============================
+    elif high_prob_bearish_reversal:
+        emoji_stack = "🔄⬇️"
 
-                avg_volume = df['v'].iloc[:-1].mean()
-                avg_range = (df['h'] - df['l']).iloc[:-1].mean()
+    # 2️⃣ CONTINUATION
+    elif high_prob_continuation and not too_far_from_breakout:
+        emoji_stack = "🧨🚀"
 
-                
-                if avg_volume == 0 or avg_range == 0:
-                    continue
-                # ===============================
-                # RANGE EXPANSION FILTER
-                # ===============================
+    # 3️⃣ BREAK PRESSURE
+    elif bullish_break_pressure:
+        emoji_stack = "🧨⬆️"
 
+    elif bearish_break_pressure:
+        emoji_stack = "🧨⬇️"
 
-                volume_ratio = last['v'] / avg_volume
-                volatility_ratio = (last['h'] - last['l']) / avg_range
+    # 4️⃣ LIQUIDATION CASCADE
+    elif short_squeeze:
+        emoji_stack = "💥⬆️"
 
-                market_dead = (avg_range < current_price * 0.0015)
-                if market_dead:
-                    continue
-                # ===============================
-                # LIQUIDITY SWEEP DETECTION
-                # ===============================
-
-                pdl_sweep = (
-                    prev['l'] < prev_day_low and
-                    prev['c'] > prev_day_low
-                )
-
-                pdh_sweep = (
-                    prev['h'] > prev_day_high and
-                    prev['c'] < prev_day_high
-                )
-                # ===============================
-                # BREAKOUT ACCEPTANCE
-                # ===============================
-
-                body_size_last = abs(last['c'] - last['o'])
-                range_last = last['h'] - last['l']
-
-                body_strength = body_size_last / range_last if range_last > 0 else 0
-
-                strong_acceptance = (
-                    body_strength > 0.6
-                    and volume_ratio > 1.3
-                )
-
-                bullish_acceptance = (
-                    prev['c'] > prev_day_high
-                    and last['c'] > prev_day_high
-                    and strong_acceptance
-                )
-
-                bearish_acceptance = (
-                    prev['c'] < prev_day_low
-                    and last['c'] < prev_day_low
-                    and strong_acceptance
-                )
-                # ===============================
-                # SWEEP STRENGTH SCORE
-                # ===============================
-
-                wick_size = abs(prev['h'] - prev['l'])
-                body_size = abs(prev['c'] - prev['o'])
-
-                wick_ratio = wick_size / body_size if body_size > 0 else 0
-
-                score = 0
-
-                if wick_ratio > 2:
-                    score += 3
-                if volume_ratio > 1.3:
-                    score += 3
-                if volatility_ratio > 1.2:
-                    score += 2
-                if pdl_sweep or pdh_sweep:
-                    score += 2
-
-                sweep_strength = min(score, 10)
-
-                # ===============================
-                # CONTEXT CLASSIFICATION
-                # ===============================
-
-                structure = "Bullish" if df['c'].iloc[-1] > df['c'].iloc[-2] else "Bearish"
-
-                impulse_strength = (
-                    "Strong Expansion" if volatility_ratio > 1.5
-                    else "Moderate" if volatility_ratio > 1.0
-                    else "Weak"
-                )
-
-                behavior = (
-                    "Compression" if volatility_ratio < 0.8
-                    else "Expansion" if volatility_ratio > 1.2
-                    else "Normal"
-                )
-
-                volume_state = (
-                    "Increasing" if volume_ratio > 1.2
-                    else "Decreasing" if volume_ratio < 0.8
-                    else "Stable"
-                )
-
-                volatility_state = (
-                    "Expanding" if volatility_ratio > 1.2
-                    else "Contracting" if volatility_ratio < 0.8
-                    else "Stable"
-                )
-                # ===============================
-                # DISTANCE FROM DAILY LIQUIDITY
-                # ===============================
-
-                distance_from_pdh = abs(current_price - prev_day_high) / prev_day_high
-                distance_from_pdl = abs(current_price - prev_day_low) / prev_day_low
-                
-                target = None
-                target_distance = None
-
-                if structure == "Bullish":
-                    target = prev_day_high
-                    target_distance = (prev_day_high - current_price) / current_price * 100
-
-                elif structure == "Bearish":
-                    target = prev_day_low
-                    target_distance = (current_price - prev_day_low) / current_price * 100
-                
-                # ===============================
-                # BREAKOUT PRESSURE DETECTION
-                # ===============================
-
-                bullish_break_pressure = (
-                    structure == "Bullish"
-                    and volume_ratio > 1.2
-                    and volatility_ratio > 1.2
-                    and behavior == "Expansion"
-                    and strong_acceptance
-                )
-
-                bearish_break_pressure = (
-                    structure == "Bearish"
-                    and volume_ratio > 1.2
-                    and volatility_ratio > 1.2
-                    and behavior == "Expansion"
-                    and strong_acceptance
-                )
-                # ===============================
-                # PRE-EXPLOSION DETECTION
-                # ===============================
-
-                range_compression = (last['h'] - last['l']) < avg_range * 0.7
-
-                pre_explosion = (
-                    behavior == "Compression"
-                    and volume_state == "Increasing"
-                    and volatility_state == "Contracting"
-                    and range_compression
-                )
-                # ===============================
-                # HIGH PROBABILITY CONTINUATION
-                # ===============================
-
-                high_prob_continuation = (
-                    (
-                        bullish_break_pressure and bullish_acceptance
-                        or
-                        bearish_break_pressure and bearish_acceptance
-                    )
-                    and impulse_strength == "Strong Expansion"
-                    and volume_ratio > 1.3
-                    and volatility_ratio > 1.2
-                )
-                # ===============================
-                # APPROACHING LIQUIDITY
-                # ===============================
-
-                approaching = ""
-
-                if distance_from_pdh < 0.003:
-                    approaching = "Approaching PDH 🔼"
-
-                elif distance_from_pdl < 0.003:
-                    approaching = "Approaching PDL 🔽"
-
-                # ===============================
-                # GLOBAL DISTANCE FILTER
-                # ===============================
-
-                max_signal_distance = 0.015  # 1.5%
-
-                far_from_liquidity = (
-                    distance_from_pdh > max_signal_distance
-                    and distance_from_pdl > max_signal_distance
-                )
-
-                too_far_from_breakout = False
-                if structure == "Bullish" and current_price > prev_day_high:
-                    if distance_from_pdh > 0.01:
-                        too_far_from_breakout = True
-
-                if structure == "Bearish" and current_price < prev_day_low:
-                    if distance_from_pdl > 0.01:
-                        too_far_from_breakout = True
-                
-                
-                # ===============================
-                # TRAP DETECTION (SMART MONEY)
-                # ===============================
-
-                bullish_trap = (
-                    pdl_sweep
-                    and funding_rate is not None
-                    and funding_rate < -0.005
-                )
-
-                bearish_trap = (
-                    pdh_sweep
-                    and funding_rate is not None
-                    and funding_rate > 0.005
-                )
-                # ===============================
-                # HIGH PROBABILITY REVERSAL LOGIC
-                # ===============================
-
-                high_prob_bullish_reversal = (
-                    pdl_sweep
-                    and last['c'] > prev_day_low
-                    and sweep_strength >= 6
-                    and volume_ratio > 1.2
-                    and volatility_ratio > 1.1
-                )
-
-                high_prob_bearish_reversal = (
-                    pdh_sweep
-                    and last['c'] < prev_day_high   # rejection
-                    and sweep_strength >= 6
-                    and volume_ratio > 1.2
-                    and volatility_ratio > 1.1
-                )
-
-                # ===============================
-                # MODEL ACTION ENGINE
-                # ===============================
-
-                model_action = "Wait"
-                model_instruction = "Observe market behavior"
-
-                if behavior == "Compression":
-                    model_action = "Breakout Pending"
-                    model_instruction = "Watch for volatility expansion."
-
-                elif impulse_strength == "Strong Expansion" and structure == "Bullish":
-                    model_action = "Bullish Continuation Likely"
-                    model_instruction = "Look for pullback long."
-
-                elif impulse_strength == "Strong Expansion" and structure == "Bearish":
-                    model_action = "Bearish Continuation Likely"
-                    model_instruction = "Look for pullback short."
-
-                elif high_prob_bullish_reversal:
-                    model_action = "Bullish Reversal Setup"
-                    model_instruction = "Wait for confirmation candle."
-
-                elif high_prob_bearish_reversal:
-                    model_action = "Bearish Reversal Setup"
-                    model_instruction = "Watch rejection confirmation."
-                # ===============================
-                # ANTI SPAM MEMORY
-                # ===============================
-
-                signal_type = None
-
-                if high_prob_bullish_reversal:
-                    signal_type = "bullish_reversal"
-
-                elif high_prob_bearish_reversal:
-                    signal_type = "bearish_reversal"
-
-                elif high_prob_continuation:
-                    signal_type = "continuation"
-
-                elif bullish_break_pressure:
-                    signal_type = "bullish_pressure"
-
-                elif bearish_break_pressure:
-                    signal_type = "bearish_pressure"
-
-                elif pre_explosion:
-                    signal_type = "compression"
-
-                now = time.time()
-
-                signal_key = f"{symbol}_{signal_type}"
-
-                previous = scanner_memory.get(symbol)
-
-                if previous:
-                    prev_signal, prev_time = previous
-                    
-                    # same signal within 30 minutes = ignore
-                    if prev_signal == signal_key and (now - prev_time) < 1800:
-                        continue
-
-                scanner_memory[symbol] = (signal_key, now)
-                
-                # ===============================
-                # LIQUIDATION CASCADE DETECTION
-                # ===============================
-
-                short_squeeze = (
-                    funding_rate < -0.01
-                    and volume_ratio > 1.8
-                    and impulse_strength == "Strong Expansion"
-                )
-
-                long_squeeze = (
-                    funding_rate > 0.01
-                    and volume_ratio > 1.8
-                    and impulse_strength == "Strong Expansion"
-                )
-
-                if short_squeeze:
+    elif long_squeeze:
+        emoji_stack = "💥⬇️"
 
-                    alerts.append(
-                        f"💥Watch ${symbol}\n"
-                        f"Short Squeeze Detected\n\n"
-                        f"Strong Bullish Expansion\n"
-                        f"Short Positions Under Pressure\n\n"
-                        f"Price: {current_price}\n"
-                        f"Funding Rate: {funding_text} ({funding_trend})\n"
-                        f"Volume Spike: {volume_ratio:.2f}x\n\n"
-                        f"PDH: {prev_day_high}\n"
-                        f"PDL: {prev_day_low}"
-                    )
+    # 5️⃣ PRE-EXPLOSION
+    elif pre_explosion:
+        emoji_stack = "⚡"
 
-                    alerts.append(separator)
+    # fallback
+    else:
+        emoji_stack = "📊"
 
+    # ===============================
+    # EMOJI INTERPRETATION ENGINE
+    # ===============================
 
-                elif long_squeeze:
+    emoji_meaning = ""
+    next_action = ""
 
-                    alerts.append(
-                        f"💥 Watch ${symbol}\n"
-                        f"Long Squeeze Detected\n\n"
-                        f"Strong Bearish Expansion\n"
-                        f"Long Positions Under Pressure\n\n"
-                        f"Price: {current_price}\n"
-                        f"Funding Rate: {funding_text} ({funding_trend})\n"
-                        f"Volume Spike: {volume_ratio:.2f}x\n\n"
-                        f"PDH: {prev_day_high}\n"
-                        f"PDL: {prev_day_low}"
-                    )
+    if "⚡" in emoji_stack and "🧨" not in emoji_stack:
+        emoji_meaning = "Market compression detected"
+        next_action = "Watch for breakout expansion."
 
-                    alerts.append(separator)
+    elif "⚡" in emoji_stack and "🧨" in emoji_stack:
+        emoji_meaning = "Compression with breakout pressure"
+        next_action = "Prepare for volatility expansion."
 
-                # ===============================
-                # SIGNAL PRIORITY + EMOJI STACK
-                # ===============================
+    elif "🧨" in emoji_stack and "🚀" not in emoji_stack:
+        emoji_meaning = "Breakout pressure building"
+        next_action = "Wait for confirmation breakout candle."
 
-                signal_score = 0
+    elif "🧨" in emoji_stack and "🚀" in emoji_stack:
+        emoji_meaning = "Confirmed breakout momentum"
+        next_action = "Look for pullback continuation entry."
 
-                if high_prob_continuation and not too_far_from_breakout:
-                    signal_score += 3
+    elif "🔄" in emoji_stack:
+        emoji_meaning = "Liquidity sweep reversal detected"
+        next_action = "Wait for confirmation candle."
 
-                if high_prob_bullish_reversal or high_prob_bearish_reversal:
-                    signal_score += 3
+    elif "💥" in emoji_stack:
+        emoji_meaning = "Liquidation cascade in progress"
+        next_action = "Momentum trade opportunity."
 
-                if bullish_break_pressure or bearish_break_pressure:
-                    signal_score += 2
+    else:
+        emoji_meaning = "Market activity detected"
+        next_action = "Observe price behavior."
+    # ===============================
+    # HIGH PROBABILITY ALERTS
+    # ===============================
+
+    if high_prob_bullish_reversal or high_prob_bearish_reversal or (high_prob_continuation and not too_far_from_breakout):
+
+        # Compose message with $ symbol
+        formatted_symbol = f"${symbol}"
+
+        if high_prob_bullish_reversal:
+            trap_tag = "🐻 SHORT TRAP" if bullish_trap else ""
+            alert_text = (
+                f"{stars} {emoji_stack} {formatted_symbol}\n"
+                f"{emoji_meaning}\n\n"
+                f"Next Step: {next_action}\n\n"
+                f"Potential Bullish Reversal {trap_tag}\n"
+                f"Sweep Strength: {sweep_strength}/10\n"
+                f"Funding Rate: {funding_text} ({funding_trend})\n\n"
+                f"Liquidity Grab Below PDL\n"
+                f"Target Liquidity: {target}\n"
+                f"Distance To Target: {target_distance:.2f}%\n\n"
+                f"PDH: {prev_day_high}\n"
+                f"PDL: {prev_day_low}\n\n"
+                f"{approaching}\n"
+                f"{liquidity_bias}\n"
+                f"Volume Expansion: {volume_ratio:.2f}x\n"
+                f"Volatility Expansion: {volatility_ratio:.2f}x\n\n"
+            )
 
-                if short_squeeze or long_squeeze:
-                    signal_score += 2
+        elif high_prob_bearish_reversal:
+            trap_tag = "🐂 LONG TRAP" if bearish_trap else ""
+            alert_text = (
+                f"{stars} {emoji_stack} {formatted_symbol}\n"
+                f"{emoji_meaning}\n\n"
+                f"Next Step: {next_action}\n\n"
+                f"Potential Bearish Reversal {trap_tag}\n"
+                f"Sweep Strength: {sweep_strength}/10\n"
+                f"Funding Rate: {funding_text} ({funding_trend})\n\n"
+                f"Liquidity Grab Above PDH\n"
+                f"Target Liquidity: {target}\n"
+                f"Distance To Target: {target_distance:.2f}%\n\n"
+                f"PDH: {prev_day_high}\n"
+                f"PDL: {prev_day_low}\n\n"
+                f"{approaching}\n"
+                f"{liquidity_bias}\n"
+                f"Volume Expansion: {volume_ratio:.2f}x\n"
+                f"Volatility Expansion: {volatility_ratio:.2f}x\n\n"
+            )
 
-                if pre_explosion:
-                    signal_score += 1
+        elif high_prob_continuation and not too_far_from_breakout:
+            direction = "Bullish Continuation" if structure == "Bullish" else "Bearish Continuation"
+            alert_text = (
+                f"{stars} {emoji_stack} {formatted_symbol}\n"
+                f"{emoji_meaning}\n\n"
+                f"Next Step: {next_action}\n\n"
+                f"High Probability {direction}\n\n"
+                f"Price: {current_price}\n"
+                f"Funding Rate: {funding_text} ({funding_trend})\n\n"
+                f"Context:\n"
+                f"• Structure: {structure}\n"
+                f"• Impulse: {impulse_strength}\n"
+                f"• Volume: {volume_state}\n"
+                f"• Volatility: {volatility_state}\n\n"
+                f"Model Action: {model_action}\n"
+                f"Instruction: {model_instruction}\n\n"
+                f"Target Liquidity: {target}\n"
+                f"Distance To Target: {target_distance:.2f}%\n\n"
+                f"PDH: {prev_day_high}\n"
+                f"PDL: {prev_day_low}\n\n"
+                f"{liquidity_bias}\n"
+            )
 
+        alerts.append(alert_text)
+        alerts.append(SEPARATOR)
+
+        posts.append(alert_text)
+        return result
+    # ===============================
+    # PRE-EXPLOSION ALERT
+    # ===============================
+
+    if pre_explosion:
+
+        alerts.append(
+            f"{stars} {emoji_stack} ${symbol}\n"
+            f"Market Compression Detected\n"
+            f"Possible Explosive Move Incoming\n\n"
+            f"Price: {current_price}\n"
+            f"Funding Rate: {funding_text} ({funding_trend})\n\n"
+            f"Context:\n"
+            f"• Structure: {structure}\n"
+            f"• Impulse: {impulse_strength}\n"
+            f"• Volume: {volume_state}\n"
+            f"• Volatility: {volatility_state}\n\n"
+            f"Model Action: {model_action}\n"
+            f"Instruction: {model_instruction}\n\n"
+            f"Target Liquidity: {target}\n"
+            f"Distance To Target: {target_distance:.2f}%\n\n"
+            f"PDH: {prev_day_high}\n"
+            f"PDL: {prev_day_low}\n\n"
+            f"{liquidity_bias}\n"
+        )
 
-                if signal_score >= 4:
-                    stars = "⭐⭐⭐"
-                elif signal_score >= 2:
-                    stars = "⭐⭐"
-                else:
-                    stars = "⭐"
+        alerts.append(SEPARATOR)
+        return result
+    # ===============================
+    # BREAKOUT PRESSURE ALERT
+    # ===============================
+
+    if bullish_break_pressure or bearish_break_pressure:
+
+        direction = "Bullish Breakout Pressure" if bullish_break_pressure else "Bearish Breakout Pressure"
+
+        alerts.append(
+            f"{stars} {emoji_stack} ${symbol}\n"
+            f"{direction}\n\n"
+            f"Price: {current_price}\n"
+            f"Funding Rate: {funding_text} ({funding_trend})\n\n"
+            f"Context:\n"
+            f"• Structure: {structure}\n"
+            f"• Behavior: {behavior}\n"
+            f"• Volume: {volume_state}\n"
+            f"• Volatility: {volatility_state}\n\n"
+            f"Target Liquidity: {target}\n"
+            f"Distance To Target: {target_distance:.2f}%\n\n"
+            f"PDH: {prev_day_high}\n"
+            f"PDL: {prev_day_low}\n\n"
+            f"{liquidity_bias}\n"
+        )
 
-                # Ignore strong signals if too far from liquidity
-                if stars in ["⭐⭐", "⭐⭐⭐"] and far_from_liquidity:
-                    continue
-                
-                if signal_score >=2:
-
-                    log_liquidity_context(
-                        symbol=symbol,
-                        price=current_price,
-                        signal=signal_type,
-                        score=signal_score,
-                        funding=funding_rate,
-                        volume_ratio=volume_ratio,
-                        volatility_ratio=volatility_ratio,
-                        target=target,
-                        distance=target_distance,
-                        scan_time=scan_time
-                    )
-
-                
-
-                # ===============================
-                # SIGNAL PRIORITY SYSTEM
-                # ===============================
-                emoji_stack = ""
-                # 1️⃣ REVERSALS (highest priority)
-                if high_prob_bullish_reversal:
-                    emoji_stack = "🔄⬆️"
-
-                elif high_prob_bearish_reversal:
-                    emoji_stack = "🔄⬇️"
-
-                # 2️⃣ CONTINUATION
-                elif high_prob_continuation and not too_far_from_breakout:
-                    emoji_stack = "🧨🚀"
-
-                # 3️⃣ BREAK PRESSURE
-                elif bullish_break_pressure:
-                    emoji_stack = "🧨⬆️"
-
-                elif bearish_break_pressure:
-                    emoji_stack = "🧨⬇️"
-
-                # 4️⃣ LIQUIDATION CASCADE
-                elif short_squeeze:
-                    emoji_stack = "💥⬆️"
-
-                elif long_squeeze:
-                    emoji_stack = "💥⬇️"
-
-                # 5️⃣ PRE-EXPLOSION
-                elif pre_explosion:
-                    emoji_stack = "⚡"
-
-                # fallback
-                else:
-                    emoji_stack = "📊"
-
-                # ===============================
-                # EMOJI INTERPRETATION ENGINE
-                # ===============================
-
-                emoji_meaning = ""
-                next_action = ""
-
-                if "⚡" in emoji_stack and "🧨" not in emoji_stack:
-                    emoji_meaning = "Market compression detected"
-                    next_action = "Watch for breakout expansion."
-
-                elif "⚡" in emoji_stack and "🧨" in emoji_stack:
-                    emoji_meaning = "Compression with breakout pressure"
-                    next_action = "Prepare for volatility expansion."
-
-                elif "🧨" in emoji_stack and "🚀" not in emoji_stack:
-                    emoji_meaning = "Breakout pressure building"
-                    next_action = "Wait for confirmation breakout candle."
-
-                elif "🧨" in emoji_stack and "🚀" in emoji_stack:
-                    emoji_meaning = "Confirmed breakout momentum"
-                    next_action = "Look for pullback continuation entry."
-
-                elif "🔄" in emoji_stack:
-                    emoji_meaning = "Liquidity sweep reversal detected"
-                    next_action = "Wait for confirmation candle."
-
-                elif "💥" in emoji_stack:
-                    emoji_meaning = "Liquidation cascade in progress"
-                    next_action = "Momentum trade opportunity."
-
-                else:
-                    emoji_meaning = "Market activity detected"
-                    next_action = "Observe price behavior."
-                # ===============================
-                # HIGH PROBABILITY ALERTS
-                # ===============================
-
-                if high_prob_bullish_reversal or high_prob_bearish_reversal or (high_prob_continuation and not too_far_from_breakout):
-
-                    # Compose message with $ symbol
-                    formatted_symbol = f"${symbol}"
-
-                    if high_prob_bullish_reversal:
-                        trap_tag = "🐻 SHORT TRAP" if bullish_trap else ""
-                        alert_text = (
-                            f"{stars} {emoji_stack} {formatted_symbol}\n"
-                            f"{emoji_meaning}\n\n"
-                            f"Next Step: {next_action}\n\n"
-                            f"Potential Bullish Reversal {trap_tag}\n"
-                            f"Sweep Strength: {sweep_strength}/10\n"
-                            f"Funding Rate: {funding_text} ({funding_trend})\n\n"
-                            f"Liquidity Grab Below PDL\n"
-                            f"Target Liquidity: {target}\n"
-                            f"Distance To Target: {target_distance:.2f}%\n\n"
-                            f"PDH: {prev_day_high}\n"
-                            f"PDL: {prev_day_low}\n\n"
-                            f"{approaching}\n"
-                            f"{liquidity_bias}\n"
-                            f"Volume Expansion: {volume_ratio:.2f}x\n"
-                            f"Volatility Expansion: {volatility_ratio:.2f}x\n\n"
-                        )
-
-                    elif high_prob_bearish_reversal:
-                        trap_tag = "🐂 LONG TRAP" if bearish_trap else ""
-                        alert_text = (
-                            f"{stars} {emoji_stack} {formatted_symbol}\n"
-                            f"{emoji_meaning}\n\n"
-                            f"Next Step: {next_action}\n\n"
-                            f"Potential Bearish Reversal {trap_tag}\n"
-                            f"Sweep Strength: {sweep_strength}/10\n"
-                            f"Funding Rate: {funding_text} ({funding_trend})\n\n"
-                            f"Liquidity Grab Above PDH\n"
-                            f"Target Liquidity: {target}\n"
-                            f"Distance To Target: {target_distance:.2f}%\n\n"
-                            f"PDH: {prev_day_high}\n"
-                            f"PDL: {prev_day_low}\n\n"
-                            f"{approaching}\n"
-                            f"{liquidity_bias}\n"
-                            f"Volume Expansion: {volume_ratio:.2f}x\n"
-                            f"Volatility Expansion: {volatility_ratio:.2f}x\n\n"
-                        )
-
-                    elif high_prob_continuation and not too_far_from_breakout:
-                        direction = "Bullish Continuation" if structure == "Bullish" else "Bearish Continuation"
-                        alert_text = (
-                            f"{stars} {emoji_stack} {formatted_symbol}\n"
-                            f"{emoji_meaning}\n\n"
-                            f"Next Step: {next_action}\n\n"
-                            f"High Probability {direction}\n\n"
-                            f"Price: {current_price}\n"
-                            f"Funding Rate: {funding_text} ({funding_trend})\n\n"
-                            f"Context:\n"
-                            f"• Structure: {structure}\n"
-                            f"• Impulse: {impulse_strength}\n"
-                            f"• Volume: {volume_state}\n"
-                            f"• Volatility: {volatility_state}\n\n"
-                            f"Model Action: {model_action}\n"
-                            f"Instruction: {model_instruction}\n\n"
-                            f"Target Liquidity: {target}\n"
-                            f"Distance To Target: {target_distance:.2f}%\n\n"
-                            f"PDH: {prev_day_high}\n"
-                            f"PDL: {prev_day_low}\n\n"
-                            f"{liquidity_bias}\n"
-                        )
-
-                    alerts.append(alert_text)
-                    alerts.append(separator)
-
-                    log_liquidity_context(
-                        symbol=symbol,
-                        price=current_price,
-                        signal=signal_type,
-                        score=signal_score,
-                        funding=funding_rate,
-                        volume_ratio=volume_ratio,
-                        volatility_ratio=volatility_ratio,
-                        target=target,
-                        distance=target_distance
-                    )
-
-                    send_binance_square(alert_text)
-                    continue
-                # ===============================
-                # PRE-EXPLOSION ALERT
-                # ===============================
-
-                if pre_explosion:
-
-                    alerts.append(
-                        f"{stars} {emoji_stack} ${symbol}\n"
-                        f"Market Compression Detected\n"
-                        f"Possible Explosive Move Incoming\n\n"
-                        f"Price: {current_price}\n"
-                        f"Funding Rate: {funding_text} ({funding_trend})\n\n"
-                        f"Context:\n"
-                        f"• Structure: {structure}\n"
-                        f"• Impulse: {impulse_strength}\n"
-                        f"• Volume: {volume_state}\n"
-                        f"• Volatility: {volatility_state}\n\n"
-                        f"Model Action: {model_action}\n"
-                        f"Instruction: {model_instruction}\n\n"
-                        f"Target Liquidity: {target}\n"
-                        f"Distance To Target: {target_distance:.2f}%\n\n"
-                        f"PDH: {prev_day_high}\n"
-                        f"PDL: {prev_day_low}\n\n"
-                        f"{liquidity_bias}\n"
-                    )
-
-                    alerts.append(separator)
-                    continue
-                # ===============================
-                # BREAKOUT PRESSURE ALERT
-                # ===============================
-
-                if bullish_break_pressure or bearish_break_pressure:
-
-                    direction = "Bullish Breakout Pressure" if bullish_break_pressure else "Bearish Breakout Pressure"
-
-                    alerts.append(
-                        f"{stars} {emoji_stack} ${symbol}\n"
-                        f"{direction}\n\n"
-                        f"Price: {current_price}\n"
-                        f"Funding Rate: {funding_text} ({funding_trend})\n\n"
-                        f"Context:\n"
-                        f"• Structure: {structure}\n"
-                        f"• Behavior: {behavior}\n"
-                        f"• Volume: {volume_state}\n"
-                        f"• Volatility: {volatility_state}\n\n"
-                        f"Target Liquidity: {target}\n"
-                        f"Distance To Target: {target_distance:.2f}%\n\n"
-                        f"PDH: {prev_day_high}\n"
-                        f"PDL: {prev_day_low}\n\n"
-                        f"{liquidity_bias}\n"
-                    )
-
-                    alerts.append(separator)
-                    continue
-                
+        alerts.append(SEPARATOR)
+        return result
 
-            except:
-                continue
+    return result
 
-                
-        # ===============================
-        # TELEGRAM SEND
-        # ===============================
 
-        if alerts:
+def apply_liquidity_result(symbol, result, alerts, scan_time):
+    """
+    Dedupe against scanner_memory, then log, post and queue the alerts.
+    Returns False for dropped symbols and repeats.
+    """
+    if result is None:
+        return False
 
-            countdown = get_daily_countdown()
+    now = time.time()
 
-            message = (
-                f"⚠️ <b>RADAR</b>\n\n"
-                f"Daily Candle Close In: {countdown}\n\n"
-            )
+    previous = scanner_memory.get(symbol)
+
+    if previous:
+        prev_signal, prev_time = previous
+
+        # same signal within 30 minutes = ignore
+        if prev_signal == result['signal_key'] and (now - prev_time) < ALERT_COOLDOWN_SECONDS:
+            return False
+
+    scanner_memory[symbol] = (result['signal_key'], now)
+
+    alerts.extend(result['alerts'])
+    for row in result['logs']:
+        from database import log_liquidity_context
+        log_liquidity_context(**row, scan_time=scan_time)
+    if SQUARE_POSTING:
+        for text in result['posts']:
+            send_binance_square(text)
+    return True
+
+
+async def analyze_sharded(exchange, symbols, daily_levels, deadline=None, cadence=None,
+                          closed=False):
+    """
+    Fetch every symbol's inputs concurrently, then run analyze_liquidity
+    on the process pool. Fetches still pending when the deadline is up are
+    cancelled. Returns ([(symbol, result)] in input order,
+    [(symbol, error)], [skipped symbols]).
+    """
+    symbols = [s for s in symbols if s in daily_levels]
+    tasks = [asyncio.ensure_future(fetch_liquidity_inputs(exchange, s, closed))
+             for s in symbols]
+    timeout = max(0.0, deadline.remaining()) if deadline is not None else None
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout)
+
+    keys, arrays, extras, failed, skipped = [], [], [], [], []
+    for symbol, task in zip(symbols, tasks):
+        if not task.done():
+            task.cancel()
+            skipped.append(symbol)
+            continue
+        inputs = task.exception() or task.result()
+        if isinstance(inputs, Exception):
+            failed.append((symbol, f"{type(inputs).__name__}: {inputs}"))
+            continue
+        current_price, funding, ohlcv = inputs
+        if cadence is not None:
+            cadence.update(symbol, classify_cadence(
+                ohlcv, current_price,
+                daily_levels[symbol]['high'], daily_levels[symbol]['low']))
+        keys.append(symbol)
+        arrays.append(ohlcv)
+        extras.append((current_price, funding,
+                       daily_levels[symbol]['high'], daily_levels[symbol]['low']))
+
+    results, errors = await sharding.map_candles(analyze_liquidity, keys, arrays, extras)
+    return list(zip(keys, results)), failed + errors, skipped
+
+
+# ============================================================
+# TELEGRAM SEND
+# ============================================================
+
+DONATION_MESSAGE = (
+    "\n💙If this tool helps your trading,\n"
+    "you can support development:\n\n"
+    "USDT BSC BEP20\n"
+    "0x7070f252c95df9a42a9c4df536b4166927a5e670\n"
+)
+
+
+def send_radar_alerts(alerts):
+    """One Telegram message for all of a scan's alerts."""
+    if not alerts:
+        print("No high probability setups detected.")
+        return
+
+    countdown = get_daily_countdown()
+
+    message = (
+        f"⚠️ <b>RADAR</b>\n\n"
+        f"Daily Candle Close In: {countdown}\n\n"
+    )
+
+    for alert in alerts:
+        message += alert + "\n"
+
+    message += SEPARATOR
+    message += DONATION_MESSAGE
+
+    send_telegram_message(message)
+
+    print("Liquidity alerts sent.")
+
+
+# ============================================================
+# SESSION
+# ============================================================
+
+_startup_reported = False
+
+
+def _report_startup():
+    """Once per process: how long from import to the first request."""
+    global _startup_reported
+    if _startup_reported:
+        return
+    _startup_reported = True
+    first_request = (time.perf_counter() - IMPORT_STARTED) * 1000
+    print(f"⏱️ Startup: imports {IMPORT_MS:.0f} ms, first request at {first_request:.0f} ms")
+    if IMPORT_MS > IMPORT_BUDGET_MS:
+        print(f"⚠️ Imports over the {IMPORT_BUDGET_MS:g} ms budget (IMPORT_BUDGET_MS)")
+
+
+def _utc_day():
+    return datetime.now(timezone.utc).date()
 
-            for alert in alerts:
-                message += alert + "\n"
 
-            message += separator
-            message += donation_message
+class RadarSession:
+    """
+    Exchange client and per-day state shared by consecutive scans.
+
+    --once uses one per scan; the daemon keeps one for the life of the
+    process, so the connection pool, loaded markets, previous-day levels
+    and cadence state carry over. ensure() pings the exchange before each
+    scan and reconnects when the session looks dead; the ping also keeps
+    the exchange clock (clock.py) in sync. The first scan of a new UTC
+    day reloads markets, the universe and the levels.
+    """
+
+    def __init__(self):
+        self.exchange = None
+        self.day = None
+        self.daily_levels = {}
+        self.cadence = ScanCadence() if ADAPTIVE_CADENCE else None
+        self.failures = 0      # scans in a row that failed outright
+        self.scans = 0
+        self.reconnects = 0
+
+    async def ensure(self):
+        """The live exchange, reconnected and rolled over as needed."""
+        fresh = self.exchange is None
+        if not fresh and (self.failures >= SESSION_MAX_FAILURES or not await self.healthy()):
+            print("🔌 Reconnecting to the exchange.")
+            self.reconnects += 1
+            await self.close()
+            fresh = True
+
+        if fresh:
+            self.exchange = create_async_exchange()
+            _report_startup()
+            await self.exchange.load_markets()
+            await get_clock().sync(self.exchange)
+            self.failures = 0
+
+        today = _utc_day()
+        if self.day != today:
+            if self.day is not None:
+                await self.rollover(reload_markets=not fresh)
+            self.day = today
+
+        return self.exchange
+
+    async def healthy(self):
+        try:
+            await asyncio.wait_for(get_clock().sync(self.exchange), SESSION_PING_TIMEOUT)
+            return True
+        except Exception as e:
+            print(f"⚠️ Exchange health check failed: {type(e).__name__}: {e}")
+            return False
+
+    async def rollover(self, reload_markets=True):
+        """New UTC day: yesterday's levels no longer apply."""
+        print(f"📅 Daily rollover to {_utc_day()}: reloading markets and levels.")
+        self.daily_levels.clear()
+        if reload_markets:
+            await self.exchange.load_markets(True)
+        await get_universe().refresh(self.exchange, force=True)
+        await self.archive_old_rows()
+
+    async def archive_old_rows(self):
+        """Daily retention pass (retention.py), off the event loop."""
+        import retention
+        try:
+            moved = await asyncio.to_thread(retention.run)
+        except Exception as e:
+            print(f"⚠️ Retention skipped: {type(e).__name__}: {e}")
+            return
+        if any(moved.values()):
+            print("🗄️ Retention: moved " + ", ".join(f"{t} {n}" for t, n in moved.items())
+                  + f" rows to {ARCHIVE_DIR}")
+
+    async def levels(self, symbols, deadline=None):
+        """Previous-day levels of `symbols`, fetched once per symbol per day."""
+        missing = [s for s in symbols if s not in self.daily_levels]
+        if missing:
+            self.daily_levels.update(
+                await preload_daily_levels(self.exchange, missing, deadline))
+        return {s: self.daily_levels[s] for s in symbols if s in self.daily_levels}
+
+    def forget_old_alerts(self):
+        """Drop dedupe entries that can no longer suppress anything."""
+        cutoff = time.time() - ALERT_COOLDOWN_SECONDS
+        for symbol in [s for s, (_, sent) in scanner_memory.items() if sent < cutoff]:
+            del scanner_memory[symbol]
+
+    async def close(self):
+        if self.exchange is None:
+            return
+        try:
+            await self.exchange.close()
+            print("Exchange session closed cleanly.")
+        except Exception as e:
+            print(f"⚠️ Exchange close failed: {type(e).__name__}: {e}")
+        self.exchange = None
+
 
-            send_telegram_message(message)
+# ============================================================
+# MAIN SCAN
+# ============================================================
 
-            print("Liquidity alerts sent.")
+async def scan_all(deadline_seconds=None, session=None, closed=False):
+    """
+    One radar pass. Symbols are scanned by priority until the deadline
+    (SCAN_DEADLINE_SECONDS by default) leaves no room for another; the
+    alerts found so far are always sent. Without a `session` a new one
+    is opened and closed around the scan.
+
+    `closed` is the scan right after a 15m close: every symbol, judged on
+    the candle that just closed. Otherwise only the symbols the cadence
+    has due are checked, on the forming candle. closed=None decides from
+    the exchange clock (see just_closed). Returns a summary dict.
+    """
+    deadline = scheduling.Deadline(deadline_seconds or SCAN_DEADLINE_SECONDS)
+    own_session = session is None
+    session = session or RadarSession()
+    cadence = session.cadence
+    alerts = []
+    failures = 0
+    skipped = []
+    symbols = []
+    avoided = 0
+
+    try:
+        exchange = await session.ensure()
+        session.forget_old_alerts()
+        session.scans += 1
+        if closed is None:
+            closed = just_closed(exchange)
+
+        print(f"🔄 Starting Liquidity Radar Scan ({'closed' if closed else 'live'} {RADAR_TIMEFRAME}).")
+        scan_time = datetime.utcnow().isoformat()
+
+        universe = await get_universe().refresh(exchange)
+        symbols = universe.top(RADAR_SYMBOL_LIMIT, exclude=EXCLUDED_PAIRS)
+
+        print(f"Selected Top {len(symbols)} ultra-liquid pairs.")
+
+        daily_levels = await session.levels(symbols, deadline)
+        if deadline.expired():
+            skipped = [s for s in symbols if s not in daily_levels]
+        distances = scheduling.level_distances(symbols, universe, daily_levels)
+        candidates = [s for s in symbols if s in daily_levels]
+
+        # Closed-candle scans keep far symbols for their compression alert
+        if RADAR_PREFILTER and not (closed and PREFILTER_KEEP_COMPRESSION):
+            kept, dropped = scheduling.prefilter(
+                candidates, distances, MAX_SIGNAL_DISTANCE + PREFILTER_MARGIN)
+            avoided = len(dropped)
+            print(f"Prefilter: {len(kept)} near a level, "
+                  f"{avoided} deep fetches avoided.")
+            # Back to volume order; prioritize() mixes distance back in
+            kept = set(kept)
+            candidates = [s for s in candidates if s in kept]
+
+        ordered = scheduling.prioritize(candidates, distances)
+
+        if cadence is not None and not closed:
+            ordered = cadence.due(ordered, distances=distances)
+            print(f"{len(ordered)} symbols due this tick.")
+
+        if sharding.workers() > 1:
+            analyzed, failed, cancelled = await analyze_sharded(
+                exchange, ordered, daily_levels, deadline, cadence, closed)
+            skipped += cancelled
+
+            for symbol, error in failed:
+                failures += 1
+                print(f"⚠️ {symbol} skipped: {error}")
+
+            for symbol, result in analyzed:
+                try:
+                    apply_liquidity_result(symbol, result, alerts, scan_time)
+                except Exception as e:
+                    failures += 1
+                    print(f"⚠️ {symbol} skipped: {type(e).__name__}: {e}")
 
         else:
+            for i, symbol in enumerate(ordered):
+
+                if not deadline.allows():
+                    skipped += [s for s in ordered[i:] if s in daily_levels]
+                    break
+
+                if symbol not in daily_levels:
+                    continue
 
-            print("No high probability setups detected.")
+                started = time.monotonic()
+                try:
+                    current_price, funding, ohlcv = await fetch_liquidity_inputs(
+                        exchange, symbol, closed)
+
+                    if cadence is not None:
+                        cadence.update(symbol, classify_cadence(
+                            ohlcv, current_price,
+                            daily_levels[symbol]['high'], daily_levels[symbol]['low']))
+
+                    result = analyze_liquidity(
+                        symbol, ohlcv, current_price, funding,
+                        daily_levels[symbol]['high'], daily_levels[symbol]['low'])
+
+                    apply_liquidity_result(symbol, result, alerts, scan_time)
+
+                except Exception as e:
+                    failures += 1
+                    print(f"⚠️ {symbol} skipped: {type(e).__name__}: {e}")
+                    continue
+
+                finally:
+                    deadline.record(time.monotonic() - started)
+
+        if failures:
+            print(f"⚠️ {failures}/{len(symbols)} symbols failed this scan.")
+
+        scheduling.report_skipped(skipped, deadline)
+
+        if cadence is not None:
+            cadence.save()
+            print(f"Cadence: ~{cadence.requests_per_hour(candidates):.0f} symbol requests/hour "
+                  f"(flat 5m: {len(symbols) * 3 * 12}).")
+
+        send_radar_alerts(alerts)
+        session.failures = 0
 
     except Exception as e:
 
         print(f"Scan error: {e}")
+        session.failures += 1
+
+        # Whatever was found before the error still goes out
+        if alerts:
+            send_radar_alerts(alerts)
 
     finally:
 
-        await exchange.close()
-        print("Exchange session closed cleanly.")
+        if own_session:
+            await session.close()
+
+    return {
+        'symbols': len(symbols),
+        'alerts': len(alerts),
+        'failures': failures,
+        'skipped': skipped,
+        'prefiltered': avoided,
+        'elapsed': deadline.seconds - deadline.remaining(),
+    }
 # ============================================================
 # LOOP
 # ============================================================
 
-def run_scan():
-    asyncio.run(scan_all())
+def just_closed(exchange=None, window_seconds=None):
+    """True within `window_seconds` after a RADAR_TIMEFRAME close (exchange time)."""
+    window_ms = 1000 * (ONCE_CLOSED_WINDOW_SECONDS if window_seconds is None else window_seconds)
+    return get_clock().now_ms(exchange) % timeframe_ms(RADAR_TIMEFRAME) < window_ms
+
+
+def run_scan(deadline_seconds=None, profile=None):
+    """
+    One scan, unless another process is already running one. The closed
+    candle is scanned if the run starts soon after a 15m close.
+    """
+    with scheduling.scan_lock() as acquired:
+        if acquired:
+            return profiling.run(scan_all(deadline_seconds, closed=None), 'radar',
+                                 enabled=profile)
+
+
+def radar_triggers():
+    """Timeframes whose closes start a daemon scan, shortest first."""
+    if not RADAR_INTRA_CANDLE:
+        return [RADAR_TIMEFRAME]
+    # Intra-candle checks follow the cadence's 1-minute tier
+    return ['1m' if ADAPTIVE_CADENCE else '5m', RADAR_TIMEFRAME]
+
+
+async def daemon_loop(profile=None):
+    """
+    Scan after every trigger close (exchange time) with one long-lived
+    session until cancelled.
+    """
+    session = RadarSession()
+    clock = get_clock()
+    triggers = radar_triggers()
+    try:
+        try:
+            # Connect up front so the first wait is already on exchange time
+            await session.ensure()
+        except Exception as e:
+            print(f"⚠️ Exchange not reachable yet: {type(e).__name__}: {e}")
+
+        while True:
+
+            close_ms, closed = await clock.wait_for_close(triggers, session.exchange)
+            full = RADAR_TIMEFRAME in closed
+
+            close_time = datetime.fromtimestamp(close_ms / 1000, timezone.utc)
+            print(f"\n🔄 {'/'.join(closed)} close at {close_time:%H:%M:%S} UTC "
+                  f"(exchange clock offset {clock.offset_ms:+d} ms)\n")
+
+            # Finish before the next trigger so scans never overlap. The
+            # closed-candle scan may use the whole 15m candle: intra-candle
+            # closes that pass meanwhile are simply skipped
+            now = clock.now_ms(session.exchange)
+            budget = (clock.next_close(RADAR_TIMEFRAME, now) if full else
+                      min(clock.next_close(tf, now) for tf in triggers)) - now
+            budget /= 1000
+
+            with scheduling.scan_lock() as acquired:
+                if not acquired:
+                    continue
+                await profiling.run_async(scan_all(
+                    max(1.0, min(SCAN_DEADLINE_SECONDS, budget - SLOT_MARGIN_SECONDS)),
+                    session, closed=full), 'radar', enabled=profile)
+
+            print(f"Session: scan {session.scans}, {session.reconnects} reconnects, "
+                  f"{len(session.daily_levels)} levels cached.")
+    finally:
+        await session.close()
 
-while True:
 
-    wait_until_next_5min()
+def run_daemon(profile=None):
+    try:
+        asyncio.run(daemon_loop(profile))
+    except KeyboardInterrupt:
+        print("Radar stopped.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Liquidity Radar")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--once', action='store_true',
+                      help="scan now and exit (cron, GitHub Actions)")
+    mode.add_argument('--daemon', action='store_true',
+                      help="scan after every candle close until stopped (the default)")
+    mode.add_argument('--check-imports', action='store_true',
+                      help=f"exit 1 if importing this module took over "
+                           f"IMPORT_BUDGET_MS ({IMPORT_BUDGET_MS:g} ms)")
+    parser.add_argument('--profile', action='store_true',
+                        help="profile each scan (same as SCANNER_PROFILE=1)")
+    args = parser.parse_args()
+
+    if args.check_imports:
+        print(f"⏱️ Imports took {IMPORT_MS:.0f} ms (budget {IMPORT_BUDGET_MS:g} ms)")
+        sys.exit(1 if IMPORT_MS > IMPORT_BUDGET_MS else 0)
+
+    # --profile forces it on; without it SCANNER_PROFILE decides
+    profile = True if args.profile else None
+    if args.once:
+        run_scan(SCAN_DEADLINE_SECONDS, profile)
+    else:
+        run_daemon(profile)
 
-    print("\n🔄 Running synchronized scan...\n")
-    print(f"\nSCAN TIME UTC: {datetime.utcnow().strftime('%H:%M:%S')}")
 
-    run_scan()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Batch outcome evaluator for the radar's logged targets.
+
+For every liquidity_logs row with a target and no trade_result, reads the
+candles after its scan_time from the local candle store and decides:
+
+    Win      price reached the target first
+    Loss     price moved OUTCOME_ADVERSE_PCT against the signal first (a
+             candle touching both counts as a loss)
+    Expired  neither within OUTCOME_HORIZON_HOURS
+
+Signals whose window (scan to horizon) the store does not cover without
+gaps stay open for the next run, including ones older than the first
+stored candle. All signals of a symbol are decided together on an
+(signals x candles) window matrix, and the results are written in one
+transaction, so tens of thousands of rows take seconds:
+
+    python outcomes.py [--adverse 1.0] [--horizon 24] [--timeframe 15m] [--dry-run]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+import database as db
+from candle_store import get_store, timeframe_ms
+
+
+def evaluate_symbol(candles, scan_ms, entry, target, adverse, horizon_ms, step):
+    """
+    Outcomes for one symbol's signals as an object array of
+    'Win' / 'Loss' / 'Expired' / None (still open).
+
+    `candles` is the store's (n, 6) array; the other arguments are
+    per-signal arrays, except `adverse` (fraction), `horizon_ms` and
+    `step` (candle length in ms).
+    """
+    out = np.full(len(scan_ms), None, dtype=object)
+    if len(candles) == 0:
+        return out
+
+    ts, high, low = candles[:, 0], candles[:, 2], candles[:, 3]
+    width = int(np.ceil(horizon_ms / step))
+
+    # First candle opening at/after the scan; the one in progress at scan
+    # time may have printed its extreme before the signal existed
+    first_open = -(-scan_ms // step) * step
+    expected = first_open[:, None] + np.arange(width) * step
+    idx = np.searchsorted(ts, first_open, side='left')[:, None] + np.arange(width)
+    in_range = idx < len(ts)
+    idx = np.minimum(idx, len(ts) - 1)
+
+    # Only an unbroken run of candles from the scan on can decide a row: a
+    # scan older than the file's first candle, or a gap in the file, could
+    # hide the move that settled it
+    end = scan_ms + horizon_ms
+    needed = expected < end[:, None]
+    present = in_range & (ts[idx] == expected)
+    missing = needed & ~present
+    first_missing = np.where(missing.any(axis=1), missing.argmax(axis=1), width)
+    valid = needed & (np.arange(width) < first_missing[:, None])
+
+    long = target > entry
+    stop = np.where(long, entry * (1 - adverse), entry * (1 + adverse))
+
+    h, l = high[idx], low[idx]
+    t_col, s_col = target[:, None], stop[:, None]
+    hit_target = valid & np.where(long[:, None], h >= t_col, l <= t_col)
+    hit_stop = valid & np.where(long[:, None], l <= s_col, h >= s_col)
+
+    # argmax gives the first True; rows without one get `width`
+    first_target = np.where(hit_target.any(axis=1), hit_target.argmax(axis=1), width)
+    first_stop = np.where(hit_stop.any(axis=1), hit_stop.argmax(axis=1), width)
+
+    covered = first_missing == width
+    out[first_target < first_stop] = 'Win'
+    out[(first_stop <= first_target) & (first_stop < width)] = 'Loss'
+    out[(first_target == width) & (first_stop == width) & covered] = 'Expired'
+    return out
+
+
+def evaluate(signals, adverse_pct=None, horizon_hours=None, timeframe=None, store=None):
+    """[(id, outcome), ...] for the decided rows of `signals` (a DataFrame)."""
+    adverse = (adverse_pct or config.OUTCOME_ADVERSE_PCT) / 100
+    horizon_ms = (horizon_hours or config.OUTCOME_HORIZON_HOURS) * 3_600_000
+    timeframe = timeframe or config.OUTCOME_TIMEFRAME
+    store = store or get_store()
+    step = timeframe_ms(timeframe)
+
+    if signals.empty:
+        return []
+
+    # scan_time is written as naive UTC ISO
+    scan_ms = (pd.to_datetime(signals['scan_time'], format='ISO8601').astype('datetime64[ms]')
+               .astype('int64').to_numpy())
+
+    decided = []
+    for symbol, rows in signals.groupby('symbol').indices.items():
+        outcome = evaluate_symbol(
+            store.read(symbol, timeframe),
+            scan_ms[rows],
+            signals['price'].to_numpy(dtype=float)[rows],
+            signals['target'].to_numpy(dtype=float)[rows],
+            adverse, horizon_ms, step)
+        ids = signals['id'].to_numpy()[rows]
+        decided.extend((i, o) for i, o in zip(ids, outcome) if o is not None)
+    return decided
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill liquidity_logs.trade_result from stored candles")
+    parser.add_argument('--adverse', type=float, default=None,
+                        help=f"adverse move in %% (default {config.OUTCOME_ADVERSE_PCT})")
+    parser.add_argument('--horizon', type=float, default=None,
+                        help=f"hours to wait for either (default {config.OUTCOME_HORIZON_HOURS})")
+    parser.add_argument('--timeframe', default=None,
+                        help=f"stored candles to read (default {config.OUTCOME_TIMEFRAME})")
+    parser.add_argument('--dry-run', action='store_true', help="print counts, write nothing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    signals = db.get_open_liquidity_logs()
+    decided = evaluate(signals, args.adverse, args.horizon, args.timeframe)
+    if not args.dry_run:
+        db.set_trade_results(decided)
+
+    counts = pd.Series([o for _, o in decided], dtype=object).value_counts().to_dict()
+    print(f"📒 {len(signals)} open signals: {len(decided)} decided {counts}, "
+          f"{len(signals) - len(decided)} still open "
+          f"({time.perf_counter() - started:.2f}s{', dry run' if args.dry_run else ''})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import streamlit as st
-import pandas as pd
+import config
 import database as db
 
 # ----- Page Setup -----
@@ -11,23 +11,38 @@ st.caption("Review past signals and log your trade outcomes.")
 if st.button("🔄 Refresh History"):
     st.rerun()
 
-# ----- Load Historical Signal Data -----
-historical_df = db.get_historical_signals()
 
-if not historical_df.empty:
-    # Sort signals by ID (latest on top)
-    historical_df = historical_df.sort_values(by="id", ascending=False)
+# ----- Cached Queries -----
+# `version` is the newest signal id, so a cached page is reused until a
+# scan logs new rows; outcome edits clear the cache explicitly.
 
+@st.cache_data(max_entries=64)
+def load_page(grades, page_size, page, version):
+    return db.get_signals_page(grades, page_size, page)
+
+
+@st.cache_data(max_entries=8)
+def load_count(grades, version):
+    return db.count_signals(grades)
+
+
+@st.cache_data(max_entries=8)
+def load_summary(grades, version):
+    return db.signal_summary(grades)
+
+
+version = db.max_signal_id()
+
+if version:
     # ----- Outcome Logging Form -----
     with st.form(key="outcome_form"):
         st.subheader("📝 Log Trade Outcome")
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            signal_id_to_update = st.selectbox(
-                "Select Signal ID",
-                historical_df['id'].tolist()
-            )
+            signal_id_to_update = st.number_input(
+                "Signal ID", min_value=1, max_value=int(version),
+                value=int(version), step=1)
 
         with col2:
             trade_outcome = st.selectbox(
@@ -40,9 +55,12 @@ if not historical_df.empty:
 
         submitted = st.form_submit_button("Save Outcome")
         if submitted:
-            if signal_id_to_update and trade_outcome:
+            if db.get_signal(signal_id_to_update).empty:
+                st.warning(f"⚠️ No signal with ID {signal_id_to_update}.")
+            elif trade_outcome:
                 db.update_signal_outcome(
                     signal_id_to_update, trade_outcome, trade_notes)
+                load_page.clear()
                 st.success(
                     f"✅ Outcome saved for Signal ID {signal_id_to_update}")
                 st.rerun()
@@ -52,54 +70,76 @@ if not historical_df.empty:
     # ----- Display Table -----
     st.subheader("📊 Full Signal History")
 
-    show_all_grades = st.checkbox(
-        "Show all signals (including C and F grades)", value=False)
+    col1, col2, col3 = st.columns([2, 1, 1])
+
+    with col1:
+        show_all_grades = st.checkbox(
+            "Show all signals (including C and F grades)", value=False)
 
-    if not show_all_grades:
-        tradable_grades = ['A+ (Explosive)', 'A (Prime)',
-                           'A (High Volume)', 'B+ (Noisy)', 'B (Weak)']
-        df_to_display = historical_df[historical_df['grade'].isin(
-            tradable_grades)].copy()
-    else:
-        df_to_display = historical_df.copy()
+    grades = None if show_all_grades else db.TRADABLE_GRADES
 
-    display_columns = [
-        'id', 'scan_time', 'symbol', 'signal_type', 'signal_price',
-        'grade', 'analysis', 'price_change_2h', 'volume_ratio_2h',
-        'volatility_contraction', 'outcome', 'notes'
-    ]
-    df_to_display = df_to_display[[
-        col for col in display_columns if col in df_to_display.columns]]
+    with col2:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
 
-    st.dataframe(df_to_display, use_container_width=True)
+    total = load_count(grades, version)
+    pages = max(1, -(-total // page_size))
+
+    with col3:
+        page = st.number_input(
+            f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+
+    df_to_display = load_page(grades, page_size, int(page) - 1, version)
+    summary = load_summary(grades, version)
+
+    # The table pages the SQLite tier; the rollup behind the charts also
+    # counts rows retention.py has moved to the Parquet archive
+    archived = max(0, int(summary['grade'].sum()) - total)
+    caption = f"{total} signals in the database, newest first."
+    if archived:
+        caption += (f" {archived} older signals are archived in {config.ARCHIVE_DIR} "
+                    "(`python retention.py query signals`).")
+    st.caption(caption)
+    st.dataframe(df_to_display, use_container_width=True, hide_index=True)
 
     # ----- Charts -----
     st.subheader("📈 Summary Charts")
-    st.caption("Charts reflect only filtered signals above.")
-
-    df_to_display['scan_time'] = pd.to_datetime(
-        df_to_display['scan_time'], errors='coerce')
-    df_to_display['hour'] = df_to_display['scan_time'].dt.hour
+    st.caption(f"Charts reflect all {total + archived} signals matching the grade "
+               "filter above, archived ones included.")
 
     col1, col2, col3 = st.columns(3)
 
     with col1:
         st.write("⏳ Signals by Time of Day (KSA)")
-        st.bar_chart(df_to_display['hour'].value_counts().sort_index())
+        st.bar_chart(summary['hour'])
 
     with col2:
         st.write("💱 Top 10 Most Frequent Pairs")
-        st.bar_chart(df_to_display['symbol'].value_counts().head(10))
+        st.bar_chart(summary['symbol'])
 
     with col3:
         st.write("🏷️ Signal Grade Distribution")
-        st.bar_chart(df_to_display['grade'].value_counts())
+        st.bar_chart(summary['grade'])
 
-    # ----- Clear Database -----
-    if st.button("🗑️ Clear Signal History"):
-        db.clear_database()
-        st.warning("✅ All historical signals have been cleared.")
-        st.rerun()
+    # ----- Maintenance -----
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if st.button(f"🗄️ Archive rows older than {config.RETENTION_DAYS:g} days"):
+            import retention
+            moved = retention.run()
+            load_page.clear()
+            load_count.clear()
+            st.success(f"✅ Moved {sum(moved.values())} rows to {config.ARCHIVE_DIR} "
+                       "(charts still include them).")
+
+    with col2:
+        if st.button("🗑️ Clear Signal History"):
+            db.clear_database()
+            load_page.clear()
+            load_count.clear()
+            load_summary.clear()
+            st.warning("✅ All historical signals have been cleared.")
+            st.rerun()
 
 else:
     st.info("No historical data yet. Run a few scans to build your signal history.")
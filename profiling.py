@@ -0,0 +1,246 @@
+"""
+Profiler hooks for the scanner entry points.
+
+Turned on by SCANNER_PROFILE=1 in the environment, or by the entry point
+passing `enabled=True` (local_scanner_v2.py does for `--profile`). Each profiled scan writes four files to PROFILE_DIR:
+
+    <name>-<utc>.pstats      cProfile dump (snakeviz, pstats)
+    <name>-<utc>.top.txt     top-N functions by cumulative and own time
+    <name>-<utc>.collapsed   sampled stacks, one "a;b;c count" per line
+                             (flamegraph.pl, speedscope, inferno)
+    <name>-<utc>.trace.json  asyncio task timeline (chrome://tracing, Perfetto)
+
+The timeline has one row per task. Each bar is one uninterrupted run of
+that task between awaits; the gaps are time spent waiting (network,
+sleeps). A long bar means the event loop was blocked, e.g. by pandas
+work or a synchronous HTTP post.
+"""
+import asyncio
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+
+
+def _enabled(flag):
+    # The entry point's own flag wins; otherwise SCANNER_PROFILE decides
+    return config.PROFILE if flag is None else flag
+
+
+def run(coro, name, enabled=None):
+    """asyncio.run(coro), profiled when profiling is enabled."""
+    if not _enabled(enabled):
+        return asyncio.run(coro)
+    with profiled(name) as session:
+        return asyncio.run(session.trace(coro))
+
+
+async def run_async(coro, name, enabled=None):
+    """await coro on the running loop, profiled when profiling is enabled."""
+    if not _enabled(enabled):
+        return await coro
+    loop = asyncio.get_running_loop()
+    factory = loop.get_task_factory()
+    try:
+        with profiled(name) as session:
+            return await session.trace(coro)
+    finally:
+        # The loop outlives the scan; stop wrapping its tasks
+        loop.set_task_factory(factory)
+
+
+# ============================================================
+# STACK SAMPLER (flamegraph input)
+# ============================================================
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename == __file__:  # our own wrappers
+                    frame = frame.f_back
+                    continue
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# ============================================================
+# TASK TIMELINE (chrome trace)
+# ============================================================
+
+class _TaskTimeline:
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.events = []
+        self.names = {}
+        self.blocking = []   # (duration, task name) of the longest steps
+
+    def _us(self, t):
+        return round((t - self.t0) * 1e6, 1)
+
+    @types.coroutine
+    def _stepped(self, coro, tid, name):
+        """Drive `coro`, timing each resume up to its next suspension."""
+        value, error = None, None
+        while True:
+            start = time.perf_counter()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                self._step(tid, name, start)
+                return stop.value
+            except BaseException:
+                self._step(tid, name, start)
+                raise
+            self._step(tid, name, start)
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+    def _step(self, tid, name, start):
+        duration = time.perf_counter() - start
+        self.events.append({
+            'name': name, 'cat': 'step', 'ph': 'X', 'pid': 1, 'tid': tid,
+            'ts': self._us(start), 'dur': round(duration * 1e6, 1),
+        })
+        self.blocking.append((duration, name))
+
+    async def _run(self, coro, tid, name):
+        start = time.perf_counter()
+        try:
+            return await self._stepped(coro, tid, name)
+        finally:
+            self.events.append({
+                'name': name, 'cat': 'task', 'ph': 'X', 'pid': 1, 'tid': tid,
+                'ts': self._us(start),
+                'dur': round((time.perf_counter() - start) * 1e6, 1),
+            })
+
+    def wrap(self, coro):
+        tid = len(self.names) + 1
+        name = getattr(coro, '__qualname__', type(coro).__name__)
+        self.names[tid] = name
+        return self._run(coro, tid, name)
+
+    def _task_factory(self, loop, coro, **kwargs):
+        return asyncio.Task(self.wrap(coro), loop=loop, **kwargs)
+
+    async def trace(self, coro):
+        asyncio.get_running_loop().set_task_factory(self._task_factory)
+        return await self.wrap(coro)
+
+    def write(self, path):
+        meta = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+             'args': {'name': f"{tid} {name}"}}
+            for tid, name in self.names.items()
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': meta + self.events}, f)
+
+
+# ============================================================
+# SESSION
+# ============================================================
+
+class ProfileSession:
+
+    def __init__(self, name, out_dir=None, top_n=None, sample_ms=None):
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        self.out_dir = out_dir or config.PROFILE_DIR
+        self.prefix = os.path.join(self.out_dir, f"{name}-{stamp}")
+        self.top_n = top_n or config.PROFILE_TOP_N
+        self.profiler = cProfile.Profile()
+        self.sampler = _StackSampler(
+            threading.get_ident(), (sample_ms or config.PROFILE_SAMPLE_MS) / 1000)
+        self.timeline = _TaskTimeline()
+
+    def trace(self, coro):
+        """Wrap the scan coroutine so its tasks appear on the timeline."""
+        return self.timeline.trace(coro)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _summary(self):
+        out = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(self.top_n)
+        stats.sort_stats('tottime').print_stats(self.top_n)
+
+        steps = sorted(self.timeline.blocking, reverse=True)[:10]
+        if steps:
+            out.write("Longest event-loop blocking steps:\n")
+            for duration, name in steps:
+                out.write(f"  {duration * 1000:9.1f} ms  {name}\n")
+        return out.getvalue()
+
+    def write(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.profiler.dump_stats(self.prefix + '.pstats')
+        self.sampler.write(self.prefix + '.collapsed')
+        self.timeline.write(self.prefix + '.trace.json')
+        summary = self._summary()
+        with open(self.prefix + '.top.txt', 'w') as f:
+            f.write(summary)
+
+        head = pstats.Stats(self.profiler, stream=io.StringIO())
+        print(f"\n⏱️ Profiled {os.path.basename(self.prefix)}: {self.elapsed:.2f}s wall, "
+              f"{head.total_calls} calls, {sum(self.sampler.stacks.values())} samples")
+        print(f"   Written to {self.prefix}.*")
+
+
+@contextmanager
+def profiled(name, **kwargs):
+    session = ProfileSession(name, **kwargs)
+    session.start()
+    try:
+        yield session
+    finally:
+        session.stop()
+        session.write()
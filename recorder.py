@@ -0,0 +1,304 @@
+"""
+Record-and-replay of raw exchange traffic.
+
+SCANNER_RECORD=path wraps whatever client the factory builds and appends
+every request, response (or error) and its timing to a gzip JSON-lines
+file. SCANNER_REPLAY=path serves a recorded session back instead of the
+exchange, at the original pace or as fast as possible, so a production
+scan can be profiled and debugged offline:
+
+    SCANNER_RECORD=data/recordings/radar.jsonl.gz python local_scanner_v2.py
+    SCANNER_REPLAY=data/recordings/radar.jsonl.gz REPLAY_SPEED=max python -c \
+        "import local_scanner_v2 as r; r.run_scan()"
+
+    python recorder.py data/recordings/radar.jsonl.gz     # summary
+
+Both sides run on an empty scratch candle store and cadence state (see
+config._state_path) unless CANDLE_STORE_DIR / CADENCE_PATH are set, so
+what the scan asks for does not depend on the machine's local state.
+"""
+import asyncio
+import gzip
+import inspect
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict, deque
+
+# Everything the scanners and pages ask of an exchange
+RECORDED_METHODS = (
+    'load_markets', 'fetch_time', 'fetch_tickers', 'fetch_ticker',
+    'fetch_ohlcv', 'fetch_funding_rate', 'fetch_balance', 'fetch_positions',
+    'watch_ohlcv', 'watch_trades', 'milliseconds',
+)
+
+FLUSH_EVERY = 200
+
+
+def _key(method, args, kwargs):
+    """Match requests by what was asked, not by when (gather() reorders)."""
+    return json.dumps([method, list(args), kwargs], sort_keys=True, default=str)
+
+
+def _error_class(name):
+    try:
+        import ccxt
+        cls = getattr(ccxt, name, None)
+        if isinstance(cls, type) and issubclass(cls, Exception):
+            return cls
+    except ImportError:
+        pass
+    return RuntimeError
+
+
+def load_sessions(path):
+    """Recorded sessions in the file, oldest first: [(header, [records])]."""
+    sessions = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # torn tail from a killed recorder
+            if record.get('type') == 'session':
+                sessions.append((record, []))
+            elif sessions:
+                sessions[-1][1].append(record)
+    return sessions
+
+
+# ============================================================
+# RECORDING
+# ============================================================
+
+class RecordingExchange:
+    """
+    Transparent proxy: calls go to the wrapped client unchanged and are
+    appended to `path`. Works for both the async and the blocking clients.
+    """
+
+    def __init__(self, inner, path):
+        self._inner = inner
+        self._path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Appending to gzip starts a new member; readers see one stream
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._t0 = time.perf_counter()
+        self._seq = 0
+        self._write({
+            'type': 'session',
+            'started_ms': int(time.time() * 1000),
+            'backend': getattr(inner, 'id', type(inner).__name__),
+            'argv': sys.argv,
+        })
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, default=str) + '\n')
+        self._seq += 1
+        if self._seq % FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def _record(self, method, args, kwargs, start, result=None, error=None):
+        record = {
+            'seq': self._seq,
+            'method': method,
+            'args': list(args),
+            'kwargs': kwargs,
+            't': round(start - self._t0, 6),
+            'elapsed': round(time.perf_counter() - start, 6),
+        }
+        if error is not None:
+            record['error'] = {'type': type(error).__name__, 'message': str(error)}
+        else:
+            record['result'] = result
+        self._write(record)
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name not in RECORDED_METHODS or not callable(attr):
+            return attr
+
+        if inspect.iscoroutinefunction(attr):
+            async def recorded(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await attr(*args, **kwargs)
+                except Exception as e:
+                    self._record(name, args, kwargs, start, error=e)
+                    raise
+                self._record(name, args, kwargs, start, result=result)
+                return result
+        else:
+            def recorded(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = attr(*args, **kwargs)
+                except Exception as e:
+                    self._record(name, args, kwargs, start, error=e)
+                    raise
+                self._record(name, args, kwargs, start, result=result)
+                return result
+        return recorded
+
+    def _close_file(self):
+        if not self._file.closed:
+            self._file.close()
+            print(f"Recorded {self._seq - 1} exchange calls to {self._path}")
+
+    async def close(self):
+        try:
+            if hasattr(self._inner, 'close'):
+                result = self._inner.close()
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            self._close_file()
+
+
+class RecordingExchangeSync(RecordingExchange):
+
+    def close(self):
+        try:
+            if hasattr(self._inner, 'close'):
+                self._inner.close()
+        finally:
+            self._close_file()
+
+
+# ============================================================
+# REPLAY
+# ============================================================
+
+class ReplayMiss(KeyError):
+    pass
+
+
+class _ReplayCore:
+    """
+    Serves recorded responses keyed by (method, arguments), in recorded
+    order per key. A request that was never recorded raises ReplayMiss.
+    """
+
+    id = 'replay'
+
+    def __init__(self, config=None, path=None, speed='max', session=-1):
+        if speed not in ('original', 'max'):
+            raise ValueError("speed must be 'original' or 'max'")
+        sessions = load_sessions(path)
+        if not sessions:
+            raise ValueError(f"No recorded session in {path}")
+        self.header, records = sessions[session]
+        self.path = path
+        self.speed = speed
+        self.options = dict((config or {}).get('options', {}))
+        self.markets = {}
+        self.symbols = []
+        self.misses = Counter()
+        self._queues = defaultdict(deque)
+        for record in records:
+            key = _key(record['method'], record['args'], record['kwargs'])
+            self._queues[key].append(record)
+        self._t0 = None
+
+    def _next(self, method, args, kwargs):
+        queue = self._queues.get(_key(method, args, kwargs))
+        if not queue:
+            self.misses[method] += 1
+            raise ReplayMiss(f"{method}{tuple(args)} was not recorded")
+        # Repeat the last answer once a key runs dry (e.g. streaming loops)
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def _delays(self, record):
+        """(wait before the call starts, call duration) at original speed."""
+        if self.speed == 'max':
+            return 0.0, 0.0
+        now = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = now - record['t']
+        return max(0.0, self._t0 + record['t'] - now), record['elapsed']
+
+    def _answer(self, method, record):
+        if 'error' in record:
+            raise _error_class(record['error']['type'])(record['error']['message'])
+        result = record['result']
+        if method == 'load_markets':
+            self.markets = result
+            self.symbols = list(result)
+        return result
+
+    def milliseconds(self):
+        try:
+            return self._next('milliseconds', (), {})['result']
+        except ReplayMiss:
+            return int(time.time() * 1000)
+
+
+class ReplayExchange(_ReplayCore):
+
+    async def _call(self, method, *args, **kwargs):
+        record = self._next(method, args, kwargs)
+        wait, elapsed = self._delays(record)
+        if wait or elapsed:
+            await asyncio.sleep(wait + elapsed)
+        return self._answer(method, record)
+
+    def __getattr__(self, name):
+        if name not in RECORDED_METHODS:
+            raise AttributeError(name)
+
+        async def replayed(*args, **kwargs):
+            return await self._call(name, *args, **kwargs)
+        return replayed
+
+    async def close(self):
+        if self.misses:
+            print(f"Replay misses (not in recording): {dict(self.misses)}")
+
+
+class ReplayExchangeSync(_ReplayCore):
+
+    def __getattr__(self, name):
+        if name not in RECORDED_METHODS:
+            raise AttributeError(name)
+
+        def replayed(*args, **kwargs):
+            record = self._next(name, args, kwargs)
+            wait, elapsed = self._delays(record)
+            if wait or elapsed:
+                time.sleep(wait + elapsed)
+            return self._answer(name, record)
+        return replayed
+
+    def close(self):
+        if self.misses:
+            print(f"Replay misses (not in recording): {dict(self.misses)}")
+
+
+# ============================================================
+# CLI: summarise a recording
+# ============================================================
+
+def summarize(path):
+    for i, (header, records) in enumerate(load_sessions(path)):
+        calls = Counter(r['method'] for r in records)
+        errors = Counter(r['method'] for r in records if 'error' in r)
+        busy = defaultdict(float)
+        for r in records:
+            busy[r['method']] += r['elapsed']
+        span = max((r['t'] + r['elapsed'] for r in records), default=0.0)
+        print(f"Session {i}: {header.get('backend')} started {header.get('started_ms')} "
+              f"argv={' '.join(header.get('argv') or [])}")
+        print(f"  {len(records)} calls over {span:.2f}s")
+        for method, n in calls.most_common():
+            print(f"  {method:<20}{n:>6} calls {busy[method]:>9.2f}s "
+                  f"{errors[method]:>4} errors")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python recorder.py RECORDING.jsonl.gz")
+        sys.exit(2)
+    summarize(sys.argv[1])
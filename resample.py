@@ -0,0 +1,174 @@
+"""
+Derive higher timeframes from a base candle series.
+
+Buckets start at UTC epoch multiples of the target timeframe, which is
+where Binance opens its 15m, 2h and 1d candles, so a 1m series is
+enough to rebuild all of them locally.
+
+    python resample.py BTC/USDT:USDT 15m 2h 1d   # check against the exchange
+"""
+import asyncio
+import sys
+
+import numpy as np
+
+from candle_store import COLUMNS, DTYPE, get_store, timeframe_ms
+
+
+def resample_ohlcv(base, base_timeframe, timeframe):
+    """
+    Aggregate an (n, 6) base array into `timeframe` buckets.
+
+    Returns (candles, complete): the (m, 6) aggregate and a boolean mask
+    that is False for buckets the base series does not fully cover (a
+    partial first bucket, one with missing base candles inside, or the
+    one still forming at the end). `base` must be sorted by open time
+    without duplicates, as the store keeps it.
+    """
+    base = np.asarray(base, dtype=DTYPE)
+    if len(base) == 0:
+        return np.empty((0, COLUMNS), dtype=DTYPE), np.zeros(0, dtype=bool)
+
+    base_step = timeframe_ms(base_timeframe)
+    step = timeframe_ms(timeframe)
+    ts = base[:, 0].astype(np.int64)
+    bucket = ts - ts % step
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(base)] - 1
+
+    out = np.empty((len(starts), COLUMNS), dtype=DTYPE)
+    out[:, 0] = bucket[starts]
+    out[:, 1] = base[starts, 1]
+    out[:, 2] = np.maximum.reduceat(base[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(base[:, 3], starts)
+    out[:, 4] = base[ends, 4]
+    out[:, 5] = np.add.reduceat(base[:, 5], starts)
+
+    # Every base slot of the bucket present, first and last included
+    complete = ((ends - starts + 1 == step // base_step)
+                & (ts[starts] == bucket[starts])
+                & (ts[ends] + base_step == bucket[starts] + step))
+    return out, complete
+
+
+class Resampler:
+    """
+    Incremental version: feed closed base candles in order and get back
+    the higher-timeframe candles they complete. The candle store keeps one
+    per derived series, so each base candle is aggregated once.
+
+    A bucket that closes with base candles missing is dropped, as
+    resample_ohlcv's mask does.
+    """
+
+    def __init__(self, base_timeframe='1m', timeframes=('15m', '2h', '1d')):
+        self.base_step = timeframe_ms(base_timeframe)
+        self.steps = {tf: timeframe_ms(tf) for tf in timeframes}
+        self.forming = {tf: None for tf in timeframes}
+        self.counts = {tf: 0 for tf in timeframes}
+        self.last_ts = None       # newest base candle fed
+
+    def update(self, candle):
+        """Returns {timeframe: [closed candles]} (usually empty)."""
+        ts, o, h, l, c, v = candle[:COLUMNS]
+        if self.last_ts is not None and ts <= self.last_ts:
+            return {}
+        self.last_ts = ts
+        closed = {}
+
+        for tf, step in self.steps.items():
+            start = ts - ts % step
+            cur = self.forming[tf]
+
+            if cur is not None and start > cur[0]:
+                # The last bucket ended without its final base candles
+                cur = None
+
+            if cur is None:
+                cur = [start, o, h, l, c, v]
+                self.counts[tf] = 1
+            else:
+                cur[2] = max(cur[2], h)
+                cur[3] = min(cur[3], l)
+                cur[4] = c
+                cur[5] += v
+                self.counts[tf] += 1
+
+            if ts + self.base_step >= start + step:
+                if self.counts[tf] == step // self.base_step:
+                    closed.setdefault(tf, []).append(cur)
+                cur = None
+
+            self.forming[tf] = cur
+
+        return closed
+
+    def live(self, timeframe, live_base=None):
+        """Forming higher-timeframe candle, optionally including the live base candle."""
+        cur = self.forming[timeframe]
+        if live_base is None:
+            return list(cur) if cur else None
+        ts, o, h, l, c, v = live_base[:COLUMNS]
+        step = self.steps[timeframe]
+        if cur is None or ts - ts % step != cur[0]:
+            return [ts - ts % step, o, h, l, c, v]
+        return [cur[0], cur[1], max(cur[2], h), min(cur[3], l), c, cur[5] + v]
+
+
+# ============================================================
+# VERIFICATION
+# ============================================================
+
+async def verify_against_exchange(exchange, symbol, timeframe,
+                                  base_timeframe='1m', count=10):
+    """
+    Compare the last `count` locally derived candles with the exchange's.
+    Returns a list of (timestamp, column, local, exchange) mismatches.
+    """
+    ratio = timeframe_ms(timeframe) // timeframe_ms(base_timeframe)
+    store = get_store()
+    step = timeframe_ms(timeframe)
+    now_ms = exchange.milliseconds()
+    since = now_ms - now_ms % step - count * step
+
+    await store.sync(exchange, symbol, base_timeframe,
+                     limit=(count + 1) * ratio, live=False)
+    history = await store.read_range(exchange, symbol, base_timeframe, since)
+    derived, complete = resample_ohlcv(history, base_timeframe, timeframe)
+    local = {int(row[0]): row for row in derived[complete]}
+
+    remote = await exchange.fetch_ohlcv(symbol, timeframe, limit=count + 1)
+    mismatches = []
+    for row in remote[:-1]:  # last one is still forming
+        mine = local.get(int(row[0]))
+        if mine is None:
+            mismatches.append((row[0], 'missing', None, row))
+            continue
+        for col, name in enumerate(('open', 'high', 'low', 'close', 'volume'), 1):
+            if not np.isclose(mine[col], row[col], rtol=1e-6):
+                mismatches.append((row[0], name, float(mine[col]), row[col]))
+    return mismatches
+
+
+async def _verify_main(symbol, timeframes):
+    from exchanges import create_async_exchange
+
+    exchange = create_async_exchange()
+    try:
+        await exchange.load_markets()
+        for tf in timeframes:
+            mismatches = await verify_against_exchange(exchange, symbol, tf)
+            status = "OK" if not mismatches else f"{len(mismatches)} mismatches"
+            print(f"{symbol} {tf}: {status}")
+            for m in mismatches[:5]:
+                print(f"   {m}")
+    finally:
+        await exchange.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python resample.py SYMBOL TIMEFRAME [TIMEFRAME ...]")
+        sys.exit(1)
+    asyncio.run(_verify_main(sys.argv[1], sys.argv[2:]))
@@ -0,0 +1,242 @@
+"""
+Per-endpoint timeouts, hedged requests and circuit breakers.
+
+ResilientExchange wraps an async client (the factory does this when
+REQUEST_RESILIENCE is on):
+
+    timeouts  every call is bounded by its endpoint's timeout
+              (REQUEST_TIMEOUTS), so one stuck fetch costs seconds, not
+              the scan
+    hedging   for idempotent reads, a duplicate request is sent once the
+              first has been outstanding for the endpoint's observed p95;
+              whichever answers first wins and the other is cancelled
+    breaker   after BREAKER_FAILURES consecutive network errors or
+              timeouts an endpoint fails fast for BREAKER_COOLDOWN
+              seconds, then a single trial call decides whether it closes
+"""
+import asyncio
+import inspect
+import time
+from collections import deque
+
+import config
+
+# Reads that are safe to send twice
+HEDGED_METHODS = ('fetch_ohlcv', 'fetch_ticker', 'fetch_funding_rate', 'fetch_time')
+
+WRAPPED_METHODS = HEDGED_METHODS + (
+    'load_markets', 'fetch_tickers', 'fetch_balance', 'fetch_positions',
+)
+
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+MIN_HEDGE_DELAY = 0.05
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose breaker is open."""
+
+
+def _network_errors():
+    try:
+        import ccxt
+        return (asyncio.TimeoutError, ccxt.NetworkError)
+    except ImportError:
+        return (asyncio.TimeoutError, ConnectionError, OSError)
+
+
+# ============================================================
+# PER-ENDPOINT STATE
+# ============================================================
+
+class CircuitBreaker:
+
+    def __init__(self, failures=None, cooldown=None):
+        self.threshold = failures or config.BREAKER_FAILURES
+        self.cooldown = cooldown or config.BREAKER_COOLDOWN
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half-open' and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self):
+        self.failures += 1
+        self.trial = False
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+
+    def quantile(self, q):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self):
+        if len(self.latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        return max(MIN_HEDGE_DELAY, self.quantile(0.95))
+
+
+# ============================================================
+# WRAPPER
+# ============================================================
+
+class ResilientExchange:
+
+    def __init__(self, inner, timeouts=None, hedge=None):
+        self._inner = inner
+        self._timeouts = timeouts or config.REQUEST_TIMEOUTS
+        self._hedge = config.REQUEST_HEDGING if hedge is None else hedge
+        self._retryable = _network_errors()
+        self.stats = {}
+        self.breakers = {}
+
+    def _endpoint(self, method):
+        if method not in self.stats:
+            self.stats[method] = EndpointStats()
+            self.breakers[method] = CircuitBreaker()
+        return self.stats[method], self.breakers[method]
+
+    def timeout(self, method):
+        return self._timeouts.get(method, self._timeouts.get('default', 10.0))
+
+    async def _hedged(self, call, stats):
+        """Run call(); start a second copy after the p95 delay if still waiting."""
+        delay = stats.hedge_delay() if self._hedge else None
+
+        def attempt():
+            # Each attempt's own latency feeds the p95 (a cancelled loser
+            # counts with its age), so hedging does not hide the tail
+            started = time.monotonic()
+            task = asyncio.ensure_future(call())
+            task.add_done_callback(
+                lambda t: t.cancelled() or t.exception() or
+                stats.latencies.append(time.monotonic() - started))
+            task.started = started
+            return task
+
+        first = attempt()
+        tasks = [first]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({first}, timeout=delay)
+                if not done:
+                    stats.hedges += 1
+                    tasks.append(attempt())
+
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    stats.latencies.append(time.monotonic() - task.started)
+
+    async def call(self, method, *args, **kwargs):
+        stats, breaker = self._endpoint(method)
+        is_trial = breaker.state == 'half-open'
+        if not breaker.allow():
+            stats.rejected += 1
+            raise CircuitOpenError(f"{method} circuit open after {breaker.failures} failures")
+
+        fn = getattr(self._inner, method)
+        started = time.monotonic()
+        stats.calls += 1
+        try:
+            if method in HEDGED_METHODS:
+                coro = self._hedged(lambda: fn(*args, **kwargs), stats)
+            else:
+                coro = fn(*args, **kwargs)
+            result = await asyncio.wait_for(coro, timeout=self.timeout(method))
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            breaker.failure()
+            raise
+        except self._retryable:
+            stats.errors += 1
+            breaker.failure()
+            raise
+        except Exception:
+            # Bad symbol, bad params: the endpoint itself is fine
+            stats.errors += 1
+            breaker.success()
+            raise
+        except BaseException:
+            # Cancelled (e.g. by the scan deadline): a trial that never
+            # reports would keep the breaker half-open and rejecting for
+            # good, so it counts as failed and the cooldown starts over
+            if is_trial:
+                breaker.failure()
+            raise
+
+        if method not in HEDGED_METHODS:
+            stats.latencies.append(time.monotonic() - started)
+        breaker.success()
+        return result
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name not in WRAPPED_METHODS or not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def wrapped(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+        return wrapped
+
+    def summary(self):
+        lines = []
+        for method, s in sorted(self.stats.items()):
+            p50, p95 = s.quantile(0.5), s.quantile(0.95)
+            lines.append(
+                f"  {method:<20}{s.calls:>6} calls  "
+                f"p50 {p50 * 1000 if p50 else 0:>7.0f}ms  p95 {p95 * 1000 if p95 else 0:>7.0f}ms  "
+                f"timeouts {s.timeouts}  errors {s.errors}  "
+                f"hedged {s.hedges} (won {s.hedge_wins})  "
+                f"breaker {self.breakers[method].state}, rejected {s.rejected}")
+        return "\n".join(lines)
+
+    async def close(self):
+        if any(s.timeouts or s.hedges or s.rejected for s in self.stats.values()):
+            print("Request stats:\n" + self.summary())
+        await self._inner.close()
@@ -0,0 +1,199 @@
+"""
+Retention for liquidity_radar.db: a hot SQLite tier and a Parquet archive.
+
+Rows older than RETENTION_DAYS are written to
+
+    ARCHIVE_DIR/<table>/date=YYYY-MM-DD/part-<first id>-<last id>.parquet
+
+(zstd), then deleted from SQLite in one transaction, and the freed pages
+are released with an incremental vacuum. The chart rollup (signal_rollup)
+is never archived, so the history charts keep covering everything.
+
+read() answers one query over both tiers:
+
+    python retention.py                     # archive + vacuum
+    python retention.py --dry-run           # only report what would move
+    python retention.py query liquidity_logs --since 2024-01-01 --symbol BTC/USDT:USDT
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import config
+import database as db
+
+# table -> column holding the row's ISO timestamp
+TABLES = {
+    'liquidity_logs': 'scan_time',
+    'signals': 'scan_time',
+    'positions_log': 'snapshot_time',
+}
+
+
+def _parquet():
+    try:
+        import pyarrow  # noqa: F401  (pandas' parquet engine)
+    except ImportError:
+        raise RuntimeError("Parquet archiving needs pyarrow: pip install pyarrow")
+
+
+def _existing(table):
+    return db.conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+
+
+def _partitions(table, since=None, until=None):
+    """Archive files of `table` whose day overlaps [since, until)."""
+    root = os.path.join(config.ARCHIVE_DIR, table)
+    if not os.path.isdir(root):
+        return []
+    files = []
+    for part in sorted(os.listdir(root)):
+        day = part.partition('=')[2]
+        if not day or (since and day < since[:10]) or (until and day > until[:10]):
+            continue
+        folder = os.path.join(root, part)
+        files += [os.path.join(folder, f) for f in sorted(os.listdir(folder))
+                  if f.endswith('.parquet')]
+    return files
+
+
+# ============================================================
+# ARCHIVE
+# ============================================================
+
+def archive_table(table, cutoff, dry_run=False):
+    """Move rows of `table` older than `cutoff` (ISO string). Returns the count."""
+    column = TABLES[table]
+    if not _existing(table):
+        return 0
+    old = pd.read_sql_query(
+        f"SELECT * FROM {table} WHERE {column} < ? ORDER BY id", db.conn, params=(cutoff,))
+    if old.empty or dry_run:
+        return len(old)
+
+    _parquet()
+    for day, rows in old.groupby(old[column].str[:10], sort=True):
+        folder = os.path.join(config.ARCHIVE_DIR, table, f"date={day}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"part-{rows['id'].iloc[0]}-{rows['id'].iloc[-1]}.parquet")
+        # Files appear complete or not at all; a crash before the DELETE
+        # below leaves the rows in both tiers, and read() keeps one copy
+        tmp = path + '.tmp'
+        rows.to_parquet(tmp, compression='zstd', index=False)
+        os.replace(tmp, path)
+
+    with db.conn:
+        db.conn.execute(f"DELETE FROM {table} WHERE {column} < ? AND id <= ?",
+                        (cutoff, int(old['id'].iloc[-1])))
+    return len(old)
+
+
+def vacuum(pages=None):
+    """Return up to `pages` free pages to the filesystem."""
+    mode = db.conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+        # Databases created before incremental mode need one full rebuild
+        print("🧹 Converting liquidity_radar.db to incremental auto-vacuum (one-time VACUUM)")
+        db.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        db.conn.execute("VACUUM")
+        return
+    # execute() steps the pragma once (one page); executescript runs it out
+    db.conn.executescript(f"PRAGMA incremental_vacuum({int(pages or config.VACUUM_PAGES)});")
+
+
+def run(days=None, dry_run=False):
+    """Archive every table and vacuum; {table: rows moved}."""
+    days = config.RETENTION_DAYS if days is None else days
+    # Timestamps are written with datetime.now()/utcnow(); a day either way
+    # does not matter at this granularity
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    moved = {table: archive_table(table, cutoff, dry_run) for table in TABLES}
+    if not dry_run and any(moved.values()):
+        vacuum()
+    return moved
+
+
+# ============================================================
+# QUERY (BOTH TIERS)
+# ============================================================
+
+def read(table, since=None, until=None, symbol=None, columns=None):
+    """
+    Rows of `table` with since <= timestamp < until (ISO strings, either
+    optional), optionally for one symbol, from SQLite and the archive,
+    ordered by id.
+    """
+    column = TABLES[table]
+    where, params = [], []
+    if since:
+        where.append(f"{column} >= ?")
+        params.append(since)
+    if until:
+        where.append(f"{column} < ?")
+        params.append(until)
+    if symbol:
+        where.append("symbol = ?")
+        params.append(symbol)
+
+    select = ", ".join(dict.fromkeys(list(columns) + ['id'])) if columns else "*"
+    frames = []
+    if _existing(table):
+        sql = f"SELECT {select} FROM {table}" + (" WHERE " + " AND ".join(where) if where else "")
+        frames.append(pd.read_sql_query(sql, db.conn, params=params))
+
+    files = _partitions(table, since, until)
+    if files:
+        _parquet()
+        # Filter columns are read even when not asked for, then dropped
+        wanted = list(dict.fromkeys(list(columns) + ['id', column, 'symbol'])) if columns else None
+        cold = pd.concat([pd.read_parquet(f, columns=wanted) for f in files], ignore_index=True)
+        mask = pd.Series(True, index=cold.index)
+        if since:
+            mask &= cold[column] >= since
+        if until:
+            mask &= cold[column] < until
+        if symbol:
+            mask &= cold['symbol'] == symbol
+        cold = cold[mask]
+        frames.insert(0, cold[list(dict.fromkeys(list(columns) + ['id']))] if columns else cold)
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    out = pd.concat(frames, ignore_index=True)
+    if 'id' in out:
+        # A row can be in both tiers after an interrupted archive run
+        out = out.drop_duplicates('id', keep='last').sort_values('id', ignore_index=True)
+    return out[list(columns)] if columns else out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old rows of liquidity_radar.db to Parquet")
+    sub = parser.add_subparsers(dest='command')
+
+    parser.add_argument('--days', type=float, default=None,
+                        help=f"days kept in SQLite (default {config.RETENTION_DAYS:g})")
+    parser.add_argument('--dry-run', action='store_true')
+
+    query = sub.add_parser('query', help="print rows from both tiers")
+    query.add_argument('table', choices=sorted(TABLES))
+    query.add_argument('--since')
+    query.add_argument('--until')
+    query.add_argument('--symbol')
+    args = parser.parse_args()
+
+    if args.command == 'query':
+        print(read(args.table, args.since, args.until, args.symbol).to_string(index=False))
+        return
+
+    moved = run(args.days, args.dry_run)
+    verb = "would move" if args.dry_run else "moved"
+    print(f"🗄️ Retention: {verb} " + ", ".join(f"{t} {n}" for t, n in moved.items())
+          + f" rows to {config.ARCHIVE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
-import ccxt
-import ccxt.pro as ccxt_pro
-import asyncio
 from datetime import timezone, datetime, timedelta
 import database as db
+import profiling
+import trade_plans
+from breakout_scanner import scan_all_markets
+from exchanges import create_sync_exchange
 
 # --- Ensure DB Tables Exist ---
 db.create_tables()  # Use the plural function now
@@ -29,6 +30,10 @@ if 'pump_candidates' not in st.session_state:
     st.session_state.pump_candidates = pd.DataFrame()
 if 'dump_candidates' not in st.session_state:
     st.session_state.dump_candidates = pd.DataFrame()
+if 'results_table' not in st.session_state:
+    st.session_state.results_table = None
+if 'trade_plans' not in st.session_state:
+    st.session_state.trade_plans = pd.DataFrame()
 if 'last_scan_time' not in st.session_state:
     st.session_state.last_scan_time = None
 
@@ -40,7 +45,7 @@ if not st.session_state.connected:
         API_SECRET = st.secrets["API_SECRET"]
         st.session_state.api_key = API_KEY
         st.session_state.api_secret = API_SECRET
-        exchange = ccxt.binance(
+        exchange = create_sync_exchange(
             {'apiKey': API_KEY, 'secret': API_SECRET, 'options': {'defaultType': 'future'}})
         with st.spinner("Auto-connecting..."):
             balance = exchange.fetch_balance()
@@ -59,8 +64,8 @@ def fetch_account_data():
     if not st.session_state.connected:
         return None, None
     try:
-        exchange = ccxt.binance({'apiKey': st.session_state.api_key,
-                                'secret': st.session_state.api_secret, 'options': {'defaultType': 'future'}})
+        exchange = create_sync_exchange({'apiKey': st.session_state.api_key,
+                                         'secret': st.session_state.api_secret, 'options': {'defaultType': 'future'}})
         balance_data = exchange.fetch_balance()
         margin_ratio = balance_data['info'].get('marginRatio', '0')
         maint_margin = balance_data['info'].get('totalMaintMargin', '0')
@@ -104,92 +109,54 @@ if st.session_state.connected:
 # ... (Same as before)
 
 
-async def analyze_symbol_2h(exchange, symbol):
-    try:
-        ohlcv = await exchange.fetch_ohlcv(symbol, '2h', limit=22)
-        if len(ohlcv) < 22:
-            return None
-        df = pd.DataFrame(
-            ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['range'] = df['high'] - df['low']
-        pre_signal_candle = df.iloc[-2]
-        pre_signal_range = pre_signal_candle['range']
-        avg_range_10 = df['range'].iloc[-12:-2].mean()
-        is_contraction = pre_signal_range < (
-            avg_range_10 * 0.5) if avg_range_10 > 0 else False
-        signal_candle = df.iloc[-1]
-        previous_candle = df.iloc[-2]
-        price_change = (
-            (signal_candle['close'] - previous_candle['close']) / previous_candle['close']) * 100
-        average_volume = df.iloc[-21:-1]['volume'].mean()
-        volume_ratio = signal_candle['volume'] / \
-            average_volume if average_volume > 0 else 0
-        pressure = "📈 Buyer" if signal_candle['close'] > signal_candle['open'] else "📉 Seller"
-        signal_timestamp = pd.to_datetime(
-            signal_candle['timestamp'], unit='ms').tz_localize(timezone.utc)
-        grade = "N/A"
-        analysis = "No significant price move. (Fails < 2% check)"
-        is_pump_signal = price_change > 2 and pressure == "📈 Buyer"
-        is_dump_signal = price_change < -2 and pressure == "📉 Seller"
-        if is_pump_signal or is_dump_signal:
-            if volume_ratio < 1.5:
-                grade = "F (Trap)"
-                analysis = "Price is moving with NO volume. High risk of fakeout."
-            elif volume_ratio < 2.0:
-                if is_contraction:
-                    grade = "B (Weak)"
-                    analysis = "Weak volume, but breakout came from consolidation. (B-Grade)"
-                else:
-                    grade = "C (Weak/Noisy)"
-                    analysis = "Weak volume and a noisy breakout. Very high risk. (C-Grade)"
-            elif volume_ratio < 3.5:
-                if is_contraction:
-                    grade = "A (Prime)"
-                    analysis = "A-Grade setup. Breakout from consolidation with good volume."
-                else:
-                    grade = "B+ (Noisy)"
-                    analysis = "Good volume, but did not come from a calm state. (B+-Grade)"
-            else:
-                if is_contraction:
-                    grade = "A+ (Explosive)"
-                    analysis = "A+ Setup. Explosive volume from a perfect consolidation."
-                else:
-                    grade = "A (High Volume)"
-                    analysis = "A-Grade setup. Explosive volume from a noisy state."
-        return {'Symbol': symbol, 'Price': signal_candle['close'], 'Signal Time': signal_timestamp, 'Grade': grade, 'Analysis': analysis, 'Price Change (2h) %': price_change, 'Volume Ratio (2h)': volume_ratio, 'Dominant Pressure': pressure, 'Volatility Contraction': is_contraction}
-    except Exception:
-        return None
+@st.cache_data(ttl=120)
+def run_scanner(): return profiling.run(scan_all_markets(), 'breakout')
 
 
-@st.cache_data(ttl=120)
-def run_scanner(): return asyncio.run(scan_all_markets())
+# --- Scan snapshot for display ---
+# Built once per scan: sorted, display-ready columns as an Arrow table,
+# so a rerun only filters and slices it (no Styler, no per-cell lambdas).
 
+GRADE_ORDER = {'A+ (Explosive)': 0, 'A (Prime)': 1, 'A (High Volume)': 2,
+               'B+ (Noisy)': 3, 'B (Weak)': 4, 'C (Weak/Noisy)': 5, 'F (Trap)': 6, 'N/A': 7}
+# Stand-in for the old cell colours
+GRADE_BADGE = {'A+ (Explosive)': '🟢🟢', 'A (Prime)': '🟢', 'A (High Volume)': '🟢',
+               'B+ (Noisy)': '🟡', 'B (Weak)': '🟠', 'C (Weak/Noisy)': '🔴', 'F (Trap)': '⛔'}
 
-async def scan_all_markets():
-    exchange = ccxt_pro.binance({'options': {'defaultType': 'future'}})
-    try:
-        await exchange.load_markets()
-        symbols = [s for s in exchange.symbols if s.endswith(':USDT')]
-        tasks = [analyze_symbol_2h(exchange, symbol) for symbol in symbols]
-        results = await asyncio.gather(*tasks)
-        df = pd.DataFrame([res for res in results if res is not None])
-        if df.empty:
-            return df
-        all_tickers = await exchange.fetch_tickers(df['Symbol'].tolist())
-        volumes_24h = {symbol: ticker['quoteVolume']
-                       for symbol, ticker in all_tickers.items()}
-        df['24h Volume'] = df['Symbol'].map(volumes_24h).fillna(0)
-        volume_threshold = df['24h Volume'].quantile(0.75)
-        df['High 24h Volume'] = df['24h Volume'] > volume_threshold
-        return df
-    finally:
-        await exchange.close()
+DISPLAY_COLUMNS = ['Symbol', 'Price', 'Signal Time', 'Grade', 'Analysis',
+                   'Price Change (2h) %', 'Volume Ratio (2h)', 'Volatility Contraction',
+                   'Dominant Pressure']
+
+RESULTS_COLUMN_CONFIG = {
+    'Price': st.column_config.NumberColumn(format="%,.4f"),
+    'Signal Time': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm [KSA]"),
+    'Analysis': st.column_config.TextColumn(width='large'),
+    'Price Change (2h) %': st.column_config.NumberColumn(format="%.2f%%"),
+    'Volume Ratio (2h)': st.column_config.NumberColumn(format="%.2fx"),
+    'Volatility Contraction': st.column_config.CheckboxColumn(),
+}
+
+RESULTS_PAGE_SIZE = 100
+
+
+def build_results_table(df, pumps, dumps):
+    import pyarrow as pa
+
+    table = df.assign(
+        **{'Grade_Sort': df['Grade'].map(GRADE_ORDER).fillna(len(GRADE_ORDER)),
+           'Signal Time': (df['Signal Time'] + timedelta(hours=3)).dt.tz_localize(None),
+           'Grade': (df['Grade'].map(GRADE_BADGE).fillna('') + ' ' + df['Grade']).str.strip(),
+           'Tradable Pump': df.index.isin(pumps.index),
+           'Tradable Dump': df.index.isin(dumps.index)})
+    table = table.sort_values('Grade_Sort', kind='stable')
+    return pa.Table.from_pandas(
+        table[DISPLAY_COLUMNS + ['Tradable Pump', 'Tradable Dump']], preserve_index=False)
 
 
 @st.cache_data(ttl=3600)
 def get_daily_forecast():
     try:
-        exchange = ccxt.binance({'options': {'defaultType': 'future'}})
+        exchange = create_sync_exchange()
         btc_ohlcv = exchange.fetch_ohlcv('BTC/USDT', '1d', limit=3)
         eth_ohlcv = exchange.fetch_ohlcv('ETH/USDT', '1d', limit=3)
         btc_yesterday = btc_ohlcv[-2]
@@ -276,6 +243,12 @@ if st.button("🔄 Refresh Scan Data (This may take ~10 seconds)"):
                 df['Dominant Pressure'] == '📉 Seller') & (df['High 24h Volume'] == True)]
             st.session_state.pump_candidates = tradable_pumps
             st.session_state.dump_candidates = tradable_dumps
+            st.session_state.results_table = build_results_table(
+                df, tradable_pumps, tradable_dumps)
+            # Plans for every candidate now, so the planner only looks them up
+            candidates = pd.concat([tradable_pumps, tradable_dumps])
+            st.session_state.trade_plans = trade_plans.build_plans(candidates)
+            trade_plans.get_price_cache().watch(candidates['Symbol'])
             all_signals_to_log = df[df['Grade'] != 'N/A']
             pumps_to_log = all_signals_to_log[all_signals_to_log['Dominant Pressure'] == '📈 Buyer']
             dumps_to_log = all_signals_to_log[all_signals_to_log['Dominant Pressure'] == '📉 Seller']
@@ -291,41 +264,24 @@ if st.session_state.last_scan_time:
         f"Data last refreshed: {st.session_state.last_scan_time.strftime('%Y-%m-%d %H:%M:%S')}")
 else:
     st.info("Click the 'Refresh Scan Data' button to start the first scan.")
-if not st.session_state.scanner_results.empty:
-    df_to_display = st.session_state.scanner_results
-    pump_candidates = st.session_state.pump_candidates
-    dump_candidates = st.session_state.dump_candidates
+if st.session_state.results_table is not None:
+    table = st.session_state.results_table
     filter_option = st.radio("Filter Results:", ("Show All",
                              "Show Tradable Pumps", "Show Tradable Dumps"), horizontal=True)
     if filter_option == "Show Tradable Pumps":
-        df_to_display = pump_candidates
+        table = table.filter(table['Tradable Pump'])
     elif filter_option == "Show Tradable Dumps":
-        df_to_display = dump_candidates
-    if not df_to_display.empty:
-        display_columns = ['Symbol', 'Price', 'Signal Time', 'Grade', 'Analysis',
-                           'Price Change (2h) %', 'Volume Ratio (2h)', 'Volatility Contraction', 'Dominant Pressure']
-        grade_map = {'A+ (Explosive)': 0, 'A (Prime)': 1, 'A (High Volume)': 2,
-                     'B+ (Noisy)': 3, 'B (Weak)': 4, 'C (Weak/Noisy)': 5, 'F (Trap)': 6, 'N/A': 7}
-        df_to_display['Grade_Sort'] = df_to_display['Grade'].map(grade_map)
-        df_sorted = df_to_display.sort_values(by='Grade_Sort')
-
-        def grade_color(grade):
-            if 'A+' in grade:
-                return 'background-color: #2F855A'
-            if 'A (' in grade:
-                return 'background-color: #38A169'
-            if 'B+' in grade:
-                return 'background-color: #B2980A'
-            if 'B (' in grade:
-                return 'background-color: #D69E2E'
-            if 'C (' in grade:
-                return 'background-color: #BF4C1F'
-            if 'F (' in grade:
-                return 'background-color: #9B2C2C'
-            return ''
-        styled_df = df_sorted[display_columns].style.format({'Price': '{:,.4f}', 'Signal Time': lambda t: (t + timedelta(hours=3)).strftime(
-            '%Y-%m-%d %H:%M KSA'), 'Price Change (2h) %': '{:.2f}%', 'Volume Ratio (2h)': '{:.2f}x', 'Volatility Contraction': lambda v: "✅ Yes" if v else "❌ No"}).map(grade_color, subset=['Grade'])
-        st.dataframe(styled_df, width='stretch', height=500, hide_index=True)
+        table = table.filter(table['Tradable Dump'])
+    if table.num_rows:
+        pages = -(-table.num_rows // RESULTS_PAGE_SIZE)
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"Page (of {pages})", min_value=1,
+                                   max_value=pages, value=1, step=1)
+        st.dataframe(table.slice((page - 1) * RESULTS_PAGE_SIZE, RESULTS_PAGE_SIZE),
+                     column_order=DISPLAY_COLUMNS, column_config=RESULTS_COLUMN_CONFIG,
+                     width='stretch', height=500, hide_index=True)
+        st.caption(f"{table.num_rows} pairs")
     else:
         st.warning("No pairs currently meet the selected filter criteria.")
 
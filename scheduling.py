@@ -0,0 +1,177 @@
+"""
+Deadline-aware scan scheduling.
+
+A scan gets a time budget, works through its symbols most-important
+first, and stops starting new symbols once the remaining budget would not
+cover another one. Whatever was found before that point is still flushed,
+and the skipped symbols are reported. A lock file makes a second scan
+started while one is still running step aside instead of stacking.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import config
+
+
+class Deadline:
+    """A per-scan budget with a running estimate of the per-symbol cost."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.cost = 0.0        # EMA of one symbol's wall time
+        self.samples = 0
+
+    def remaining(self):
+        return self.seconds - (time.monotonic() - self.started)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def allows(self, n=1):
+        """True if `n` more symbols are expected to finish in time."""
+        return self.remaining() > self.cost * n
+
+    def record(self, seconds):
+        self.samples += 1
+        alpha = 0.3 if self.samples > 1 else 1.0
+        self.cost += alpha * (seconds - self.cost)
+
+
+def level_distances(symbols, universe, daily_levels):
+    """
+    {symbol: distance of the snapshot price to the nearer of PDH/PDL, as a
+    fraction}, from data already in hand (no requests). Symbols without a
+    price or levels are left out.
+    """
+    distance = {}
+    for symbol in symbols:
+        levels = daily_levels.get(symbol)
+        price = universe.last_price(symbol)
+        if not levels or not price:
+            continue
+        distance[symbol] = min(abs(price - levels['high']) / levels['high'],
+                               abs(price - levels['low']) / levels['low'])
+    return distance
+
+
+def prefilter(symbols, distances, max_distance):
+    """
+    (kept, dropped): symbols within `max_distance` of a level, nearest
+    first, then those that could not be measured; and the rest.
+    """
+    kept = sorted((s for s in symbols if distances.get(s, 0) <= max_distance
+                   and s in distances), key=distances.get)
+    unknown = [s for s in symbols if s not in distances]
+    dropped = [s for s in symbols if s in distances and distances[s] > max_distance]
+    return kept + unknown, dropped
+
+
+def prioritize(symbols, distances):
+    """
+    Symbols ordered by the sum of their rank in `symbols` (quote volume)
+    and their rank by distance to PDH/PDL, so large markets sitting on a
+    level go first. Unmeasured symbols keep their order at the end.
+    """
+    volume_rank = {s: i for i, s in enumerate(symbols)}
+    measured = [s for s in symbols if s in distances]
+    near_rank = {s: i for i, s in enumerate(sorted(measured, key=distances.get))}
+    ranked = sorted(measured, key=lambda s: (volume_rank[s] + near_rank[s], volume_rank[s]))
+    return ranked + [s for s in symbols if s not in distances]
+
+
+def report_skipped(skipped, deadline):
+    if not skipped:
+        return
+    shown = ", ".join(skipped[:15]) + (" ..." if len(skipped) > 15 else "")
+    print(f"⏳ Deadline ({deadline.seconds:g}s) reached: skipped "
+          f"{len(skipped)} symbols: {shown}")
+
+
+# ============================================================
+# COALESCING
+# ============================================================
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _create_lock(path):
+    """
+    Create `path` already holding "<pid> <start time>", or return False if
+    it exists. Linking a finished temp file into place means no reader
+    ever sees the lock empty.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(f"{os.getpid()} {time.time()}")
+    try:
+        os.link(tmp, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp)
+
+
+def _lock_holder(path, stale_after):
+    """Pid of a live holder of the lock, '?' if unreadable but recent, else None."""
+    try:
+        with open(path) as f:
+            content = f.read()
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None  # released meanwhile
+    try:
+        pid, started = content.split()
+        pid, started = int(pid), float(started)
+    except ValueError:
+        # Not written by _create_lock (older version, or a torn file):
+        # trust it until it is stale by age
+        return '?' if time.time() - mtime < stale_after else None
+    if _pid_alive(pid) and time.time() - started < stale_after:
+        return pid
+    return None
+
+
+@contextmanager
+def scan_lock(path=None, stale_after=None):
+    """
+    Yields True if this process may scan, False if another scan holds the
+    lock. A lock older than `stale_after` seconds, or whose process is
+    gone, is taken over.
+    """
+    path = path or config.SCAN_LOCK_PATH
+    stale_after = stale_after or 2 * config.SCAN_DEADLINE_SECONDS
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    for _ in range(2):
+        if not _create_lock(path):
+            pid = _lock_holder(path, stale_after)
+            if pid is not None:
+                print(f"⏭️ Scan already running (pid {pid}); coalescing into it.")
+                yield False
+                return
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+
+        try:
+            yield True
+        finally:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return
+
+    yield False
@@ -0,0 +1,176 @@
+"""
+Sharded per-symbol analysis on a process pool.
+
+The scanners fetch candles on one event loop (network-bound), then hand
+the CPU-bound part, e.g. grade_2h_candles or analyze_liquidity, to
+map_candles(). All candle arrays are packed into one shared-memory block;
+workers get only its name and row offsets, never pickled DataFrames, and
+return small result dicts. Results come back in input (ranking) order.
+
+map_candles() is a coroutine: the loop keeps serving streams and timers
+while the pool works. Workers start through forkserver (spawn where that
+is unavailable), never fork, so they do not inherit the parent's event
+loop, sockets or half-held thread locks.
+
+SCAN_WORKERS=1 (the default) keeps everything in-process.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import config
+from candle_store import COLUMNS, DTYPE
+
+# More shards than workers, so one slow shard does not idle the others
+SHARDS_PER_WORKER = 4
+
+# Below this many symbols the pool round trip costs more than it saves
+MIN_SHARDED_ITEMS = 32
+
+_pool = None
+_pool_size = 0
+
+
+def workers():
+    if config.SCAN_WORKERS > 0:
+        return config.SCAN_WORKERS
+    return os.cpu_count() or 1
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        'forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _get_pool(size):
+    """One pool per process, reused across scans (daemon mode)."""
+    global _pool, _pool_size
+    if _pool is None or _pool_size != size:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=size, mp_context=_mp_context())
+        _pool_size = size
+    return _pool
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+# ============================================================
+# SHARED CANDLES
+# ============================================================
+
+class SharedCandles:
+    """Many (n, 6) candle arrays packed back to back into one shared block."""
+
+    def __init__(self, arrays):
+        arrays = [np.asarray(a, dtype=DTYPE).reshape(-1, COLUMNS) for a in arrays]
+        lengths = [len(a) for a in arrays]
+        self.bounds = np.concatenate([[0], np.cumsum(lengths)]).astype(int).tolist()
+        rows = self.bounds[-1]
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=max(1, rows * COLUMNS * np.dtype(DTYPE).itemsize))
+        self.rows = rows
+        data = np.ndarray((rows, COLUMNS), dtype=DTYPE, buffer=self.shm.buf)
+        for array, start in zip(arrays, self.bounds):
+            data[start:start + len(array)] = array
+        del data
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# ============================================================
+# WORKER SIDE
+# ============================================================
+
+_attached = {}
+
+
+def _attach(name, rows):
+    """The parent's block as an array; older blocks are released."""
+    if name not in _attached:
+        for old in list(_attached):
+            _attached.pop(old)[0].close()
+        # Pool workers share the parent's resource tracker, and the parent
+        # unlinks the block, so attaching needs no cleanup of its own
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = (shm, np.ndarray((rows, COLUMNS), dtype=DTYPE, buffer=shm.buf))
+    return _attached[name][1]
+
+
+def _run_items(task, data, items):
+    out = []
+    for index, key, start, stop, extra in items:
+        try:
+            out.append((index, task(key, data[start:stop], *extra), None))
+        except Exception as e:
+            out.append((index, None, f"{type(e).__name__}: {e}"))
+    return out
+
+
+def _run_shard(task, name, rows, items):
+    return _run_items(task, _attach(name, rows), items)
+
+
+# ============================================================
+# PARENT SIDE
+# ============================================================
+
+async def map_candles(task, keys, arrays, extras=None, max_workers=None):
+    """
+    [task(key, candles, *extra) for each key], run across processes.
+
+    `task` must be a module-level function (workers import it by name);
+    `candles` is a read-only (n, 6) float64 view. Returns (results,
+    failures): results in input order with None for failed items, and
+    failures as [(key, "ErrorType: message")].
+    """
+    extras = extras or [()] * len(keys)
+    size = max_workers or workers()
+
+    if size <= 1 or len(keys) < MIN_SHARDED_ITEMS:
+        outcome = []
+        for i, key in enumerate(keys):
+            candles = np.asarray(arrays[i], dtype=DTYPE).reshape(-1, COLUMNS)
+            outcome.extend(_run_items(task, candles, [(i, key, 0, len(candles), extras[i])]))
+    else:
+        shared = SharedCandles(arrays)
+        try:
+            items = [
+                (i, key, shared.bounds[i], shared.bounds[i + 1], extras[i])
+                for i, key in enumerate(keys)
+            ]
+            # Contiguous shards keep each worker's reads sequential
+            n_shards = min(len(items), size * SHARDS_PER_WORKER)
+            step = -(-len(items) // n_shards)
+            shards = [items[i:i + step] for i in range(0, len(items), step)]
+            pool = _get_pool(size)
+            futures = [asyncio.wrap_future(
+                pool.submit(_run_shard, task, shared.name, shared.rows, shard))
+                for shard in shards]
+            outcome = [row for rows in await asyncio.gather(*futures) for row in rows]
+        finally:
+            shared.close()
+
+    results = [None] * len(keys)
+    failures = []
+    for index, result, error in outcome:
+        results[index] = result
+        if error:
+            failures.append((keys[index], error))
+    return results, failures
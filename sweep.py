@@ -0,0 +1,352 @@
+"""
+Threshold sweep for the Liquidity Radar and the 2h grader.
+
+Replays the rules of analyze_liquidity (15m) and grade_2h_candles (2h)
+over every candle in the local candle store, for a whole grid of
+threshold combinations at once:
+
+  1. per candle, the threshold-free features are computed once (volume
+     and volatility ratios, body strength, sweeps, PDH/PDL position, ...)
+     together with the signal's outcome (outcomes.evaluate_symbol)
+  2. each chunk of combinations is compared against all features with
+     broadcasting, giving a (combinations x candles) signal matrix
+  3. chunks run on a process pool; each worker receives the features once
+
+Result: one row per combination with the signal count, decided signals,
+wins and hit rate. The store keeps no funding history, so funding is
+taken as neutral and the funding / squeeze thresholds are not swept.
+
+    python sweep.py radar --min-signals 30 --top 20
+    python sweep.py grader --set min_change=1.5,2,3 --out grader_sweep.csv
+    python sweep.py grader-a          # A grades only
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import config
+from candle_store import get_store, timeframe_ms
+from outcomes import evaluate_symbol
+
+DAY_MS = 86_400_000
+
+# Current value of each constant first
+RADAR_GRID = {
+    'volume_strong': [1.3, 1.1, 1.2, 1.5, 1.8],      # acceptance, continuation, sweep score
+    'volume_pressure': [1.2, 1.0, 1.1, 1.4],         # break pressure, reversals, volume state
+    'volatility_expansion': [1.2, 1.0, 1.1, 1.4],    # expansion behaviour, sweep score
+    'volatility_reversal': [1.1, 1.0, 1.2],          # reversal confirmation
+    'volatility_compression': [0.8, 0.7, 0.9],       # compression / contracting
+    'body_strength': [0.6, 0.5, 0.7],                # strong acceptance body
+    'sweep_strength': [6, 4, 8],                     # minimum sweep score for reversals
+}
+
+GRADER_GRID = {
+    'min_change': [2.0, 1.5, 2.5, 3.0],              # % move of the signal candle
+    'trap_volume': [1.5, 1.2, 1.8],                  # below: F (Trap)
+    'good_volume': [2.0, 1.8, 2.5],                  # below: B / C
+    'explosive_volume': [3.5, 3.0, 4.0],             # above: A+ / A (High Volume)
+    'contraction': [0.5, 0.4, 0.6, 0.7],             # pre-signal range vs 10-candle average
+}
+
+# Candles x combinations per broadcast step, to bound memory
+CELLS_PER_CHUNK = 20_000_000
+
+OPEN, WIN, LOSS, EXPIRED = 0, 1, 2, 3
+_CODES = {None: OPEN, 'Win': WIN, 'Loss': LOSS, 'Expired': EXPIRED}
+
+
+# ============================================================
+# FEATURES (threshold-free, once per candle)
+# ============================================================
+
+def _prev_mean(x, n):
+    """Mean of x[i-n:i] for every i (NaN where fewer than n)."""
+    out = np.full(len(x), np.nan)
+    cs = np.concatenate([[0.0], np.cumsum(x)])
+    out[n:] = (cs[n:-1] - cs[:-n - 1]) / n
+    return out
+
+
+def _outcome_codes(candles, rows, entry, target, step):
+    scan_ms = candles[rows, 0] + step      # decided from the next candle on
+    out = evaluate_symbol(
+        candles, scan_ms, entry, target, config.OUTCOME_ADVERSE_PCT / 100,
+        config.OUTCOME_HORIZON_HOURS * 3_600_000, step)
+    return np.array([_CODES[o] for o in out], dtype=np.int8)
+
+
+def _previous_day_levels(candles):
+    """PDH/PDL for each candle from the previous UTC day in the same file."""
+    day = (candles[:, 0] // DAY_MS).astype(np.int64)
+    days, first = np.unique(day, return_index=True)
+    highs = np.maximum.reduceat(candles[:, 2], first)
+    lows = np.minimum.reduceat(candles[:, 3], first)
+    pos = np.searchsorted(days, day - 1)
+    pos = np.minimum(pos, len(days) - 1)
+    found = days[pos] == day - 1
+    return np.where(found, highs[pos], np.nan), np.where(found, lows[pos], np.nan)
+
+
+def radar_features(candles, step):
+    """analyze_liquidity's inputs for every candle (as the 'last' one)."""
+    if len(candles) < 22:
+        return None
+    o, h, l, c, v = (candles[:, k] for k in range(1, 6))
+    rng = h - l
+    avg_volume, avg_range = _prev_mean(v, 20), _prev_mean(rng, 20)
+    pdh, pdl = _previous_day_levels(candles)
+
+    i = np.arange(len(candles))
+    ok = ((i >= 20) & ~np.isnan(pdh) & (avg_volume > 0) & (avg_range > 0)
+          & (avg_range >= c * 0.0015))                      # market_dead
+    rows = np.flatnonzero(ok)
+    if len(rows) == 0:
+        return None
+    p = rows - 1
+    H, L = pdh[rows], pdl[rows]
+    price = c[rows]
+    prev_body = np.abs(c[p] - o[p])
+
+    bullish = c[rows] > c[p]
+    dist_pdh = np.abs(price - H) / H
+    dist_pdl = np.abs(price - L) / L
+    features = {
+        'volume_ratio': v[rows] / avg_volume[rows],
+        'volatility_ratio': rng[rows] / avg_range[rows],
+        'body_strength': np.divide(np.abs(c[rows] - o[rows]), rng[rows],
+                                   out=np.zeros(len(rows)), where=rng[rows] > 0),
+        'wide_wick': np.divide(np.abs(h[p] - l[p]), prev_body,
+                               out=np.zeros(len(rows)), where=prev_body > 0) > 2,
+        'pdl_sweep': (l[p] < L) & (c[p] > L),
+        'pdh_sweep': (h[p] > H) & (c[p] < H),
+        'bullish': bullish,
+        'bull_accept': (c[p] > H) & (c[rows] > H),
+        'bear_accept': (c[p] < L) & (c[rows] < L),
+        'above_pdl': c[rows] > L,
+        'below_pdh': c[rows] < H,
+        'range_compression': rng[rows] < avg_range[rows] * 0.7,
+        'far': (dist_pdh > config.MAX_SIGNAL_DISTANCE) & (dist_pdl > config.MAX_SIGNAL_DISTANCE),
+        'too_far': (bullish & (price > H) & (dist_pdh > 0.01))
+                   | (~bullish & (price < L) & (dist_pdl > 0.01)),
+    }
+    features['outcome'] = _outcome_codes(
+        candles, rows, price, np.where(bullish, H, L), step)
+    return features
+
+
+def grader_features(candles, step):
+    """grade_2h_candles' inputs for every candle (as the signal candle)."""
+    if len(candles) < 23:
+        return None
+    o, h, l, c, v = (candles[:, k] for k in range(1, 6))
+    rng = h - l
+    avg_volume = _prev_mean(v, 20)
+    avg_range_10 = np.concatenate([[np.nan], _prev_mean(rng, 10)[:-1]])  # rows i-11..i-2
+
+    i = np.arange(len(candles))
+    rows = np.flatnonzero((i >= 21) & (c[i - 1] > 0))
+    p = rows - 1
+    change = (c[rows] - c[p]) / c[p] * 100
+    buyer = c[rows] > o[rows]
+    ar = avg_range_10[rows]
+    av = avg_volume[rows]
+
+    # Direction comes from the candle, so the hit is a further
+    # OUTCOME_ADVERSE_PCT move the same way before the same move against
+    move = config.OUTCOME_ADVERSE_PCT / 100
+    price = c[rows]
+    target = np.where(buyer, price * (1 + move), price * (1 - move))
+    return {
+        'change': change,
+        'buyer': buyer,
+        'volume_ratio': np.divide(v[rows], av, out=np.zeros(len(rows)), where=av > 0),
+        'contraction_ratio': np.divide(rng[p], ar, out=np.full(len(rows), np.inf), where=ar > 0),
+        'outcome': _outcome_codes(candles, rows, price, target, step),
+    }
+
+
+def load_features(kind, symbols=None, store=None):
+    """Features of every stored symbol (or `symbols`), concatenated."""
+    timeframe = '15m' if kind == 'radar' else '2h'
+    build = radar_features if kind == 'radar' else grader_features   # grader, grader-a
+    store = store or get_store()
+    step = timeframe_ms(timeframe)
+
+    if symbols is None:
+        folder = os.path.join(store.root, timeframe)
+        symbols = sorted(f[:-4] for f in os.listdir(folder) if f.endswith('.f64')) \
+            if os.path.isdir(folder) else []
+
+    parts = [build(np.asarray(store.read(symbol, timeframe)), step) for symbol in symbols]
+    parts = [f for f in parts if f is not None]
+    if not parts:
+        return None, len(symbols)
+    return {k: np.concatenate([f[k] for f in parts]) for k in parts[0]}, len(symbols)
+
+
+# ============================================================
+# RULES (broadcast over combinations)
+# ============================================================
+
+def radar_signals(f, P):
+    """(K, N) signal mask; P maps each RADAR_GRID name to a (K, 1) column."""
+    vr, volr = f['volume_ratio'], f['volatility_ratio']
+
+    strong_volume = vr > P['volume_strong']
+    pressure_volume = vr > P['volume_pressure']
+    expansion = volr > P['volatility_expansion']
+    compression = volr < P['volatility_compression']
+    strong_acceptance = (f['body_strength'] > P['body_strength']) & strong_volume
+
+    break_pressure = pressure_volume & expansion & strong_acceptance
+    continuation = (
+        break_pressure
+        & np.where(f['bullish'], f['bull_accept'], f['bear_accept'])
+        & (volr > 1.5) & strong_volume & expansion)
+
+    i8 = np.int8
+    sweep_strength = (3 * strong_volume.astype(i8) + 2 * expansion.astype(i8)
+                      + (3 * f['wide_wick'] + 2 * (f['pdl_sweep'] | f['pdh_sweep'])).astype(i8))
+    reversal = (
+        ((f['pdl_sweep'] & f['above_pdl']) | (f['pdh_sweep'] & f['below_pdh']))
+        & (sweep_strength >= P['sweep_strength'])
+        & pressure_volume & (volr > P['volatility_reversal']))
+
+    pre_explosion = compression & pressure_volume & f['range_compression']
+
+    score = (3 * (continuation & ~f['too_far']).astype(i8) + 3 * reversal.astype(i8)
+             + 2 * break_pressure.astype(i8) + pre_explosion.astype(i8))
+    return (score >= 2) & ~f['far']
+
+
+def _grader_inputs(f, P):
+    move = np.where(f['buyer'], f['change'] > P['min_change'], f['change'] < -P['min_change'])
+    return move, f['volume_ratio'], f['contraction_ratio'] < P['contraction']
+
+
+def grader_signals(f, P):
+    """(K, N) mask of tradable grades (A+, A, B+, B)."""
+    move, vr, contraction = _grader_inputs(f, P)
+    return move & (vr >= P['trap_volume']) & ((vr >= P['good_volume']) | contraction)
+
+
+def grader_a_signals(f, P):
+    """(K, N) mask of A grades only (A+, A (Prime), A (High Volume))."""
+    move, vr, contraction = _grader_inputs(f, P)
+    return move & (vr >= P['trap_volume']) & (
+        (vr >= P['explosive_volume']) | ((vr >= P['good_volume']) & contraction))
+
+
+RULES = {
+    'radar': (RADAR_GRID, radar_signals),
+    'grader': (GRADER_GRID, grader_signals),
+    'grader-a': (GRADER_GRID, grader_a_signals),
+}
+
+
+# ============================================================
+# PARALLEL EVALUATION
+# ============================================================
+
+_features = None
+
+
+def _init(features):
+    global _features
+    _features = features
+
+
+def _evaluate(kind, names, combos):
+    """[signals, decided, wins] per combination of one chunk."""
+    signals_of = RULES[kind][1]
+    P = {name: combos[:, j:j + 1] for j, name in enumerate(names)}
+    mask = signals_of(_features, P)
+    outcome = _features['outcome']
+    return np.stack([
+        mask.sum(axis=1),
+        (mask & (outcome != OPEN)).sum(axis=1),
+        (mask & (outcome == WIN)).sum(axis=1),
+    ], axis=1)
+
+
+def sweep(kind, features, grid=None, workers=None):
+    """One row per combination of `grid` with signals, wins and hit rate."""
+    grid = grid or RULES[kind][0]
+    names = list(grid)
+    combos = np.array(list(itertools.product(*grid.values())), dtype=float)
+    n = len(features['outcome'])
+    size = max(1, min(len(combos), CELLS_PER_CHUNK // max(n, 1)))
+    chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(chunks) == 1:
+        _init(features)
+        counts = [_evaluate(kind, names, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 initializer=_init, initargs=(features,)) as pool:
+            counts = list(pool.map(_evaluate, [kind] * len(chunks),
+                                   [names] * len(chunks), chunks))
+
+    counts = np.concatenate(counts)
+    out = pd.DataFrame(combos, columns=names)
+    out['signals'], out['decided'], out['wins'] = counts.T
+    out['hit_rate'] = np.where(out['decided'] > 0, out['wins'] / out['decided'].clip(lower=1), np.nan)
+    return out
+
+
+def _parse_set(items, grid):
+    """['volume_strong=1.2,1.3'] -> grid with that axis replaced."""
+    grid = dict(grid)
+    for item in items:
+        name, _, values = item.partition('=')
+        if name not in grid:
+            raise SystemExit(f"unknown parameter {name!r}; one of {', '.join(grid)}")
+        grid[name] = [float(x) for x in values.split(',') if x]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep signal thresholds over stored candles")
+    parser.add_argument('kind', choices=sorted(RULES))
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2',
+                        help="replace one grid axis")
+    parser.add_argument('--symbols', nargs='*', default=None, help="default: all stored")
+    parser.add_argument('--workers', type=int, default=None, help="default: one per CPU")
+    parser.add_argument('--min-signals', type=int, default=20)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--out', default=None, help="write every combination to this CSV")
+    args = parser.parse_args()
+
+    grid = _parse_set(args.set, RULES[args.kind][0])
+    started = time.perf_counter()
+    features, symbols = load_features(args.kind, args.symbols)
+    if features is None:
+        raise SystemExit(f"No usable candles in {config.CANDLE_STORE_DIR} for {symbols} symbols.")
+    built = time.perf_counter()
+
+    result = sweep(args.kind, features, grid, args.workers)
+    done = time.perf_counter()
+
+    print(f"🧪 {args.kind}: {len(result)} combinations x {len(features['outcome'])} candles "
+          f"({symbols} symbols); features {built - started:.1f}s, sweep {done - built:.1f}s")
+    baseline = result.iloc[0]
+    print(f"Current thresholds: {int(baseline['signals'])} signals, "
+          f"hit rate {baseline['hit_rate']:.1%} of {int(baseline['decided'])} decided")
+
+    best = result[result['signals'] >= args.min_signals].sort_values(
+        ['hit_rate', 'signals'], ascending=False)
+    print(best.head(args.top).to_string(index=False))
+    if args.out:
+        result.to_csv(args.out, index=False)
+        print(f"All combinations written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
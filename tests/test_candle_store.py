@@ -0,0 +1,83 @@
+from candle_store import ROW_BYTES, CandleStore
+
+STEP = 60_000
+
+
+def _candles(start, n):
+    return [[start + i * STEP, 1.0, 2.0, 0.5, 1.5, 10.0 + i] for i in range(n)]
+
+
+def test_append_after_torn_row_keeps_rows_aligned(tmp_path):
+    store = CandleStore(root=str(tmp_path))
+    now = 100 * STEP
+    store.append('BTC/USDT:USDT', '1m', _candles(0, 3), now_ms=now)
+
+    # Simulate a write that died half-way through a row
+    with open(store.path('BTC/USDT:USDT', '1m'), 'ab') as f:
+        f.write(b'\x00' * (ROW_BYTES // 2))
+
+    assert store.append('BTC/USDT:USDT', '1m', _candles(3 * STEP, 2), now_ms=now) == 2
+
+    rows = store.read('BTC/USDT:USDT', '1m')
+    assert rows[:, 0].tolist() == [i * STEP for i in range(5)]
+    assert rows[-1, 5] == 11.0
+
+
+class _Klines:
+    """Serves 1m candles up to `now`, recording the limits asked for."""
+
+    def __init__(self, now):
+        self.now = now
+        self.limits = []
+
+    def milliseconds(self):
+        return self.now
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.limits.append(limit)
+        start = since - since % STEP
+        return [c for c in _candles(start, limit) if c[0] <= self.now]
+
+
+def test_warm_sync_asks_only_for_the_missing_candles(tmp_path):
+    import asyncio
+
+    now = 100 * STEP + 5_000
+    store = CandleStore(root=str(tmp_path))
+    store.append('BTC/USDT:USDT', '1m', _candles(0, 98), now_ms=now)
+    exchange = _Klines(now)
+
+    live = asyncio.run(store.sync(exchange, 'BTC/USDT:USDT', '1m', limit=50, live=True))
+
+    assert exchange.limits == [3]
+    assert live[0] == 100 * STEP
+    assert store.high_water_mark('BTC/USDT:USDT', '1m') == 99 * STEP
+
+
+class _GappedKlines(_Klines):
+    """1m klines with one candle missing; 5m klines complete."""
+
+    def __init__(self, now, missing):
+        super().__init__(now)
+        self.missing = missing
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.limits.append((timeframe, limit))
+        step = 5 * STEP if timeframe == '5m' else STEP
+        start = since - since % step
+        candles = [[start + i * step, 1.0, 2.0, 0.5, 1.5, 7.0] for i in range(limit)]
+        return [c for c in candles if c[0] <= self.now and c[0] != self.missing]
+
+
+def test_derived_series_has_no_hole_where_base_candles_are_missing(tmp_path):
+    import asyncio
+
+    now = 60 * STEP + 5_000
+    store = CandleStore(root=str(tmp_path))
+    exchange = _GappedKlines(now, missing=42 * STEP)
+
+    rows = asyncio.run(store._fetch_derived(
+        exchange, 'BTC/USDT:USDT', '1m', '5m', limit=6, live=False))
+
+    assert [r[0] for r in rows] == [i * 5 * STEP for i in range(6, 12)]
+    assert rows[2][5] == 7.0  # the 40-45m bucket came from the 5m klines
@@ -0,0 +1,34 @@
+import numpy as np
+
+from outcomes import evaluate_symbol
+
+STEP = 900_000
+HORIZON = 4 * STEP
+
+
+def _candles(start, n, high=101.0, low=99.0):
+    return np.array([[start + i * STEP, 100.0, high, low, 100.0, 1.0] for i in range(n)])
+
+
+def _evaluate(candles, scan_ms, target=110.0):
+    return evaluate_symbol(candles, np.array([scan_ms]), np.array([100.0]),
+                           np.array([target]), 0.05, HORIZON, STEP)[0]
+
+
+def test_quiet_window_expires():
+    assert _evaluate(_candles(10 * STEP, 10), 11 * STEP) == 'Expired'
+
+
+def test_scan_before_first_stored_candle_stays_open():
+    assert _evaluate(_candles(10 * STEP, 10), 2 * STEP) is None
+
+
+def test_gap_in_window_stays_open():
+    candles = np.delete(_candles(10 * STEP, 10), 3, axis=0)
+    assert _evaluate(candles, 11 * STEP) is None
+
+
+def test_hit_before_gap_is_decided():
+    candles = np.delete(_candles(10 * STEP, 10), 3, axis=0)
+    candles[1, 2] = 120.0
+    assert _evaluate(candles, 11 * STEP) == 'Win'
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from resilience import CircuitOpenError, ResilientExchange
+
+
+class _Inner:
+    """Client whose fetch_ticker fails, hangs or answers on demand."""
+
+    def __init__(self):
+        self.mode = 'fail'
+
+    async def fetch_ticker(self, symbol):
+        if self.mode == 'fail':
+            raise asyncio.TimeoutError()
+        if self.mode == 'hang':
+            await asyncio.sleep(60)
+        return {'symbol': symbol, 'last': 1.0}
+
+
+def _tripped(inner):
+    exchange = ResilientExchange(inner, timeouts={'default': 5.0}, hedge=False)
+
+    async def trip():
+        for _ in range(3):
+            with pytest.raises(asyncio.TimeoutError):
+                await exchange.fetch_ticker('BTC/USDT:USDT')
+    breaker = exchange._endpoint('fetch_ticker')[1]
+    breaker.threshold, breaker.cooldown = 3, 0.05
+    asyncio.run(trip())
+    assert breaker.state == 'open'
+    return exchange, breaker
+
+
+def test_cancelled_trial_reopens_breaker():
+    inner = _Inner()
+    exchange, breaker = _tripped(inner)
+
+    async def scenario():
+        await asyncio.sleep(0.06)
+        inner.mode = 'hang'
+        trial = asyncio.ensure_future(exchange.fetch_ticker('BTC/USDT:USDT'))
+        await asyncio.sleep(0.01)
+        assert breaker.trial
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert not breaker.trial
+        assert breaker.state == 'open'
+        with pytest.raises(CircuitOpenError):
+            await exchange.fetch_ticker('BTC/USDT:USDT')
+
+        # After the new cooldown a fresh trial goes through and closes it
+        await asyncio.sleep(0.06)
+        inner.mode = 'ok'
+        assert (await exchange.fetch_ticker('BTC/USDT:USDT'))['last'] == 1.0
+        assert breaker.state == 'closed'
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_call_on_closed_breaker_is_not_a_failure():
+    inner = _Inner()
+    inner.mode = 'hang'
+    exchange = ResilientExchange(inner, timeouts={'default': 5.0}, hedge=False)
+
+    async def scenario():
+        call = asyncio.ensure_future(exchange.fetch_ticker('BTC/USDT:USDT'))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(scenario())
+    breaker = exchange._endpoint('fetch_ticker')[1]
+    assert breaker.failures == 0 and breaker.state == 'closed'
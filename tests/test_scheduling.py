@@ -0,0 +1,23 @@
+import os
+
+from scheduling import scan_lock
+
+
+def test_second_scan_coalesces_while_lock_is_held(tmp_path):
+    path = str(tmp_path / 'radar.lock')
+    with scan_lock(path, stale_after=60) as first:
+        with scan_lock(path, stale_after=60) as second:
+            assert (first, second) == (True, False)
+    assert not os.path.exists(path)
+
+
+def test_empty_lock_counts_as_held_until_stale(tmp_path):
+    path = str(tmp_path / 'radar.lock')
+    open(path, 'w').close()
+    with scan_lock(path, stale_after=60) as acquired:
+        assert acquired is False
+    assert os.path.exists(path)
+
+    os.utime(path, (0, 0))
+    with scan_lock(path, stale_after=60) as acquired:
+        assert acquired is True
@@ -0,0 +1,44 @@
+import asyncio
+
+import numpy as np
+
+import sharding
+
+
+def _last_close(key, candles, offset):
+    if key == 'BAD':
+        raise ValueError('no candles')
+    return float(candles[-1, 4]) + offset
+
+
+def test_map_candles_on_pool_keeps_order_and_loop_responsive():
+    keys = [f"S{i}" for i in range(sharding.MIN_SHARDED_ITEMS)] + ['BAD']
+    arrays = [np.full((3, 6), i, dtype=float) for i in range(len(keys))]
+    extras = [(0.5,)] * len(keys)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        try:
+            out = await sharding.map_candles(
+                _last_close, keys, arrays, extras, max_workers=2)
+        finally:
+            task.cancel()
+        return out, ticks
+
+    try:
+        (results, failures), ticks = asyncio.run(main())
+    finally:
+        sharding.shutdown()
+
+    assert results[:-1] == [i + 0.5 for i in range(len(keys) - 1)]
+    assert results[-1] is None
+    assert failures == [('BAD', 'ValueError: no candles')]
+    assert ticks > 1
@@ -0,0 +1,161 @@
+"""
+Execution plans for the 2h breakout candidates, computed once per scan.
+
+build_plans() turns every pump/dump candidate into entry, stop-loss and
+TP1-TP4 levels from the last closed 2h candle in the candle store, in
+one vectorized pass, so the planner page only looks a row up. Position
+size depends on the risk slider and is applied at render time
+(position_size).
+
+Live prices come from PriceCache: one shared sync client, refreshed on a
+background thread with a single fetch_tickers() call for all watched
+symbols.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from candle_store import get_store
+from exchanges import create_sync_exchange
+
+# Entry/stop just beyond the signal candle, TPs in multiples of the risk
+ENTRY_BUFFER = 0.001
+TP_MULTIPLES = (1.5, 2.5, 3.5, 4.5)
+
+PLAN_COLUMNS = [
+    'is_pump', 'signal_price', 'entry', 'stop_loss', 'risk_distance',
+    'tp1', 'tp2', 'tp3', 'tp4',
+]
+
+
+def build_plans(candidates, store=None):
+    """
+    DataFrame of plans indexed by symbol for the rows of `candidates`
+    (scanner results). Symbols without a stored 2h candle are left out.
+    """
+    store = store or get_store()
+    symbols, candles, pumps = [], [], []
+    for symbol, pressure in candidates[['Symbol', 'Dominant Pressure']].itertuples(index=False):
+        stored = store.read(symbol, '2h', limit=1)
+        if len(stored):
+            symbols.append(symbol)
+            candles.append(stored[-1])
+            pumps.append(pressure == '📈 Buyer')
+    return _plans(symbols, candles, pumps)
+
+
+def plan_for_candle(symbol, candle, is_pump):
+    """Plan for a signal candle that was not in the store at scan time."""
+    return _plans([symbol], [candle[:6]], [is_pump]).loc[symbol]
+
+
+def _plans(symbols, candles, pumps):
+    if not symbols:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+
+    candles = np.asarray(candles, dtype=float)
+    high, low, close = candles[:, 2], candles[:, 3], candles[:, 4]
+    is_pump = np.asarray(pumps)
+    sign = np.where(is_pump, 1.0, -1.0)
+
+    entry = np.where(is_pump, high * (1 + ENTRY_BUFFER), low * (1 - ENTRY_BUFFER))
+    stop = np.where(is_pump, low * (1 - ENTRY_BUFFER), high * (1 + ENTRY_BUFFER))
+    risk = (entry - stop) * sign
+
+    plans = pd.DataFrame({
+        'is_pump': is_pump,
+        'signal_price': close,
+        'entry': entry,
+        'stop_loss': stop,
+        'risk_distance': risk,
+    }, index=pd.Index(symbols, name='Symbol'))
+    for i, multiple in enumerate(TP_MULTIPLES, start=1):
+        plans[f'tp{i}'] = np.maximum(0, entry + sign * risk * multiple)
+    return plans
+
+
+def position_size(plan, balance, risk_percent):
+    """(total size, size per TP, risk in USD) for an account balance."""
+    risk_usd = balance * (risk_percent / 100)
+    total = risk_usd / plan['risk_distance'] if plan['risk_distance'] > 0 else 0
+    return total, total / len(TP_MULTIPLES), risk_usd
+
+
+# ============================================================
+# LIVE PRICES
+# ============================================================
+
+class PriceCache:
+    """Last prices of the watched symbols, refreshed in the background."""
+
+    def __init__(self, interval=None):
+        self.interval = interval or config.PLANNER_PRICE_SECONDS
+        self.exchange = None
+        self.prices = {}          # symbol -> (price, fetched_at)
+        self.watched = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def client(self):
+        """The shared sync client, also used for the planner's fallbacks."""
+        with self._lock:
+            if self.exchange is None:
+                self.exchange = create_sync_exchange()
+            return self.exchange
+
+    def watch(self, symbols):
+        """Replace the watched set and make sure the refresher runs."""
+        with self._lock:
+            self.watched = set(symbols)
+            start = self._thread is None or not self._thread.is_alive()
+            if start:
+                self._thread = threading.Thread(
+                    target=self._run, name='planner-prices', daemon=True)
+        if start:
+            self._thread.start()
+
+    def refresh(self):
+        with self._lock:
+            symbols = sorted(self.watched)
+        if not symbols:
+            return
+        tickers = self.client().fetch_tickers(symbols)
+        now = time.time()
+        with self._lock:
+            for symbol, ticker in tickers.items():
+                if ticker.get('last') is not None:
+                    self.prices[symbol] = (ticker['last'], now)
+
+    def get(self, symbol, max_age=None):
+        """Cached price, or a direct fetch if missing or older than max_age."""
+        max_age = max_age or 3 * self.interval
+        with self._lock:
+            cached = self.prices.get(symbol)
+        if cached and time.time() - cached[1] <= max_age:
+            return cached[0]
+        price = self.client().fetch_ticker(symbol)['last']
+        with self._lock:
+            self.prices[symbol] = (price, time.time())
+        return price
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Planner price refresh failed: {type(e).__name__}: {e}")
+            time.sleep(self.interval)
+
+
+_shared = None
+
+
+def get_price_cache():
+    """Process-wide cache, shared by every Streamlit session."""
+    global _shared
+    if _shared is None:
+        _shared = PriceCache()
+    return _shared
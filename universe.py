@@ -0,0 +1,104 @@
+"""
+Tradable universe shared by all scanners.
+
+One fetch_tickers() snapshot per refresh interval, indexed by 24h quote
+volume, so "top N", "above percentile" and "excluding X" are cheap list
+lookups instead of a fresh ticker download and sort per scanner.
+"""
+import time
+from bisect import bisect_right
+
+import config
+
+
+class TradableUniverse:
+
+    def __init__(self, refresh_seconds=None):
+        self.refresh_seconds = (
+            config.UNIVERSE_REFRESH_SECONDS if refresh_seconds is None
+            else refresh_seconds
+        )
+        self.fetched_at = 0.0
+        self.tickers = {}
+        self.ranked = []           # USDT futures, highest quote volume first
+        self._volume = {}          # symbol -> quote volume
+        self._sorted_volumes = []  # ascending, for percentile lookups
+
+    @property
+    def stale(self):
+        return time.time() - self.fetched_at >= self.refresh_seconds
+
+    async def refresh(self, exchange, force=False):
+        """Fetch a new ticker snapshot if the current one is too old."""
+        if force or self.stale or not self.ranked:
+            self.load(await exchange.fetch_tickers())
+        return self
+
+    def load(self, tickers):
+        """Index a fetch_tickers() result."""
+        volumes = {
+            symbol: t['quoteVolume']
+            for symbol, t in tickers.items()
+            if symbol.endswith(':USDT') and t.get('quoteVolume') is not None
+        }
+        self.tickers = tickers
+        self.ranked = sorted(volumes, key=volumes.get, reverse=True)
+        self._volume = volumes
+        self._sorted_volumes = sorted(volumes.values())
+        self.fetched_at = time.time()
+        return self
+
+    # ================= QUERIES =================
+
+    def top(self, n, exclude=()):
+        """Top `n` symbols by quote volume, skipping `exclude`."""
+        if not exclude:
+            return self.ranked[:n]
+        exclude = set(exclude)
+        out = []
+        for symbol in self.ranked:
+            if symbol in exclude:
+                continue
+            out.append(symbol)
+            if len(out) >= n:
+                break
+        return out
+
+    def above_percentile(self, q, exclude=()):
+        """Symbols whose quote volume is strictly above quantile `q` (0-1)."""
+        threshold = self.volume_quantile(q)
+        if threshold is None:
+            return []
+        cut = len(self.ranked) - bisect_right(self._sorted_volumes, threshold)
+        exclude = set(exclude)
+        return [s for s in self.ranked[:cut] if s not in exclude]
+
+    def excluding(self, exclude):
+        """Whole ranked universe minus `exclude`."""
+        exclude = set(exclude)
+        return [s for s in self.ranked if s not in exclude]
+
+    def volume_quantile(self, q):
+        """Linear-interpolated quantile, same as pandas' default."""
+        values = self._sorted_volumes
+        if not values:
+            return None
+        pos = (len(values) - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, len(values) - 1)
+        return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+    def quote_volume(self, symbol):
+        return self._volume.get(symbol, 0)
+
+    def last_price(self, symbol):
+        ticker = self.tickers.get(symbol)
+        return ticker.get('last') if ticker else None
+
+
+_shared = TradableUniverse()
+
+
+def get_universe():
+    """Process-wide universe, so scanners in one process share a snapshot."""
+    return _shared